@@ -0,0 +1,185 @@
+import itertools
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Modelo.Simulador import SimuladorBanco, MOTOR_TICKS, POLITICA_ESTRICTA
+from Dao.DAO_colas import DAOColas
+from Dao.DAO_corridas import DAOCorridas
+
+
+def _ejecutar_configuracion(indice, config, semilla):
+    """Ejecuta una configuración en un proceso del pool (función top-level
+    para que sea serializable). Devuelve sólo las estadísticas para no
+    transferir logs ni historial entre procesos."""
+    sim = SimuladorBanco(config['tiempo'], config['prob_llegada'], config['prob_servicio'],
+                         motor=config.get('motor', MOTOR_TICKS),
+                         topologia=config.get('topologia'),
+                         politica=config.get('politica', POLITICA_ESTRICTA),
+                         semilla=semilla, prob_abandono=config.get('prob_abandono'))
+    resultado = sim.run()
+    return indice, resultado['estadisticas']
+
+
+class BarridoController:
+    """Barrido de parámetros en paralelo sobre un `ProcessPoolExecutor`.
+
+    Métodos públicos:
+    - expandir_grilla(): producto cartesiano de listas de parámetros.
+    - iniciar(): lanza el barrido en un hilo fondo (no bloqueante).
+    - cancelar(): cancela las configuraciones que aún no empezaron.
+    - progreso(): totales, completadas, errores, estado y el error que
+      haya detenido el barrido (si lo hubo).
+    - resultados_desde(): resultados en orden de finalización a partir de un cursor.
+
+    Cada configuración recibe la semilla `semilla_base + indice`, así que un
+    mismo barrido es reproducible sin importar el orden en que terminen los
+    procesos. Los resultados se persisten por lotes de `tamaño_lote`.
+    """
+
+    def __init__(self, dao_colas: DAOColas, dao_corridas: DAOCorridas,
+                 max_workers=None, tamaño_lote=10):
+        if dao_colas is None or dao_corridas is None:
+            raise ValueError("dao_colas y dao_corridas son requeridos")
+
+        self.dao_colas = dao_colas
+        self.dao_corridas = dao_corridas
+        self.max_workers = max_workers
+        self.tamaño_lote = tamaño_lote
+
+        self._thread = None
+        self._lock = threading.Lock()
+        self._cancelado = False
+        self._futuros = []
+        self._configuraciones = []
+        self._resultados = []
+        self._errores = 0
+        self._error = None
+
+    # -----------------------
+    # Configuraciones
+    # -----------------------
+    @staticmethod
+    def expandir_grilla(grilla, defaults=None):
+        """Convierte `{'tiempo': [...], 'prob_llegada': [...], ...}` en una
+        lista de configuraciones (producto cartesiano). Las claves que falten
+        se toman de `defaults`; un valor escalar cuenta como lista de uno."""
+        base = dict(defaults or {})
+        base.update(grilla)
+        claves = [k for k in ('tiempo', 'prob_llegada', 'prob_servicio', 'motor',
+                              'topologia', 'politica', 'prob_abandono') if k in base]
+        valores = [v if isinstance(v, list) else [v] for v in (base[k] for k in claves)]
+        return [dict(zip(claves, combinacion)) for combinacion in itertools.product(*valores)]
+
+    # -----------------------
+    # Control de ejecución
+    # -----------------------
+    def iniciar(self, configuraciones, semilla_base=0):
+        """Inicia el barrido en segundo plano. Devuelve False si ya hay uno en curso."""
+        with self._lock:
+            if self.is_running():
+                return False
+            self._cancelado = False
+            self._futuros = []
+            self._configuraciones = list(configuraciones)
+            self._resultados = []
+            self._errores = 0
+            self._error = None
+            self._thread = threading.Thread(target=self._correr, args=(semilla_base,), daemon=True)
+            self._thread.start()
+            return True
+
+    def _correr(self, semilla_base):
+        # Un fallo del hilo (pool roto, BD caída) queda en progreso() en vez
+        # de perderse con el hilo daemon
+        try:
+            self._ejecutar(semilla_base)
+        except Exception as e:
+            print("Error en el barrido:", e)
+            self._error = str(e) or type(e).__name__
+
+    def _ejecutar(self, semilla_base):
+        pendientes = []
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futuros = {}
+            for i, config in enumerate(self._configuraciones):
+                if self._cancelado:
+                    break
+                futuros[pool.submit(_ejecutar_configuracion, i, config, semilla_base + i)] = i
+            self._futuros = list(futuros)
+
+            for futuro in as_completed(futuros):
+                if futuro.cancelled():
+                    continue
+                i = futuros[futuro]
+                registro = {
+                    'indice': i,
+                    'config': self._configuraciones[i],
+                    'semilla': semilla_base + i,
+                    'estadisticas': None,
+                    'corrida_id': None,
+                    'error': None,
+                }
+                try:
+                    _, registro['estadisticas'] = futuro.result()
+                    pendientes.append(registro)
+                except Exception as e:
+                    registro['error'] = str(e)
+                    self._errores += 1
+                self._resultados.append(registro)
+
+                if len(pendientes) >= self.tamaño_lote:
+                    self._persistir(pendientes)
+                    pendientes = []
+
+        if pendientes:
+            self._persistir(pendientes)
+
+    def _persistir(self, registros):
+        """Guarda un lote de resultados en una sola transacción: las corridas
+        del lote en un INSERT de varias filas y todas sus colas en un único
+        INSERT en bloque. Si falla, no queda nada del lote a medias."""
+        try:
+            with self.dao_corridas.db_connection.conexion() as conn:
+                ids = self.dao_corridas.crear_corridas_bulk(len(registros), conn=conn)
+                filas = []
+                for registro, corrida_id in zip(registros, ids):
+                    for tipo, dato in registro['estadisticas'].items():
+                        filas.append((corrida_id, tipo, dato.get('llegaron', 0),
+                                      dato.get('atendidos', 0), dato.get('no_atendidos', 0),
+                                      dato.get('abandonaron', 0)))
+                self.dao_colas.crear_colas_bulk(filas, conn=conn)
+                conn.commit()
+        except Exception as e:
+            print("Error guardando resultados del barrido:", e)
+            return
+        for registro, corrida_id in zip(registros, ids):
+            registro['corrida_id'] = corrida_id
+
+    def cancelar(self):
+        self._cancelado = True
+        for futuro in self._futuros:
+            futuro.cancel()
+
+    # -----------------------
+    # Consulta
+    # -----------------------
+    def progreso(self):
+        total = len(self._configuraciones)
+        completadas = len(self._resultados)
+        return {
+            'running': self.is_running(),
+            'cancelado': self._cancelado,
+            'total': total,
+            'completadas': completadas,
+            'errores': self._errores,
+            'error': self._error,
+            'porcentaje': (100.0 * completadas / total) if total else 0.0,
+        }
+
+    def resultados_desde(self, cursor=0):
+        """Devuelve `(resultados, siguiente_cursor)` con lo terminado desde `cursor`."""
+        nuevos = self._resultados[cursor:]
+        return nuevos, cursor + len(nuevos)
+
+    def is_running(self):
+        return bool(self._thread and self._thread.is_alive())
@@ -0,0 +1,282 @@
+"""Cache de resultados de corridas deterministas.
+
+Una corrida con `semilla` es una función pura de sus parámetros: repetirla
+da exactamente el mismo resultado. `CacheResultados` guarda el snapshot de
+la corrida terminada bajo una clave de contenido (sha256 de los parámetros
+canónicos, la semilla y `VERSION_MOTOR`) y lo devuelve restaurado en lugar
+de volver a simular.
+
+Dos niveles:
+- memoria: LRU acotado por bytes (snapshots tal cual, sin comprimir).
+- disco (opcional, con `directorio`): un archivo zlib por clave, leído
+  con mmap; también acotado por bytes y desalojado por último acceso.
+Un acierto en disco se promueve a memoria.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+from Modelo.Simulador import SimuladorBanco, VERSION_MOTOR, VERSION_SNAPSHOT
+
+EXTENSION = '.snapz'
+# Forma de las claves (sha256 en hex): nunca se arma una ruta con otra cosa
+CLAVE_VALIDA = re.compile(r'[0-9a-f]{64}')
+
+
+class CacheResultados:
+    """Cache LRU (memoria + disco opcional) de snapshots de corridas terminadas.
+
+    Métodos públicos:
+    - clave_de(): clave de un simulador recién creado (None si no es cacheable).
+    - obtener(): simulador restaurado de la clave, o None si no está.
+    - guardar(): guarda el snapshot de una corrida terminada.
+    - invalidar(): borra una clave o todo el cache.
+    - metricas(): aciertos, fallos, desalojos y ocupación de cada nivel.
+    """
+
+    def __init__(self, max_bytes_memoria=256 * 2**20, directorio=None,
+                 max_bytes_disco=2 * 2**30, nivel_compresion=6):
+        self.max_bytes_memoria = max_bytes_memoria
+        self.directorio = directorio
+        self.max_bytes_disco = max_bytes_disco
+        self.nivel_compresion = nivel_compresion
+
+        self._lock = threading.Lock()
+        self._memoria = OrderedDict()   # clave -> bytes del snapshot (orden LRU)
+        self._bytes_memoria = 0
+        self._metricas = {'aciertos_memoria': 0, 'aciertos_disco': 0, 'fallos': 0,
+                          'guardados': 0, 'desalojos_memoria': 0, 'desalojos_disco': 0,
+                          'invalidados': 0}
+        if directorio is not None:
+            os.makedirs(directorio, exist_ok=True)
+
+    # -----------------------
+    # Clave
+    # -----------------------
+    @staticmethod
+    def clave(parametros):
+        """sha256 de `parametros` en JSON canónico más las versiones del motor."""
+        canonico = json.dumps({'parametros': parametros, 'motor_version': VERSION_MOTOR,
+                               'snapshot_version': VERSION_SNAPSHOT},
+                              sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonico.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def clave_de(cls, sim):
+        """Clave de un simulador sin ejecutar.
+
+        Devuelve None si el resultado no es reproducible o no conviene
+        cachearlo: sin semilla, ya empezado (restaurado o continuado), con
+        ritmo fijo (la corrida se quiere ver avanzar) o con llegadas de una
+        traza (su contenido no entra en la clave).
+        """
+        if (sim.semilla is None or sim.tick != 0 or sim.next_id != 1 or sim.ticks_por_segundo
+                or not sim.fuente.aleatoria):
+            return None
+        # Las probabilidades van como pares en su orden: el generador se
+        # consume en el orden del dict, y `sort_keys` lo perdería
+        return cls.clave({
+            'tiempo_total': sim.tiempo_total,
+            'prob_llegada': cls._pares(sim.prob_llegada),
+            'prob_servicio': cls._pares(sim.prob_servicio),
+            'motor': sim.motor,
+            'topologia': sim.topologia,
+            'politica': sim.politica,
+            'guardar_historial': sim.guardar_historial,
+            'compacto': sim.clientes is not None,
+            'semilla': sim.semilla,
+            'prob_abandono': cls._pares(sim.prob_abandono),
+        })
+
+    @staticmethod
+    def _pares(probabilidades):
+        return [[tipo, float(p)] for tipo, p in probabilidades.items()]
+
+    # -----------------------
+    # Consulta
+    # -----------------------
+    def obtener(self, clave):
+        """Simulador restaurado (ya terminado) o None si la clave no está.
+
+        Lanza ValueError si `clave` no es un sha256 en hex.
+        """
+        if clave is None:
+            return None
+        self._validar(clave)
+        with self._lock:
+            datos = self._memoria.get(clave)
+            if datos is not None:
+                self._memoria.move_to_end(clave)
+                self._metricas['aciertos_memoria'] += 1
+        if datos is None:
+            datos = self._leer_disco(clave)
+            with self._lock:
+                if datos is None:
+                    self._metricas['fallos'] += 1
+                    return None
+                self._metricas['aciertos_disco'] += 1
+                self._guardar_memoria(clave, datos)
+        try:
+            return SimuladorBanco.restaurar(datos)
+        except ValueError as e:
+            print("Entrada de cache inválida, se descarta:", e)
+            self.invalidar(clave)
+            return None
+
+    def guardar(self, clave, snapshot):
+        """Guarda `snapshot` (bytes de `SimuladorBanco.snapshot()`) bajo `clave`.
+
+        Lanza ValueError si `clave` no es un sha256 en hex.
+        """
+        if clave is None:
+            return
+        self._validar(clave)
+        with self._lock:
+            self._guardar_memoria(clave, snapshot)
+            self._metricas['guardados'] += 1
+        if self.directorio is not None:
+            self._escribir_disco(clave, snapshot)
+
+    def __contains__(self, clave):
+        with self._lock:
+            if clave in self._memoria:
+                return True
+        return self.directorio is not None and os.path.exists(self._ruta(clave))
+
+    # -----------------------
+    # Memoria
+    # -----------------------
+    def _guardar_memoria(self, clave, datos):
+        """Inserta en el LRU y desaloja lo menos usado. Debe llamarse con `_lock` tomado."""
+        if len(datos) > self.max_bytes_memoria:
+            return
+        anterior = self._memoria.pop(clave, None)
+        if anterior is not None:
+            self._bytes_memoria -= len(anterior)
+        self._memoria[clave] = datos
+        self._bytes_memoria += len(datos)
+        while self._bytes_memoria > self.max_bytes_memoria:
+            _, desalojado = self._memoria.popitem(last=False)
+            self._bytes_memoria -= len(desalojado)
+            self._metricas['desalojos_memoria'] += 1
+
+    # -----------------------
+    # Disco
+    # -----------------------
+    def _ruta(self, clave):
+        self._validar(clave)
+        return os.path.join(self.directorio, clave + EXTENSION)
+
+    def _leer_disco(self, clave):
+        if self.directorio is None:
+            return None
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                    datos = zlib.decompress(mapa)
+            os.utime(ruta)   # último acceso, para el desalojo
+            return datos
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error) as e:
+            print("Error leyendo cache en disco:", e)
+            return None
+
+    def _escribir_disco(self, clave, snapshot):
+        ruta = self._ruta(clave)
+        temporal = f"{ruta}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporal, 'wb') as f:
+                f.write(zlib.compress(snapshot, self.nivel_compresion))
+            os.replace(temporal, ruta)   # atómico: nunca se lee un archivo a medias
+        except OSError as e:
+            print("Error escribiendo cache en disco:", e)
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+            return
+        self._purgar_disco()
+
+    def _archivos_disco(self):
+        archivos = []
+        with os.scandir(self.directorio) as entradas:
+            for e in entradas:
+                if e.name.endswith(EXTENSION):
+                    info = e.stat()
+                    archivos.append((info.st_mtime, info.st_size, e.path))
+        return archivos
+
+    def _purgar_disco(self):
+        archivos = self._archivos_disco()
+        total = sum(tamaño for _, tamaño, _ in archivos)
+        for _, tamaño, ruta in sorted(archivos):
+            if total <= self.max_bytes_disco:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                continue
+            total -= tamaño
+            with self._lock:
+                self._metricas['desalojos_disco'] += 1
+
+    # -----------------------
+    # Invalidación y métricas
+    # -----------------------
+    @staticmethod
+    def _validar(clave):
+        if not isinstance(clave, str) or not CLAVE_VALIDA.fullmatch(clave):
+            raise ValueError(f"clave de cache inválida: {clave!r}")
+
+    def invalidar(self, clave=None):
+        """Borra `clave` de ambos niveles (o todo si es None). Devuelve cuántas claves borró.
+
+        Lanza ValueError si `clave` no es un sha256 en hex.
+        """
+        if clave is not None:
+            self._validar(clave)
+        with self._lock:
+            claves = list(self._memoria) if clave is None else [clave]
+            borradas = set()
+            for c in claves:
+                datos = self._memoria.pop(c, None)
+                if datos is not None:
+                    self._bytes_memoria -= len(datos)
+                    borradas.add(c)
+        if self.directorio is not None:
+            rutas = ([ruta for _, _, ruta in self._archivos_disco()] if clave is None
+                     else [self._ruta(clave)])
+            for ruta in rutas:
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    continue
+                borradas.add(os.path.basename(ruta)[:-len(EXTENSION)])
+        with self._lock:
+            self._metricas['invalidados'] += len(borradas)
+        return len(borradas)
+
+    def metricas(self):
+        disco = self._archivos_disco() if self.directorio is not None else []
+        with self._lock:
+            consultas = (self._metricas['aciertos_memoria'] + self._metricas['aciertos_disco']
+                         + self._metricas['fallos'])
+            aciertos = self._metricas['aciertos_memoria'] + self._metricas['aciertos_disco']
+            return dict(self._metricas,
+                        tasa_aciertos=aciertos / consultas if consultas else 0.0,
+                        entradas_memoria=len(self._memoria),
+                        bytes_memoria=self._bytes_memoria,
+                        max_bytes_memoria=self.max_bytes_memoria,
+                        entradas_disco=len(disco),
+                        bytes_disco=sum(tamaño for _, tamaño, _ in disco),
+                        max_bytes_disco=self.max_bytes_disco if self.directorio else 0)
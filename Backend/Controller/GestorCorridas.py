@@ -0,0 +1,202 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from config import instrumentacion
+from Modelo.Simulador import SimuladorBanco
+from Dao.DAO_colas import DAOColas
+from Dao.DAO_corridas import DAOCorridas
+from Dao.DAO_resultados import DAOResultados
+from Dao.Persistencia_diferida import EscritorDiferido
+from Controller.SimuladorController import SimuladorController
+from Controller.CacheResultados import CacheResultados
+
+
+class CorridaRechazada(Exception):
+    """No hay cupo: todos los workers ocupados y la cola de espera llena."""
+
+
+class GestorCorridas:
+    """Registro de corridas concurrentes, cada una con su `SimuladorController`.
+
+    Métodos públicos:
+    - crear(): construye la corrida, la registra y la encola en el pool.
+    - obtener(): controller de una corrida por clave o id de BD (None si no existe).
+    - listar(): resumen de todas las corridas registradas.
+    - cerrar(): detiene las corridas activas y apaga el pool.
+
+    Admisión: a lo sumo `max_concurrentes` corridas se ejecutan a la vez y
+    `max_en_cola` esperan; por encima de eso `crear()` lanza
+    `CorridaRechazada`. Las corridas terminadas se descartan cuando superan
+    `ttl_segundos` desde que terminaron o, si hay más de `max_terminadas`,
+    por LRU (la menos consultada primero). Las activas nunca se descartan.
+
+    Cada corrida se registra con una clave local ('local-N') reservada junto
+    con el cupo, bajo el mismo lock. El id de BD (`corrida_id`) se asocia a
+    esa clave cuando se conoce (con `escritor`, al insertarse el alta), y
+    `obtener()` acepta cualquiera de los dos. Con `cache`, una corrida ya
+    calculada queda terminada al crearla sin ocupar cupo.
+    """
+
+    def __init__(self, dao_colas: DAOColas, dao_corridas: DAOCorridas,
+                 dao_resultados: DAOResultados = None, max_concurrentes=4, max_en_cola=16,
+                 max_terminadas=32, ttl_segundos=3600, escritor: EscritorDiferido = None,
+                 avance_cada=None, cache: CacheResultados = None):
+        self.dao_colas = dao_colas
+        self.dao_corridas = dao_corridas
+        self.dao_resultados = dao_resultados
+        self.escritor = escritor
+        self.avance_cada = avance_cada
+        self.cache = cache
+        self.max_concurrentes = max_concurrentes
+        self.max_en_cola = max_en_cola
+        self.max_terminadas = max_terminadas
+        self.ttl_segundos = ttl_segundos
+
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrentes, thread_name_prefix='corrida')
+        self._lock = threading.Lock()
+        self._corridas = OrderedDict()   # id -> controller (orden LRU)
+        self._terminada_en = {}          # id -> time.monotonic() al terminar
+        self._ids_bd = {}                # str(corrida_id) -> clave local
+        self._activas = 0
+        self._ids_locales = itertools.count(1)
+
+    # -----------------------
+    # Alta y ejecución
+    # -----------------------
+    def crear(self, tiempo, prob_llegada, prob_servicio, **opciones):
+        """Crea y encola una corrida. Devuelve `(id, controller)`.
+
+        `opciones` se pasan a `SimuladorBanco` (motor, ticks_por_segundo...).
+        Lanza `CorridaRechazada` si no hay cupo y ValueError si los
+        parámetros son inválidos.
+        """
+        simulador = SimuladorBanco(tiempo, prob_llegada, prob_servicio, **opciones)
+        controller = SimuladorController(None, None, None, self.dao_colas, self.dao_corridas,
+                                         dao_resultados=self.dao_resultados, simulador=simulador,
+                                         escritor=self.escritor, avance_cada=self.avance_cada,
+                                         cache=self.cache)
+        if controller.usar_cache():
+            # Resultado ya calculado: se registra terminada, sin pasar por el pool
+            with self._lock:
+                self._purgar()
+                clave = self._registrar(controller)
+                self._terminada_en[clave] = time.monotonic()
+            return clave, controller
+
+        # Admisión y reserva (cupo + clave) en un solo paso: dos altas
+        # simultáneas no pueden pasar ambas con el último lugar
+        with self._lock:
+            self._purgar()
+            if self._activas >= self.max_concurrentes + self.max_en_cola:
+                raise CorridaRechazada(
+                    f"{self._activas} corridas activas (máximo {self.max_concurrentes} "
+                    f"en ejecución + {self.max_en_cola} en cola)")
+            self._activas += 1
+            clave = self._registrar(controller)
+            controller.encolar()
+
+        try:
+            controller.crear_corrida()
+            simulador.corrida = clave
+            controller.al_conocer_id(lambda corrida_id: self._asociar(clave, corrida_id))
+            self._pool.submit(self._ejecutar, clave, controller)
+        except BaseException:
+            with self._lock:
+                self._activas -= 1
+                self._descartar(clave)
+            raise
+        return clave, controller
+
+    def _registrar(self, controller):
+        """Reserva una clave local para `controller`. Debe llamarse con `_lock` tomado."""
+        clave = f"local-{next(self._ids_locales)}"
+        controller.simulador.corrida = clave
+        self._corridas[clave] = controller
+        return clave
+
+    def _asociar(self, clave, corrida_id):
+        with self._lock:
+            if clave in self._corridas:
+                self._ids_bd[str(corrida_id)] = clave
+
+    def _ejecutar(self, clave, controller):
+        try:
+            controller.ejecutar()
+        finally:
+            with self._lock:
+                self._activas -= 1
+                self._terminada_en[clave] = time.monotonic()
+
+    # -----------------------
+    # Consulta
+    # -----------------------
+    def obtener(self, clave):
+        with self._lock:
+            self._purgar()
+            clave = self._ids_bd.get(str(clave), clave)
+            controller = self._corridas.get(clave)
+            if controller is not None:
+                self._corridas.move_to_end(clave)
+            return controller
+
+    def listar(self):
+        with self._lock:
+            self._purgar()
+            return [
+                {
+                    'id': clave,
+                    'corrida_id': c.last_corrida_id,
+                    'estado': c.estado,
+                    'tick': c.simulador.tick,
+                    'tiempo_total': c.simulador.tiempo_total,
+                }
+                for clave, c in self._corridas.items()
+            ]
+
+    def metricas(self):
+        with self._lock:
+            return {
+                'registradas': len(self._corridas),
+                'activas': self._activas,
+                'max_concurrentes': self.max_concurrentes,
+                'max_en_cola': self.max_en_cola,
+            }
+
+    # -----------------------
+    # Desalojo
+    # -----------------------
+    def _purgar(self):
+        """Quita terminadas vencidas por TTL y, si sobran, las menos usadas.
+
+        Debe llamarse con `_lock` tomado.
+        """
+        ahora = time.monotonic()
+        for clave, fin in list(self._terminada_en.items()):
+            if ahora - fin > self.ttl_segundos:
+                self._descartar(clave)
+
+        sobrantes = len(self._terminada_en) - self.max_terminadas
+        if sobrantes > 0:
+            for clave in list(self._corridas):
+                if sobrantes <= 0:
+                    break
+                if clave in self._terminada_en:
+                    self._descartar(clave)
+                    sobrantes -= 1
+
+    def _descartar(self, clave):
+        controller = self._corridas.pop(clave, None)
+        self._terminada_en.pop(clave, None)
+        if controller is not None and self._ids_bd.get(str(controller.last_corrida_id)) == clave:
+            del self._ids_bd[str(controller.last_corrida_id)]
+        instrumentacion.registro.descartar(corrida=clave)
+
+    def cerrar(self):
+        with self._lock:
+            activas = list(self._corridas.values())
+        for controller in activas:
+            controller.detener()
+        self._pool.shutdown(wait=True, cancel_futures=True)
@@ -1,7 +1,21 @@
 import threading
-from Modelo.Simulador import SimuladorBanco
+import time
+from config import instrumentacion
+from config.serializacion import Seccion
+from Modelo.Simulador import SimuladorBanco, MOTOR_TICKS
 from Dao.DAO_colas import DAOColas
 from Dao.DAO_corridas import DAOCorridas
+from Dao.DAO_resultados import DAOResultados
+from Dao.Persistencia_diferida import EscritorDiferido
+from Controller.CacheResultados import CacheResultados
+
+
+# Estados de una corrida
+CREADA = 'creada'
+EN_COLA = 'en_cola'
+EJECUTANDO = 'ejecutando'
+TERMINADA = 'terminada'
+FALLIDA = 'error'
 
 
 class SimuladorController:
@@ -9,30 +23,58 @@ class SimuladorController:
 
     Métodos públicos:
     - correr(): inicia la simulación en un hilo fondo (no bloqueante).
+    - ejecutar(): corre y persiste en el hilo actual (bloqueante), para
+      usarlo desde un pool de workers.
     - pausar(): pausa la simulación (usa el método del modelo).
     - reanudar(): reanuda la simulación.
     - detener(): detiene la simulación.
     - restaurar_parametros(): restaura parámetros iniciales en el simulador.
+    - fijar_ritmo(): ticks por segundo reales (None = lo más rápido posible).
+    - snapshot(): estado completo de la corrida (pausada o no en marcha).
+    - restaurar(): reemplaza el simulador por uno restaurado de un snapshot.
     """
 
     def __init__(self, tiempo_total_ticks, prob_llegada, prob_servicio,
-                 dao_colas: DAOColas, dao_corridas: DAOCorridas):
+                 dao_colas: DAOColas, dao_corridas: DAOCorridas, motor=MOTOR_TICKS,
+                 dao_resultados: DAOResultados = None, simulador: SimuladorBanco = None,
+                 escritor: EscritorDiferido = None, avance_cada=None,
+                 cache: CacheResultados = None):
         """Inicializa el controller recibiendo instancias de DAO.
 
         Este controller NO crea ni conoce la conexión a BD. Las instancias
         de `DAOColas` y `DAOCorridas` deben ser creadas fuera y pasadas aquí.
+        `motor` elige el motor del simulador ('ticks' o 'eventos').
+        Si se pasa `dao_resultados`, colas e historial se guardan juntos en
+        una transacción; si no, sólo se guardan las colas.
+        `simulador` permite inyectar un `SimuladorBanco` ya construido (en ese
+        caso se ignoran los parámetros de simulación).
+        Con `escritor` las escrituras pasan por la cola diferida: ni el alta
+        de la corrida ni el guardado esperan a la BD, y si además se indica
+        `avance_cada` se encola una foto de las estadísticas cada esos ticks.
+        Con `cache`, una corrida con semilla ya calculada se restaura del
+        cache en lugar de simularse (y no se vuelve a persistir).
         """
         if dao_colas is None or dao_corridas is None:
             raise ValueError("dao_colas y dao_corridas son requeridos")
 
         self.dao_colas = dao_colas
         self.dao_corridas = dao_corridas
+        self.dao_resultados = dao_resultados
+        self.escritor = escritor
+        self.avance_cada = avance_cada
+        self.cache = cache
 
-        self.simulador = SimuladorBanco(tiempo_total_ticks, prob_llegada, prob_servicio)
+        if simulador is None:
+            simulador = SimuladorBanco(tiempo_total_ticks, prob_llegada, prob_servicio, motor=motor)
+        self.simulador = simulador
 
         self._thread = None
         self._lock = threading.Lock()
         self.last_corrida_id = None
+        self._corrida_futura = None   # Future del escritor con el id de la corrida
+        self._clave_cache = None      # clave para guardar el resultado al terminar
+        self.desde_cache = False
+        self.estado = CREADA
 
     # -----------------------
     # Control de ejecución
@@ -43,41 +85,171 @@ class SimuladorController:
         Si ya hay una corrida en ejecución, no hace nada y devuelve False.
         """
         with self._lock:
-            if self._thread and self._thread.is_alive():
+            if self.is_running():
                 return False
+            if self.usar_cache():
+                return True
 
             # Crear registro de corrida en BD al inicio para devolver id inmediato
-            try:
-                corrida_id = self.dao_corridas.crear_corrida(self.simulador.tiempo_total)
-                self.last_corrida_id = corrida_id
-            except Exception as e:
-                print("Error creating corrida at start:", e)
+            # (con escritor diferido el id llega después, ver crear_corrida())
+            self.crear_corrida()
 
+            self.estado = EJECUTANDO
             self._thread = threading.Thread(target=self._run_and_persist, daemon=True)
             self._thread.start()
             return True
 
+    def crear_corrida(self):
+        """Crea el registro de la corrida en BD y devuelve su id (None si falla).
+
+        Con escritor diferido sólo encola el alta y devuelve None; el id se
+        completa en `last_corrida_id` cuando el escritor lo inserta.
+        """
+        anterior = self.last_corrida_id
+        if self.escritor is not None:
+            return self._crear_corrida_diferida(anterior)
+        try:
+            corrida_id = self.dao_corridas.crear_corrida(self.simulador.tiempo_total)
+            self.last_corrida_id = corrida_id
+        except Exception as e:
+            print("Error creating corrida at start:", e)
+        if anterior is not None and anterior != self.last_corrida_id:
+            # Las series por corrida de la anterior ya no se actualizan
+            instrumentacion.registro.descartar(corrida=anterior)
+        self.simulador.corrida = self.last_corrida_id
+        return self.last_corrida_id
+
+    def al_conocer_id(self, callback):
+        """Llama `callback(corrida_id)` cuando se conoce el id de BD de la
+        corrida: en el acto si ya se conoce o, con escritor diferido, cuando
+        el escritor inserta el alta (desde su hilo)."""
+        if self.last_corrida_id is not None:
+            callback(self.last_corrida_id)
+            return
+        futuro = self._corrida_futura
+        if futuro is None:
+            return
+
+        def al_crear(f):
+            if f.exception() is None and f.result() is not None:
+                callback(f.result())
+        futuro.add_done_callback(al_crear)
+
+    def _crear_corrida_diferida(self, anterior):
+        self.last_corrida_id = None
+        if anterior is not None:
+            instrumentacion.registro.descartar(corrida=anterior)
+        try:
+            futuro = self.escritor.crear_corrida(self.simulador.tiempo_total)
+        except Exception as e:
+            print("Error creating corrida at start:", e)
+            self._corrida_futura = None
+            return None
+        self._corrida_futura = futuro
+        sim = self.simulador
+
+        def al_crear(f):
+            if f.exception() is not None or self._corrida_futura is not f:
+                return
+            self.last_corrida_id = f.result()
+            if sim.corrida is None:
+                sim.corrida = self.last_corrida_id
+        futuro.add_done_callback(al_crear)
+
+        if self.avance_cada:
+            registrar = self.escritor.registrar_avance
+            sim.observar_avance(self.avance_cada, lambda t, foto: registrar(futuro, t, foto))
+        return None
+
+    def usar_cache(self):
+        """Si el resultado del simulador actual está en cache, lo restaura y
+        deja la corrida terminada. Devuelve True si hubo acierto."""
+        self._clave_cache = None
+        self.desde_cache = False
+        if self.cache is None:
+            return False
+        clave = self.cache.clave_de(self.simulador)
+        restaurado = self.cache.obtener(clave)
+        if restaurado is None:
+            self._clave_cache = clave
+            return False
+        # Ya terminada y con sus estadísticas: sólo falta el evento 'fin' del
+        # stream (sin run(), que recorrería la cola y el historial)
+        restaurado.corrida = self.simulador.corrida
+        restaurado.publicar_fin()
+        self.simulador = restaurado
+        self.last_corrida_id = None
+        self.desde_cache = True
+        self.estado = TERMINADA
+        return True
+
+    def encolar(self):
+        """Marca la corrida como en espera de un worker."""
+        self.estado = EN_COLA
+
+    def ejecutar(self):
+        """Ejecuta y persiste en el hilo actual; se usa desde un pool de workers."""
+        self.estado = EJECUTANDO
+        self._run_and_persist()
+
     def _run_and_persist(self):
         """Ejecuta la simulación (bloqueante) y persiste resultados al terminar."""
+        inicio = time.perf_counter()
+        try:
+            self._correr_y_guardar()
+            self.estado = TERMINADA
+        except Exception as e:
+            self.estado = FALLIDA
+            print("Error en la corrida:", e)
+        if self._clave_cache is not None and self.estado == TERMINADA and not self.simulador.detener:
+            self.cache.guardar(self._clave_cache, self.simulador.snapshot())
+        instrumentacion.CORRIDAS.inc(estado=self.estado)
+        instrumentacion.DURACION_CORRIDA.observar(time.perf_counter() - inicio,
+                                                  motor=self.simulador.motor)
+
+    def _correr_y_guardar(self):
         resultado = self.simulador.run()
+        if self.escritor is not None:
+            # Se encola y se vuelve: el hilo del escritor guarda colas + historial
+            # (el historial ya no cambia; el escritor lo recorre al escribir)
+            futuro = self.escritor.guardar_resultado(
+                self._corrida_futura,
+                {tipo: dict(dato) for tipo, dato in resultado.get('estadisticas', {}).items()},
+                self.simulador.historial.iter_desde, tiempo=self.simulador.tiempo_total)
+            futuro.add_done_callback(self._al_guardar)
+            return
+
         # Usar el corrida_id creado al iniciar la simulación (si existe)
         corrida_id = getattr(self, 'last_corrida_id', None)
         if corrida_id is None:
             print("Aviso: corrida_id es None; los inserts en 'colas' pueden fallar")
 
-        # Guardar estadísticas de colas por ventanilla (si se pudo crear corrida)
         stats = resultado.get('estadisticas', {})
-        for tipo, dato in stats.items():
-            # nombre_id usará el tipo de ventanilla (A/M/B) para ajustarse a la DB
-            nombre_id = tipo
-            lleg = dato.get('llegaron', 0)
-            atend = dato.get('atendidos', 0)
-            no_att = dato.get('no_atendidos', 0)
-            try:
-                # Si no hay corrida_id, pasamos None (DAO deberá manejarlo o fallar)
-                self.dao_colas.crear_cola(corrida_id, nombre_id, lleg, atend, no_att)
-            except Exception as e:
-                print("Error guardando estadistica en colas:", e)
+        if self.dao_resultados is not None:
+            # Corrida + colas + historial completo en una sola transacción
+            guardada = self.dao_resultados.guardar_resultado(
+                corrida_id, stats, self.simulador.historial.iter_desde(),
+                tiempo=self.simulador.tiempo_total)
+            if guardada is not None:
+                self.last_corrida_id = guardada
+            return
+
+        # Guardar estadísticas de colas por ventanilla en un solo INSERT
+        # nombre_id usará el tipo de ventanilla (A/M/B) para ajustarse a la DB
+        filas = [
+            (corrida_id, tipo, dato.get('llegaron', 0), dato.get('atendidos', 0),
+             dato.get('no_atendidos', 0), dato.get('abandonaron', 0))
+            for tipo, dato in stats.items()
+        ]
+        try:
+            # Si no hay corrida_id, pasamos None (DAO deberá manejarlo o fallar)
+            self.dao_colas.crear_colas_bulk(filas)
+        except Exception as e:
+            print("Error guardando estadistica en colas:", e)
+
+    def _al_guardar(self, futuro):
+        if futuro.exception() is None and futuro.result() is not None:
+            self.last_corrida_id = futuro.result()
 
     def pausar(self):
         self.simulador.pausar()
@@ -91,8 +263,95 @@ class SimuladorController:
     def restaurar_parametros(self):
         self.simulador.restaurar_parametros()
 
+    def fijar_ritmo(self, ticks_por_segundo):
+        self.simulador.fijar_ritmo(ticks_por_segundo)
+
+    # -----------------------
+    # Snapshot
+    # -----------------------
+    def snapshot(self, timeout=5.0):
+        """Bytes de `SimuladorBanco.snapshot()`; None si la corrida está en
+        marcha y no quedó pausada dentro de `timeout` segundos."""
+        sim = self.simulador
+        if self.estado == EJECUTANDO and not (sim.pausado and sim.esperar_pausa(timeout)):
+            return None
+        return sim.snapshot()
+
+    def restaurar(self, datos, trazas_dir=None, **cambios):
+        """Carga un snapshot como simulador actual. Devuelve False si hay una
+        corrida en marcha; ValueError si el snapshot es inválido o usa una
+        traza fuera de `trazas_dir`."""
+        with self._lock:
+            if self.is_running():
+                return False
+            self.simulador = SimuladorBanco.restaurar(datos, trazas_dir=trazas_dir, **cambios)
+            self.estado = CREADA
+            return True
+
+    # -----------------------
+    # Resultados
+    # -----------------------
+    def secciones_resultado(self):
+        """Resultado completo como `Seccion`es perezosas para serializar en
+        streaming (mismo contenido que `/simulacion/result` sin paginar)."""
+        sim = self.simulador
+        cola = sim.cola_prioridad
+        return [
+            Seccion('estadisticas', sim.stats),
+            Seccion('metricas', sim.resumen_metricas()),
+            Seccion('historial', sim.historial.iter_desde(), len(sim.historial)),
+            Seccion('cola_prioridad', ((p, s, c.id, c.tipo) for p, s, c in cola), cola.tamaño()),
+            Seccion('logs', iter(sim.logs), len(sim.logs)),
+        ]
+
+    SECCIONES = ('estadisticas', 'metricas', 'historial', 'cola_prioridad', 'logs')
+
+    def pagina_resultado(self, seccion, cursor=0, limite=100, campos=None):
+        """Devuelve una página de una sección del resultado sin materializar el resto.
+
+        - `seccion`: 'estadisticas', 'metricas', 'historial', 'cola_prioridad' o 'logs'.
+        - `cursor`: posición desde la que se lee; `limite`: máximo de elementos.
+        - `campos`: si se indica, cada elemento sólo incluye esas claves.
+
+        El costo es O(limite) (más el salto hasta `cursor` en historial y cola).
+        Lanza ValueError si la sección no existe.
+        """
+        sim = self.simulador
+        if seccion not in self.SECCIONES:
+            raise ValueError(f"seccion desconocida: {seccion!r} (opciones: {', '.join(self.SECCIONES)})")
+        cursor = max(0, cursor)
+
+        if seccion == 'estadisticas':
+            return {'section': seccion, 'items': sim.stats}
+        if seccion == 'metricas':
+            return {'section': seccion, 'items': sim.resumen_metricas()}
+
+        if seccion == 'historial':
+            total = len(sim.historial)
+            items = list(sim.historial.iter_desde(cursor, limite))
+        elif seccion == 'cola_prioridad':
+            total = sim.cola_prioridad.tamaño()
+            items = [{'prioridad': p, 'seq': s, 'id': c.id, 'tipo': c.tipo}
+                     for p, s, c in sim.cola_prioridad.iter_desde(cursor, limite)]
+        else:
+            total = len(sim.logs)
+            items = sim.logs[cursor:cursor + limite]
+
+        if campos:
+            items = [{k: item[k] for k in campos if k in item} for item in items]
+
+        siguiente = cursor + len(items)
+        return {
+            'section': seccion,
+            'items': items,
+            'cursor': cursor,
+            'next_cursor': siguiente if siguiente < total else None,
+            'total': total,
+        }
+
     # -----------------------
     # Auxiliares
     # -----------------------
     def is_running(self):
-        return bool(self._thread and self._thread.is_alive())
+        """True mientras la corrida está en cola o ejecutándose."""
+        return self.estado in (EN_COLA, EJECUTANDO)
@@ -0,0 +1,68 @@
+"""DAO para la tabla `avances` (estadísticas intermedias de corridas largas).
+
+Cada fila es la foto de un tipo de cliente en un tick: llegados y
+atendidos acumulados y clientes en cola en ese momento. Recibe una
+instancia de `config.db.DatabaseConnection` en el constructor.
+"""
+
+from config import db
+from config.db import DatabaseConnection
+from config.instrumentacion import DAO, cronometrado
+
+
+class DAOAvances:
+    def __init__(self, db_connection: DatabaseConnection):
+        self.db_connection = db_connection
+
+    # ---------------------------
+    # CREATE (en bloque)
+    # ---------------------------
+    @cronometrado(DAO, operacion='avances.crear_avances_bulk')
+    def crear_avances_bulk(self, filas, conn=None):
+        """Inserta filas (corrida_id, tick, tipo, llegaron, atendidos, en_cola).
+
+        Con `conn` participa en la transacción del llamador (sin commit,
+        propagando errores). Devuelve el número de filas insertadas.
+        """
+        query = """
+        INSERT INTO avances (corrida_id, tick, tipo, llegaron, atendidos, en_cola)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        filas = list(filas)
+        if not filas:
+            return 0
+        if conn is not None:
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(query, filas)
+                return len(filas)
+            finally:
+                cursor.close()
+        try:
+            with self.db_connection.cursor() as (conn, cursor):
+                cursor.executemany(query, filas)
+                conn.commit()
+                return len(filas)
+        except db.ErrorBD as e:
+            print("Error al crear avances (DB):", e)
+            return 0
+        except Exception as e:
+            print("Error inesperado al crear avances:", e)
+            return 0
+
+    # ---------------------------
+    # READ - Por corrida
+    # ---------------------------
+    @cronometrado(DAO, operacion='avances.obtener_por_corrida')
+    def obtener_por_corrida(self, corrida_id):
+        query = "SELECT * FROM avances WHERE corrida_id = %s ORDER BY tick, tipo"
+        try:
+            with self.db_connection.cursor(dictionary=True) as (conn, cursor):
+                cursor.execute(query, (corrida_id,))
+                return cursor.fetchall()
+        except db.ErrorBD as e:
+            print("Error al obtener avances (DB):", e)
+            return []
+        except Exception as e:
+            print("Error inesperado al obtener avances:", e)
+            return []
@@ -1,89 +1,269 @@
 """DAO para la tabla `colas`.
 
 Proporciona operaciones CRUD simples y recibe una instancia de
-`config.db.DatabaseConnection` en el constructor.
+`config.db.DatabaseConnection` en el constructor. Las lecturas masivas
+van paginadas por clave (`obtener_pagina`) o en streaming
+(`iterar_todas`), y las estadísticas de tablero se agregan en SQL.
 """
 
-from config.db import DatabaseConnection
-import mysql.connector
+from decimal import Decimal
+
+from config import db
+from config.db import DatabaseConnection, FORMATOS_VENTANA
+from config.instrumentacion import DAO, cronometrado
+
+
+def _a_numeros(fila):
+    """SUM/AVG de MySQL llegan como Decimal; se pasan a int/float para JSON."""
+    return {k: (int(v) if v == v.to_integral_value() else float(v)) if isinstance(v, Decimal) else v
+            for k, v in fila.items()}
 
 
 class DAOColas:
-    def __init__(self, db_connection: DatabaseConnection):
+    # Columnas agregadas comunes a los resúmenes (tasa = atendidos / llegados)
+    AGREGADOS = """
+        COUNT(DISTINCT c.corrida_id) AS corridas,
+        SUM(c.n_entrada) AS llegaron,
+        SUM(c.n_atendidos) AS atendidos,
+        SUM(c.n_no_atendidos) AS no_atendidos,
+        SUM(c.n_abandonaron) AS abandonaron,
+        1.0 * SUM(c.n_atendidos) / NULLIF(SUM(c.n_entrada), 0) AS tasa_atencion
+    """
+
+    def __init__(self, db_connection: DatabaseConnection, tamaño_bloque=1000):
         self.db_connection = db_connection
+        self.tamaño_bloque = tamaño_bloque
 
     # ---------------------------
     # CREATE
     # ---------------------------
-    def crear_cola(self, corrida_id, nombre_id, n_entrada, n_atendidos, n_no_atendidos):
+    @cronometrado(DAO, operacion='colas.crear_cola')
+    def crear_cola(self, corrida_id, nombre_id, n_entrada, n_atendidos, n_no_atendidos,
+                   n_abandonaron=0):
         """Inserta una fila en la tabla `colas` según `config/db.sql`.
 
         La tabla espera los campos: (corrida_id, nombre_id, n_entrada,
-        n_atendidos, n_no_atendidos).
+        n_atendidos, n_no_atendidos, n_abandonaron).
         """
         query = """
-        INSERT INTO colas (corrida_id, nombre_id, n_entrada, n_atendidos, n_no_atendidos)
-        VALUES (%s, %s, %s, %s, %s)
+        INSERT INTO colas (corrida_id, nombre_id, n_entrada, n_atendidos, n_no_atendidos,
+                           n_abandonaron)
+        VALUES (%s, %s, %s, %s, %s, %s)
         """
         try:
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, (corrida_id, nombre_id, n_entrada, n_atendidos, n_no_atendidos))
-            conn.commit()
-            return cursor.lastrowid
-        except mysql.connector.Error as e:
+            with self.db_connection.cursor() as (conn, cursor):
+                cursor.execute(query, (corrida_id, nombre_id, n_entrada, n_atendidos, n_no_atendidos,
+                                       n_abandonaron))
+                conn.commit()
+                return cursor.lastrowid
+        except db.ErrorBD as e:
             print("Error al crear cola (DB):", e)
             return None
         except Exception as e:
             print("Error inesperado al crear cola:", e)
             return None
-        finally:
-            if 'cursor' in locals() and cursor:
+
+    @cronometrado(DAO, operacion='colas.crear_colas_bulk')
+    def crear_colas_bulk(self, filas, conn=None):
+        """Inserta varias filas de `colas` con un único `executemany`.
+
+        `filas` son tuplas (corrida_id, nombre_id, n_entrada, n_atendidos,
+        n_no_atendidos, n_abandonaron). Sin `conn` abre su propia conexión y hace commit;
+        con `conn` participa en la transacción del llamador: no hace commit
+        y deja propagar los errores para que el llamador haga rollback.
+        Devuelve el número de filas insertadas.
+        """
+        query = """
+        INSERT INTO colas (corrida_id, nombre_id, n_entrada, n_atendidos, n_no_atendidos,
+                           n_abandonaron)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        filas = list(filas)
+        if not filas:
+            return 0
+        if conn is not None:
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(query, filas)
+                return len(filas)
+            finally:
                 cursor.close()
+        try:
+            with self.db_connection.cursor() as (conn, cursor):
+                cursor.executemany(query, filas)
+                conn.commit()
+                return len(filas)
+        except db.ErrorBD as e:
+            print("Error al crear colas en bloque (DB):", e)
+            return 0
+        except Exception as e:
+            print("Error inesperado al crear colas en bloque:", e)
+            return 0
 
     # ---------------------------
     # READ - Uno
     # ---------------------------
+    @cronometrado(DAO, operacion='colas.obtener_cola')
     def obtener_cola(self, cola_id):
         query = "SELECT * FROM colas WHERE id = %s"
         try:
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(query, (cola_id,))
-            return cursor.fetchone()
-        except mysql.connector.Error as e:
+            with self.db_connection.cursor(dictionary=True) as (conn, cursor):
+                cursor.execute(query, (cola_id,))
+                return cursor.fetchone()
+        except db.ErrorBD as e:
             print("Error al obtener cola (DB):", e)
             return None
         except Exception as e:
             print("Error inesperado al obtener cola:", e)
             return None
-        finally:
-            if 'cursor' in locals() and cursor:
-                cursor.close()
 
     # ---------------------------
     # READ - Todos
     # ---------------------------
+    @cronometrado(DAO, operacion='colas.obtener_todas')
     def obtener_todas(self):
         query = "SELECT * FROM colas"
         try:
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(query)
-            return cursor.fetchall()
-        except mysql.connector.Error as e:
+            with self.db_connection.cursor(dictionary=True) as (conn, cursor):
+                cursor.execute(query)
+                return cursor.fetchall()
+        except db.ErrorBD as e:
             print("Error al obtener colas (DB):", e)
             return []
         except Exception as e:
             print("Error inesperado al obtener colas:", e)
             return []
-        finally:
-            if 'cursor' in locals() and cursor:
-                cursor.close()
+
+    # ---------------------------
+    # READ - Paginado y streaming
+    # ---------------------------
+    @cronometrado(DAO, operacion='colas.obtener_pagina')
+    def obtener_pagina(self, despues_de=0, limite=100, corrida_id=None):
+        """Hasta `limite` filas con `id > despues_de`, ordenadas por id.
+
+        Paginación por clave: el siguiente cursor es el `id` de la última
+        fila, y cada página cuesta lo mismo sin importar qué tan lejos esté.
+        """
+        filtro, parametros = "", [despues_de]
+        if corrida_id is not None:
+            filtro, parametros = "AND corrida_id = %s", [despues_de, corrida_id]
+        query = f"SELECT * FROM colas WHERE id > %s {filtro} ORDER BY id LIMIT %s"
+        try:
+            with self.db_connection.cursor(dictionary=True) as (conn, cursor):
+                cursor.execute(query, (*parametros, limite))
+                return cursor.fetchall()
+        except db.ErrorBD as e:
+            print("Error al obtener página de colas (DB):", e)
+            return []
+        except Exception as e:
+            print("Error inesperado al obtener página de colas:", e)
+            return []
+
+    def iterar_todas(self, corrida_id=None):
+        """Generador de todas las filas, leídas en bloques de `tamaño_bloque`
+        con `fetchmany`. Ocupa una conexión del pool hasta agotarse o cerrarse.
+        """
+        query = "SELECT * FROM colas"
+        parametros = ()
+        if corrida_id is not None:
+            query += " WHERE corrida_id = %s"
+            parametros = (corrida_id,)
+        query += " ORDER BY id"
+        try:
+            with self.db_connection.cursor(dictionary=True) as (conn, cursor):
+                cursor.execute(query, parametros)
+                while True:
+                    bloque = cursor.fetchmany(self.tamaño_bloque)
+                    if not bloque:
+                        return
+                    yield from bloque
+        except db.ErrorBD as e:
+            print("Error al recorrer colas (DB):", e)
+        except Exception as e:
+            print("Error inesperado al recorrer colas:", e)
+
+    # ---------------------------
+    # READ - Agregados (en SQL)
+    # ---------------------------
+    @staticmethod
+    def _filtro_tiempo(desde, hasta):
+        condiciones, parametros = [], []
+        if desde is not None:
+            condiciones.append("r.tiempo >= %s")
+            parametros.append(desde)
+        if hasta is not None:
+            condiciones.append("r.tiempo < %s")
+            parametros.append(hasta)
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        return where, parametros
+
+    def _agregar(self, query, parametros, operacion):
+        try:
+            with self.db_connection.cursor(dictionary=True) as (conn, cursor):
+                cursor.execute(query, tuple(parametros))
+                return [_a_numeros(fila) for fila in cursor.fetchall()]
+        except db.ErrorBD as e:
+            print(f"Error al calcular {operacion} (DB):", e)
+            return []
+        except Exception as e:
+            print(f"Error inesperado al calcular {operacion}:", e)
+            return []
+
+    @cronometrado(DAO, operacion='colas.totales_por_tipo')
+    def totales_por_tipo(self, desde=None, hasta=None):
+        """Totales y tasa de atención por tipo de cliente.
+
+        `desde` / `hasta` acotan por `corridas.tiempo` (hasta es exclusivo).
+        """
+        where, parametros = self._filtro_tiempo(desde, hasta)
+        query = f"""
+        SELECT c.nombre_id AS tipo, {self.AGREGADOS}
+        FROM colas c JOIN corridas r ON r.id = c.corrida_id
+        {where}
+        GROUP BY c.nombre_id
+        ORDER BY c.nombre_id
+        """
+        return self._agregar(query, parametros, 'totales por tipo')
+
+    @cronometrado(DAO, operacion='colas.totales_por_ventana')
+    def totales_por_ventana(self, granularidad='dia', desde=None, hasta=None):
+        """Totales por ventana de tiempo ('hora', 'dia' o 'mes') y tipo."""
+        if granularidad not in FORMATOS_VENTANA:
+            raise ValueError(f"granularidad desconocida: {granularidad!r} "
+                             f"(opciones: {', '.join(FORMATOS_VENTANA)})")
+        where, parametros = self._filtro_tiempo(desde, hasta)
+        query = f"""
+        SELECT DATE_FORMAT(r.tiempo, %s) AS ventana, c.nombre_id AS tipo, {self.AGREGADOS}
+        FROM colas c JOIN corridas r ON r.id = c.corrida_id
+        {where}
+        GROUP BY ventana, c.nombre_id
+        ORDER BY ventana, c.nombre_id
+        """
+        return self._agregar(query, [FORMATOS_VENTANA[granularidad], *parametros],
+                             'totales por ventana')
+
+    @cronometrado(DAO, operacion='colas.totales_por_corrida')
+    def totales_por_corrida(self, despues_de=0, limite=100):
+        """Totales de cada corrida con `corrida_id > despues_de` (paginado por clave)."""
+        query = """
+        SELECT c.corrida_id,
+            SUM(c.n_entrada) AS llegaron,
+            SUM(c.n_atendidos) AS atendidos,
+            SUM(c.n_no_atendidos) AS no_atendidos,
+            SUM(c.n_abandonaron) AS abandonaron,
+            1.0 * SUM(c.n_atendidos) / NULLIF(SUM(c.n_entrada), 0) AS tasa_atencion
+        FROM colas c
+        WHERE c.corrida_id > %s
+        GROUP BY c.corrida_id
+        ORDER BY c.corrida_id
+        LIMIT %s
+        """
+        return self._agregar(query, [despues_de, limite], 'totales por corrida')
 
     # ---------------------------
     # UPDATE
     # ---------------------------
+    @cronometrado(DAO, operacion='colas.actualizar_cola')
     def actualizar_cola(self, cola_id, nombre, n_entrada, n_atendidos, n_no_atendido):
         query = """
         UPDATE colas
@@ -94,41 +274,34 @@ class DAOColas:
         WHERE id = %s
         """
         try:
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, (nombre, n_entrada, n_atendidos, n_no_atendido, cola_id))
-            conn.commit()
-            return cursor.rowcount > 0
-        except mysql.connector.Error as e:
+            with self.db_connection.cursor() as (conn, cursor):
+                cursor.execute(query, (nombre, n_entrada, n_atendidos, n_no_atendido, cola_id))
+                conn.commit()
+                return cursor.rowcount > 0
+        except db.ErrorBD as e:
             print("Error al actualizar cola (DB):", e)
             return False
         except Exception as e:
             print("Error inesperado al actualizar cola:", e)
             return False
-        finally:
-            if 'cursor' in locals() and cursor:
-                cursor.close()
 
     # ---------------------------
     # DELETE
     # ---------------------------
+    @cronometrado(DAO, operacion='colas.eliminar_cola')
     def eliminar_cola(self, cola_id):
         query = "DELETE FROM colas WHERE id = %s"
         try:
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, (cola_id,))
-            conn.commit()
-            return cursor.rowcount > 0
-        except mysql.connector.Error as e:
+            with self.db_connection.cursor() as (conn, cursor):
+                cursor.execute(query, (cola_id,))
+                conn.commit()
+                return cursor.rowcount > 0
+        except db.ErrorBD as e:
             print("Error al eliminar cola (DB):", e)
             return False
         except Exception as e:
             print("Error inesperado al eliminar cola:", e)
             return False
-        finally:
-            if 'cursor' in locals() and cursor:
-                cursor.close()
 
 # ---------------------------
 # EJEMPLO DE USO
@@ -1,103 +1,214 @@
 """DAO para operaciones sobre la tabla `corridas`.
 
 Expone `DAOCorridas` que recibe una instancia de
-`config.db.DatabaseConnection` y realiza operaciones CRUD.
+`config.db.DatabaseConnection` y realiza operaciones CRUD, más lecturas
+paginadas por clave, en streaming y conteos por ventana de tiempo.
 """
 
-from config.db import DatabaseConnection
+from config.db import DatabaseConnection, FORMATOS_VENTANA
+from config.instrumentacion import DAO, cronometrado
 
 
 class DAOCorridas:
-    def __init__(self, db_connection: DatabaseConnection):
+    def __init__(self, db_connection: DatabaseConnection, tamaño_bloque=1000):
         self.db_connection = db_connection
+        self.tamaño_bloque = tamaño_bloque
 
     # -------------------------------
     # CREATE
     # -------------------------------
-    def crear_corrida(self, tiempo: int):
+    @cronometrado(DAO, operacion='corridas.crear_corrida')
+    def crear_corrida(self, tiempo: int, conn=None):
         # La tabla `corridas` en db.sql define `tiempo` como DATETIME.
         # Para evitar errores de tipo, guardamos la fecha/hora actual con NOW().
+        # Con `conn` se inserta dentro de la transacción del llamador (sin
+        # commit y propagando errores).
         query = "INSERT INTO corridas (tiempo) VALUES (NOW())"
-        try:
-            conn = self.db_connection.get_connection()
+        if conn is not None:
             cursor = conn.cursor()
-            cursor.execute(query)
-            conn.commit()
-            return cursor.lastrowid
+            try:
+                cursor.execute(query)
+                return cursor.lastrowid
+            finally:
+                cursor.close()
+        try:
+            with self.db_connection.cursor() as (conn, cursor):
+                cursor.execute(query)
+                conn.commit()
+                return cursor.lastrowid
         except Exception as e:
             # Devolver None y propagar impresión para facilitar debugging
             print("Error al crear corrida:", e)
             return None
-        finally:
-            if 'cursor' in locals() and cursor:
+
+    @cronometrado(DAO, operacion='corridas.crear_corridas_bulk')
+    def crear_corridas_bulk(self, cantidad, conn=None):
+        """Crea `cantidad` corridas con un único INSERT de varias filas.
+
+        InnoDB asigna ids consecutivos a las filas de un mismo INSERT con
+        cantidad conocida y `lastrowid` es el de la primera, así que los ids
+        salen de él sin volver a consultar. Con `conn` participa en la
+        transacción del llamador (sin commit, propagando errores); si no,
+        devuelve [] ante un error.
+        """
+        if cantidad <= 0:
+            return []
+        query = "INSERT INTO corridas (tiempo) VALUES " + ", ".join(["(NOW())"] * cantidad)
+        if conn is not None:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query)
+                return list(range(cursor.lastrowid, cursor.lastrowid + cantidad))
+            finally:
                 cursor.close()
+        try:
+            with self.db_connection.cursor() as (conn, cursor):
+                cursor.execute(query)
+                conn.commit()
+                return list(range(cursor.lastrowid, cursor.lastrowid + cantidad))
+        except Exception as e:
+            print("Error al crear corridas:", e)
+            return []
 
     # -------------------------------
     # READ (uno)
     # -------------------------------
+    @cronometrado(DAO, operacion='corridas.obtener_corrida')
     def obtener_corrida(self, corrida_id: int):
         query = "SELECT * FROM corridas WHERE id = %s"
         try:
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(query, (corrida_id,))
-            return cursor.fetchone()
+            with self.db_connection.cursor(dictionary=True) as (conn, cursor):
+                cursor.execute(query, (corrida_id,))
+                return cursor.fetchone()
         except Exception as e:
             print("Error al obtener corrida:", e)
             return None
-        finally:
-            if 'cursor' in locals() and cursor:
-                cursor.close()
 
     # -------------------------------
     # READ (todos)
     # -------------------------------
+    @cronometrado(DAO, operacion='corridas.obtener_todas')
     def obtener_todas(self):
         query = "SELECT * FROM corridas"
         try:
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(query)
-            return cursor.fetchall()
+            with self.db_connection.cursor(dictionary=True) as (conn, cursor):
+                cursor.execute(query)
+                return cursor.fetchall()
         except Exception as e:
             print("Error al obtener corridas:", e)
             return []
-        finally:
-            if 'cursor' in locals() and cursor:
-                cursor.close()
+
+    # -------------------------------
+    # READ (paginado y streaming)
+    # -------------------------------
+    @staticmethod
+    def _filtro_tiempo(desde, hasta):
+        condiciones, parametros = [], []
+        if desde is not None:
+            condiciones.append("tiempo >= %s")
+            parametros.append(desde)
+        if hasta is not None:
+            condiciones.append("tiempo < %s")
+            parametros.append(hasta)
+        return condiciones, parametros
+
+    @cronometrado(DAO, operacion='corridas.obtener_pagina')
+    def obtener_pagina(self, despues_de=0, limite=100, desde=None, hasta=None):
+        """Hasta `limite` corridas con `id > despues_de`, ordenadas por id.
+
+        El siguiente cursor es el `id` de la última fila. `desde` / `hasta`
+        acotan por `tiempo` (hasta es exclusivo) usando su índice.
+        """
+        condiciones, parametros = self._filtro_tiempo(desde, hasta)
+        condiciones.insert(0, "id > %s")
+        query = f"SELECT * FROM corridas WHERE {' AND '.join(condiciones)} ORDER BY id LIMIT %s"
+        try:
+            with self.db_connection.cursor(dictionary=True) as (conn, cursor):
+                cursor.execute(query, (despues_de, *parametros, limite))
+                return cursor.fetchall()
+        except Exception as e:
+            print("Error al obtener página de corridas:", e)
+            return []
+
+    def iterar_todas(self):
+        """Generador de todas las corridas en bloques de `tamaño_bloque`
+        (`fetchmany`). Ocupa una conexión del pool hasta agotarse o cerrarse.
+        """
+        try:
+            with self.db_connection.cursor(dictionary=True) as (conn, cursor):
+                cursor.execute("SELECT * FROM corridas ORDER BY id")
+                while True:
+                    bloque = cursor.fetchmany(self.tamaño_bloque)
+                    if not bloque:
+                        return
+                    yield from bloque
+        except Exception as e:
+            print("Error al recorrer corridas:", e)
+
+    # -------------------------------
+    # READ (agregados)
+    # -------------------------------
+    @cronometrado(DAO, operacion='corridas.contar')
+    def contar(self, desde=None, hasta=None):
+        condiciones, parametros = self._filtro_tiempo(desde, hasta)
+        where = f" WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        try:
+            with self.db_connection.cursor() as (conn, cursor):
+                cursor.execute("SELECT COUNT(*) FROM corridas" + where, tuple(parametros))
+                return cursor.fetchone()[0]
+        except Exception as e:
+            print("Error al contar corridas:", e)
+            return 0
+
+    @cronometrado(DAO, operacion='corridas.contar_por_ventana')
+    def contar_por_ventana(self, granularidad='dia', desde=None, hasta=None):
+        """Corridas por ventana de tiempo ('hora', 'dia' o 'mes')."""
+        if granularidad not in FORMATOS_VENTANA:
+            raise ValueError(f"granularidad desconocida: {granularidad!r} "
+                             f"(opciones: {', '.join(FORMATOS_VENTANA)})")
+        condiciones, parametros = self._filtro_tiempo(desde, hasta)
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        query = f"""
+        SELECT DATE_FORMAT(tiempo, %s) AS ventana, COUNT(*) AS corridas
+        FROM corridas
+        {where}
+        GROUP BY ventana
+        ORDER BY ventana
+        """
+        try:
+            with self.db_connection.cursor(dictionary=True) as (conn, cursor):
+                cursor.execute(query, (FORMATOS_VENTANA[granularidad], *parametros))
+                return cursor.fetchall()
+        except Exception as e:
+            print("Error al contar corridas por ventana:", e)
+            return []
 
     # -------------------------------
     # UPDATE
     # -------------------------------
+    @cronometrado(DAO, operacion='corridas.actualizar_corrida')
     def actualizar_corrida(self, corrida_id: int, nuevo_tiempo: int):
         query = "UPDATE corridas SET tiempo = %s WHERE id = %s"
         try:
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, (nuevo_tiempo, corrida_id))
-            conn.commit()
-            return cursor.rowcount > 0  # True si actualizó
+            with self.db_connection.cursor() as (conn, cursor):
+                cursor.execute(query, (nuevo_tiempo, corrida_id))
+                conn.commit()
+                return cursor.rowcount > 0  # True si actualizó
         except Exception as e:
             print("Error al actualizar corrida:", e)
             return False
-        finally:
-            if 'cursor' in locals() and cursor:
-                cursor.close()
 
     # -------------------------------
     # DELETE
     # -------------------------------
+    @cronometrado(DAO, operacion='corridas.eliminar_corrida')
     def eliminar_corrida(self, corrida_id: int):
         query = "DELETE FROM corridas WHERE id = %s"
         try:
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, (corrida_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            with self.db_connection.cursor() as (conn, cursor):
+                cursor.execute(query, (corrida_id,))
+                conn.commit()
+                return cursor.rowcount > 0
         except Exception as e:
             print("Error al eliminar corrida:", e)
             return False
-        finally:
-            if 'cursor' in locals() and cursor:
-                cursor.close()
@@ -0,0 +1,127 @@
+"""DAO para la tabla `historial` (clientes atendidos en cada corrida).
+
+Recibe una instancia de `config.db.DatabaseConnection` en el constructor.
+Las inserciones se hacen en bloques con `executemany`, que
+`mysql.connector` convierte en INSERTs de múltiples filas. Las lecturas van
+paginadas por clave (`obtener_por_corrida`) o en streaming
+(`iterar_por_corrida`), apoyadas en el índice `(corrida_id, id)`.
+"""
+
+from itertools import islice
+import os
+
+from config import db
+from config.db import DatabaseConnection
+from config.instrumentacion import DAO, cronometrado
+
+
+class DAOHistorial:
+    def __init__(self, db_connection: DatabaseConnection, tamaño_lote=None):
+        self.db_connection = db_connection
+        self.tamaño_lote = int(os.getenv("DB_LOTE", 5000) if tamaño_lote is None else tamaño_lote)
+
+    # ---------------------------
+    # CREATE (en bloque)
+    # ---------------------------
+    @cronometrado(DAO, operacion='historial.crear_historial_bulk')
+    def crear_historial_bulk(self, corrida_id, registros, conn=None):
+        """Inserta el historial de una corrida en bloques de `tamaño_lote`.
+
+        `registros` es un iterable de dicts con las claves de
+        `ListaEnlazadaHistorial.iter_desde()` (id, tipo, llegada, inicio,
+        fin); se consume de forma perezosa, así que nunca hay más de un
+        bloque en memoria. Con `conn` participa en la transacción del
+        llamador (sin commit, propagando errores). Devuelve las filas
+        insertadas.
+        """
+        if conn is not None:
+            return self._insertar_bloques(conn, corrida_id, registros)
+        try:
+            with self.db_connection.conexion() as conn:
+                total = self._insertar_bloques(conn, corrida_id, registros)
+                conn.commit()
+                return total
+        except db.ErrorBD as e:
+            print("Error al crear historial (DB):", e)
+            return 0
+        except Exception as e:
+            print("Error inesperado al crear historial:", e)
+            return 0
+
+    def _insertar_bloques(self, conn, corrida_id, registros):
+        query = """
+        INSERT INTO historial (corrida_id, cliente_id, tipo, llegada, inicio, fin)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        filas = ((corrida_id, r['id'], r['tipo'], r['llegada'], r['inicio'], r['fin'])
+                 for r in registros)
+        total = 0
+        cursor = conn.cursor()
+        try:
+            while True:
+                bloque = list(islice(filas, self.tamaño_lote))
+                if not bloque:
+                    break
+                cursor.executemany(query, bloque)
+                total += len(bloque)
+        finally:
+            cursor.close()
+        return total
+
+    # ---------------------------
+    # READ - Por corrida (paginado y streaming)
+    # ---------------------------
+    @cronometrado(DAO, operacion='historial.obtener_por_corrida')
+    def obtener_por_corrida(self, corrida_id, despues_de=0, limite=1000):
+        """Hasta `limite` filas de la corrida con `id > despues_de`, ordenadas por id.
+
+        Paginación por clave: el siguiente cursor es el `id` de la última fila.
+        """
+        query = "SELECT * FROM historial WHERE corrida_id = %s AND id > %s ORDER BY id LIMIT %s"
+        try:
+            with self.db_connection.cursor(dictionary=True) as (conn, cursor):
+                cursor.execute(query, (corrida_id, despues_de, limite))
+                return cursor.fetchall()
+        except db.ErrorBD as e:
+            print("Error al obtener historial (DB):", e)
+            return []
+        except Exception as e:
+            print("Error inesperado al obtener historial:", e)
+            return []
+
+    def iterar_por_corrida(self, corrida_id):
+        """Generador de todo el historial de la corrida, leído en bloques de
+        `tamaño_lote` con `fetchmany`. Ocupa una conexión del pool hasta
+        agotarse o cerrarse.
+        """
+        query = "SELECT * FROM historial WHERE corrida_id = %s ORDER BY id"
+        try:
+            with self.db_connection.cursor(dictionary=True) as (conn, cursor):
+                cursor.execute(query, (corrida_id,))
+                while True:
+                    bloque = cursor.fetchmany(self.tamaño_lote)
+                    if not bloque:
+                        return
+                    yield from bloque
+        except db.ErrorBD as e:
+            print("Error al recorrer historial (DB):", e)
+        except Exception as e:
+            print("Error inesperado al recorrer historial:", e)
+
+    # ---------------------------
+    # DELETE - Por corrida
+    # ---------------------------
+    @cronometrado(DAO, operacion='historial.eliminar_por_corrida')
+    def eliminar_por_corrida(self, corrida_id):
+        query = "DELETE FROM historial WHERE corrida_id = %s"
+        try:
+            with self.db_connection.cursor() as (conn, cursor):
+                cursor.execute(query, (corrida_id,))
+                conn.commit()
+                return cursor.rowcount
+        except db.ErrorBD as e:
+            print("Error al eliminar historial (DB):", e)
+            return 0
+        except Exception as e:
+            print("Error inesperado al eliminar historial:", e)
+            return 0
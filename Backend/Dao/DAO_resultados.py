@@ -0,0 +1,56 @@
+"""Persistencia del resultado completo de una corrida en una sola transacción.
+
+Combina `DAOCorridas`, `DAOColas` y `DAOHistorial` sobre una misma conexión:
+la corrida (si aún no existe), sus colas por tipo y todo su historial se
+escriben con inserciones en bloque y un único commit.
+"""
+
+from config.db import DatabaseConnection
+from config.instrumentacion import DAO, cronometrado
+from Dao.DAO_colas import DAOColas
+from Dao.DAO_corridas import DAOCorridas
+from Dao.DAO_historial import DAOHistorial
+
+
+class DAOResultados:
+    def __init__(self, db_connection: DatabaseConnection, tamaño_lote=None):
+        self.db_connection = db_connection
+        self.dao_corridas = DAOCorridas(db_connection)
+        self.dao_colas = DAOColas(db_connection)
+        self.dao_historial = DAOHistorial(db_connection, tamaño_lote)
+
+    @cronometrado(DAO, operacion='resultados.guardar_resultado')
+    def guardar_resultado(self, corrida_id, estadisticas, historial=(), tiempo=0, conn=None):
+        """Guarda colas e historial de una corrida. Devuelve el `corrida_id`.
+
+        - `corrida_id`: si es None se crea la corrida dentro de la transacción.
+        - `estadisticas`: dict tipo -> {'llegaron', 'atendidos', 'no_atendidos',
+          'abandonaron'}.
+        - `historial`: iterable de dicts (p. ej. `historial.iter_desde()`).
+
+        Ante cualquier error se hace rollback de todo y se devuelve None. Con
+        `conn` se escribe dentro de la transacción del llamador (sin commit y
+        propagando errores).
+        """
+        if conn is not None:
+            return self._guardar(conn, corrida_id, estadisticas, historial, tiempo)
+        try:
+            with self.db_connection.conexion() as conn:
+                corrida_id = self._guardar(conn, corrida_id, estadisticas, historial, tiempo)
+                conn.commit()
+                return corrida_id
+        except Exception as e:
+            print("Error guardando resultado de la corrida:", e)
+            return None
+
+    def _guardar(self, conn, corrida_id, estadisticas, historial, tiempo):
+        if corrida_id is None:
+            corrida_id = self.dao_corridas.crear_corrida(tiempo, conn=conn)
+        filas = [
+            (corrida_id, tipo, dato.get('llegaron', 0), dato.get('atendidos', 0),
+             dato.get('no_atendidos', 0), dato.get('abandonaron', 0))
+            for tipo, dato in estadisticas.items()
+        ]
+        self.dao_colas.crear_colas_bulk(filas, conn=conn)
+        self.dao_historial.crear_historial_bulk(corrida_id, historial, conn=conn)
+        return corrida_id
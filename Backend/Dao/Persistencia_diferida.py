@@ -0,0 +1,290 @@
+"""Persistencia diferida (write-behind) para las escrituras de los DAOs.
+
+`EscritorDiferido` recibe escrituras en una cola acotada y un hilo propio
+las aplica por lotes: las escrituras consecutivas del mismo tipo van en
+una sola transacción. Si la BD falla se reintenta con espera exponencial;
+si el grupo sigue fallando, cada escritura se intenta sola para que una
+fila inválida no arrastre a las demás. Al apagar el proceso (`atexit`) o con `cerrar()` se vacía la cola antes
+de salir.
+
+Así ni `/simulacion/start` ni el bucle de ticks esperan a MySQL: el id de
+la corrida llega como `Future` y los avances intermedios se descartan (y
+se cuentan) si la cola está llena en lugar de bloquear la simulación.
+"""
+
+import atexit
+import itertools
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from config.db import DatabaseConnection
+from Dao.DAO_avances import DAOAvances
+from Dao.DAO_corridas import DAOCorridas
+from Dao.DAO_resultados import DAOResultados
+
+# Tipos de escritura
+CORRIDA = 'corrida'
+AVANCE = 'avance'
+RESULTADO = 'resultado'
+
+_FIN = object()
+
+
+class ColaLlena(Exception):
+    """La cola de escrituras siguió llena durante todo el tiempo de espera."""
+
+
+class EscritorDiferido:
+    """Hilo de escritura con cola acotada, lotes y reintentos.
+
+    Métodos públicos:
+    - crear_corrida(): encola el alta de una corrida; devuelve un Future con su id.
+    - registrar_avance(): encola una foto intermedia sin bloquear (False si se descartó).
+    - guardar_resultado(): encola colas + historial de una corrida terminada.
+    - vaciar(): espera a que se apliquen todas las escrituras pendientes.
+    - cerrar(): vacía la cola y detiene el hilo.
+
+    `capacidad` y `tamaño_lote` salen de `ESCRITOR_CAPACIDAD` y
+    `ESCRITOR_LOTE` si no se indican.
+
+    Donde se pide un `corrida_id` se acepta también el Future de
+    `crear_corrida()`; como la cola es FIFO, ya está resuelto cuando el
+    hilo llega a esa escritura.
+    """
+
+    def __init__(self, db_connection: DatabaseConnection, capacidad=None, tamaño_lote=None,
+                 reintentos=5, espera_inicial=0.1, espera_max=5.0, espera_encolar=5.0):
+        self.dao_corridas = DAOCorridas(db_connection)
+        self.dao_avances = DAOAvances(db_connection)
+        self.dao_resultados = DAOResultados(db_connection)
+        self.db_connection = db_connection
+
+        capacidad = int(os.getenv("ESCRITOR_CAPACIDAD", 1000) if capacidad is None else capacidad)
+        self.tamaño_lote = int(os.getenv("ESCRITOR_LOTE", 200) if tamaño_lote is None else tamaño_lote)
+        self.reintentos = reintentos
+        self.espera_inicial = espera_inicial
+        self.espera_max = espera_max
+        self.espera_encolar = espera_encolar
+
+        self._cola = queue.Queue(maxsize=capacidad)
+        self._cond = threading.Condition()
+        self._pendientes = 0
+        self._cerrado = False
+        self._metricas = {'encoladas': 0, 'escritas': 0, 'lotes': 0, 'reintentos': 0,
+                          'descartadas': 0, 'fallidas': 0}
+
+        self._manejadores = {
+            CORRIDA: self._escribir_corridas,
+            AVANCE: self._escribir_avances,
+            RESULTADO: self._escribir_resultados,
+        }
+        self._hilo = threading.Thread(target=self._trabajar, name='escritor-diferido', daemon=True)
+        self._hilo.start()
+        atexit.register(self.cerrar)
+
+    # ---------------------------
+    # Encolar
+    # ---------------------------
+    def _enviar(self, tipo, datos, bloquear=True):
+        futuro = Future()
+        with self._cond:
+            if self._cerrado:
+                raise RuntimeError("el escritor diferido está cerrado")
+            self._pendientes += 1
+        try:
+            self._cola.put((tipo, datos, futuro), block=bloquear,
+                           timeout=self.espera_encolar if bloquear else None)
+        except queue.Full:
+            self._terminar_pendientes(1)
+            self._contar('descartadas')
+            if bloquear:
+                raise ColaLlena(f"cola de escritura llena ({self._cola.maxsize})")
+            return None
+        self._contar('encoladas')
+        return futuro
+
+    def crear_corrida(self, tiempo):
+        """Future con el id de la nueva corrida (None si no se pudo crear)."""
+        return self._enviar(CORRIDA, tiempo)
+
+    def registrar_avance(self, corrida_id, tick, instantanea):
+        """Encola `instantanea` ({tipo: {'llegaron', 'atendidos', 'en_cola'}}) del tick.
+
+        Nunca bloquea: si la cola está llena la foto se descarta y devuelve False.
+        """
+        return self._enviar(AVANCE, (corrida_id, tick, instantanea), bloquear=False) is not None
+
+    def guardar_resultado(self, corrida_id, estadisticas, historial=(), tiempo=0):
+        """Future con el id de la corrida guardada. Lanza `ColaLlena` si no hay lugar.
+
+        `historial` puede ser una función sin argumentos que devuelva el
+        iterable (p. ej. `historial.iter_desde`): así cada reintento lo
+        recorre de nuevo sin materializarlo en memoria.
+        """
+        return self._enviar(RESULTADO, (corrida_id, estadisticas, historial, tiempo))
+
+    # ---------------------------
+    # Hilo de escritura
+    # ---------------------------
+    def _trabajar(self):
+        fin = False
+        while True:
+            lote = []
+            if not fin:
+                item = self._cola.get()
+                if item is _FIN:
+                    fin = True
+                else:
+                    lote.append(item)
+            # Tras la señal de fin se sigue drenando lo que quede en la cola
+            while len(lote) < self.tamaño_lote:
+                try:
+                    item = self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _FIN:
+                    fin = True
+                else:
+                    lote.append(item)
+            if not lote:
+                if fin:
+                    return
+                continue
+
+            # Escrituras consecutivas del mismo tipo van juntas (se respeta el orden FIFO)
+            for tipo, grupo in itertools.groupby(lote, key=lambda item: item[0]):
+                grupo = list(grupo)
+                self._aplicar(tipo, grupo)
+                self._terminar_pendientes(len(grupo))
+
+    def _aplicar(self, tipo, grupo):
+        manejador = self._manejadores[tipo]
+        datos = [d for _, d, _ in grupo]
+        for intento in range(self.reintentos + 1):
+            try:
+                resultados = manejador(datos)
+                break
+            except Exception as e:
+                if intento == self.reintentos:
+                    print(f"Error en escritura diferida ({tipo}, {len(grupo)} filas):", e)
+                    if len(grupo) > 1:
+                        self._aplicar_de_a_una(manejador, grupo)
+                    else:
+                        self._fallar(grupo, e)
+                    return
+                self._contar('reintentos')
+                espera = min(self.espera_inicial * 2 ** intento, self.espera_max)
+                time.sleep(espera * random.uniform(0.5, 1.0))
+        self._contar('lotes')
+        self._contar('escritas', len(grupo))
+        for (_, _, futuro), resultado in zip(grupo, resultados):
+            futuro.set_result(resultado)
+
+    def _aplicar_de_a_una(self, manejador, grupo):
+        """Tras agotar los reintentos del grupo, un intento por escritura (cada
+        una en su transacción): sólo fallan las que no se pueden escribir."""
+        for item in grupo:
+            _, dato, futuro = item
+            try:
+                resultado, = manejador([dato])
+            except Exception as e:
+                self._fallar([item], e)
+                continue
+            self._contar('escritas')
+            futuro.set_result(resultado)
+
+    def _fallar(self, grupo, error):
+        self._contar('fallidas', len(grupo))
+        for _, _, futuro in grupo:
+            futuro.set_exception(error)
+
+    @staticmethod
+    def _resolver(corrida_id):
+        """Acepta un id o el Future de `crear_corrida()`."""
+        if isinstance(corrida_id, Future):
+            try:
+                return corrida_id.result(timeout=0)
+            except Exception:
+                return None
+        return corrida_id
+
+    # ---------------------------
+    # Manejadores (una transacción por grupo)
+    # ---------------------------
+    def _escribir_corridas(self, tiempos):
+        with self.db_connection.conexion() as conn:
+            ids = [self.dao_corridas.crear_corrida(tiempo, conn=conn) for tiempo in tiempos]
+            conn.commit()
+        return ids
+
+    def _escribir_avances(self, avances):
+        filas = []
+        for corrida_id, tick, instantanea in avances:
+            corrida_id = self._resolver(corrida_id)
+            if corrida_id is None:
+                continue
+            for tipo, dato in instantanea.items():
+                filas.append((corrida_id, tick, tipo, dato['llegaron'], dato['atendidos'],
+                              dato['en_cola']))
+        with self.db_connection.conexion() as conn:
+            self.dao_avances.crear_avances_bulk(filas, conn=conn)
+            conn.commit()
+        return [None] * len(avances)
+
+    def _escribir_resultados(self, resultados):
+        # Todo el grupo en una transacción: si un resultado falla se deshace
+        # el grupo entero y el reintento no duplica filas
+        with self.db_connection.conexion() as conn:
+            ids = []
+            for corrida_id, estadisticas, historial, tiempo in resultados:
+                if callable(historial):
+                    historial = historial()
+                ids.append(self.dao_resultados.guardar_resultado(
+                    self._resolver(corrida_id), estadisticas, historial, tiempo=tiempo, conn=conn))
+            conn.commit()
+        return ids
+
+    # ---------------------------
+    # Vaciado y cierre
+    # ---------------------------
+    def _terminar_pendientes(self, n):
+        with self._cond:
+            self._pendientes -= n
+            if self._pendientes <= 0:
+                self._cond.notify_all()
+
+    def _contar(self, clave, n=1):
+        with self._cond:
+            self._metricas[clave] += n
+
+    def vaciar(self, timeout=None):
+        """Espera a que no queden escrituras pendientes. Devuelve False si venció `timeout`."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pendientes <= 0, timeout)
+
+    def cerrar(self, timeout=30.0):
+        """Vacía la cola (hasta `timeout` segundos) y detiene el hilo.
+
+        Si el hilo sigue trabado (p. ej. reintentando con la BD caída) se
+        vuelve igual al vencer `timeout`; lo pendiente se pierde con el
+        proceso.
+        """
+        with self._cond:
+            if self._cerrado:
+                return
+            self._cerrado = True
+        limite = time.monotonic() + timeout
+        try:
+            self._cola.put(_FIN, timeout=timeout)
+        except queue.Full:
+            print(f"Escritor diferido: cola llena al cerrar, quedan {self._pendientes} escrituras")
+            return
+        self._hilo.join(max(0.0, limite - time.monotonic()))
+
+    def metricas(self):
+        with self._cond:
+            return dict(self._metricas, pendientes=self._pendientes, capacidad=self._cola.maxsize)
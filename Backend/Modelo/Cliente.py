@@ -1,4 +1,6 @@
 class Cliente:
+    __slots__ = ('id', 'tipo', 'tiempo_llegada', 'tiempo_inicio_atencion', 'tiempo_fin_atencion')
+
     def __init__(self, id_cliente, tipo, tiempo_llegada):
         self.id = id_cliente
         self.tipo = tipo  # 'A' preferencial, 'M' intermedia, 'B' regular
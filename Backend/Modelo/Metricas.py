@@ -0,0 +1,234 @@
+import math
+
+
+class Welford:
+    """Media y varianza en línea (algoritmo de Welford), memoria O(1)."""
+
+    __slots__ = ('n', 'media', '_m2', 'minimo', 'maximo')
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0
+        self.minimo = None
+        self.maximo = None
+
+    def agregar(self, x):
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self._m2 += delta * (x - self.media)
+        if self.minimo is None or x < self.minimo:
+            self.minimo = x
+        if self.maximo is None or x > self.maximo:
+            self.maximo = x
+
+    @property
+    def varianza(self):
+        # Varianza muestral (n - 1); 0 con menos de dos observaciones
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def desviacion(self):
+        return math.sqrt(self.varianza)
+
+    def como_dict(self):
+        return {
+            'n': self.n,
+            'media': self.media if self.n else None,
+            'varianza': self.varianza,
+            'desviacion': self.desviacion,
+            'min': self.minimo,
+            'max': self.maximo,
+        }
+
+
+class CuantilP2:
+    """Estimador P² (Jain & Chlamtac) del cuantil `p`, memoria O(1).
+
+    Mantiene cinco marcadores cuyas alturas aproximan los cuantiles
+    0, p/2, p, (1+p)/2 y 1; cada observación ajusta las alturas con una
+    interpolación parabólica. Con menos de cinco observaciones devuelve el
+    cuantil exacto de las vistas.
+    """
+
+    __slots__ = ('p', '_q', '_n', '_deseadas', '_incrementos')
+
+    def __init__(self, p):
+        if not 0 < p < 1:
+            raise ValueError(f"cuantil fuera de (0, 1): {p!r}")
+        self.p = p
+        self._q = []                       # alturas de los marcadores
+        self._n = [0, 1, 2, 3, 4]          # posiciones reales
+        self._deseadas = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self._incrementos = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def agregar(self, x):
+        q = self._q
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        # Celda k donde cae x (ajustando los extremos)
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        n = self._n
+        for i in range(k + 1, 5):
+            n[i] += 1
+        deseadas = self._deseadas
+        for i in range(5):
+            deseadas[i] += self._incrementos[i]
+
+        # Ajustar los tres marcadores centrales
+        for i in (1, 2, 3):
+            d = deseadas[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                s = 1 if d > 0 else -1
+                candidato = self._parabolica(i, s)
+                if not q[i - 1] < candidato < q[i + 1]:
+                    candidato = q[i] + s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+                q[i] = candidato
+                n[i] += s
+
+    def _parabolica(self, i, s):
+        q, n = self._q, self._n
+        return q[i] + s / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def valor(self):
+        q = self._q
+        if not q:
+            return None
+        if len(q) < 5:
+            return q[min(len(q) - 1, int(self.p * len(q)))]
+        return q[2]
+
+
+class PromedioTemporal:
+    """Promedio ponderado por tiempo de una función escalonada.
+
+    `actualizar(t, valor)` indica que desde el instante `t` la magnitud vale
+    `valor`; se acumula el área bajo la curva, sin guardar la serie.
+    """
+
+    __slots__ = ('valor', 'maximo', '_t', '_t0', '_area')
+
+    def __init__(self, t0=0, valor=0):
+        self.valor = valor
+        self.maximo = valor
+        self._t = t0
+        self._t0 = t0
+        self._area = 0
+
+    def actualizar(self, t, valor):
+        self._area += self.valor * (t - self._t)
+        self._t = t
+        self.valor = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def sumar(self, t, delta):
+        self.actualizar(t, self.valor + delta)
+
+    def media(self, t_fin):
+        duracion = t_fin - self._t0
+        if duracion <= 0:
+            return 0.0
+        return (self._area + self.valor * (t_fin - self._t)) / duracion
+
+
+class MetricasSimulacion:
+    """Métricas en línea de una corrida, actualizadas evento a evento.
+
+    Por tipo de cliente: espera (inicio de atención - llegada) y servicio
+    (ticks en ventanilla) con media/varianza de Welford y cuantiles P²;
+    largo de cada carril promediado en el tiempo; utilización de las
+    ventanillas por tipo. La memoria no depende de la duración de la
+    corrida, así que sirve aunque no se guarde el historial.
+
+    Los clientes que siguen en cola al cerrar no entran en la espera
+    (su espera queda censurada); sí cuentan en el largo de cola.
+    """
+
+    CUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, tipos, ventanillas, cuantiles=CUANTILES):
+        self.cuantiles = tuple(cuantiles)
+        self.espera = {t: Welford() for t in tipos}
+        self.servicio = {t: Welford() for t in tipos}
+        self.espera_cuantiles = {t: [CuantilP2(p) for p in self.cuantiles] for t in tipos}
+        self.servicio_cuantiles = {t: [CuantilP2(p) for p in self.cuantiles] for t in tipos}
+        self.cola = {t: PromedioTemporal() for t in tipos}
+        self.cola_total = PromedioTemporal()
+
+        self._tipo_ventanilla = [v.tipo for v in ventanillas]
+        self.capacidad = {}
+        for tipo in self._tipo_ventanilla:
+            self.capacidad[tipo] = self.capacidad.get(tipo, 0) + 1
+        self.ocupadas = {t: PromedioTemporal() for t in self.capacidad}
+
+    # ---------------------------
+    # Eventos
+    # ---------------------------
+    def llegada(self, t, tipo):
+        self.cola[tipo].sumar(t, 1)
+        self.cola_total.sumar(t, 1)
+
+    def inicio_atencion(self, t, cliente, j):
+        tipo = cliente.tipo
+        self.cola[tipo].sumar(t, -1)
+        self.cola_total.sumar(t, -1)
+        espera = t - cliente.tiempo_llegada
+        self.espera[tipo].agregar(espera)
+        for q in self.espera_cuantiles[tipo]:
+            q.agregar(espera)
+        self.ocupadas[self._tipo_ventanilla[j]].sumar(t, 1)
+
+    def abandono(self, t, tipo):
+        # El que abandona deja la cola; su espera queda censurada (no se promedia)
+        self.cola[tipo].sumar(t, -1)
+        self.cola_total.sumar(t, -1)
+
+    def fin_atencion(self, t, cliente, j):
+        tipo = cliente.tipo
+        servicio = t - cliente.tiempo_inicio_atencion + 1
+        self.servicio[tipo].agregar(servicio)
+        for q in self.servicio_cuantiles[tipo]:
+            q.agregar(servicio)
+        # La ventanilla queda ocupada durante todo el tick `t`
+        self.ocupadas[self._tipo_ventanilla[j]].sumar(t + 1, -1)
+
+    # ---------------------------
+    # Resumen
+    # ---------------------------
+    def _resumen_muestra(self, welford, cuantiles):
+        datos = welford.como_dict()
+        for q in cuantiles:
+            datos[f"p{round(q.p * 100):g}"] = q.valor()
+        return datos
+
+    def resumen(self, t_fin):
+        """Dict serializable con las métricas hasta el instante `t_fin`."""
+        return {
+            'espera': {t: self._resumen_muestra(w, self.espera_cuantiles[t])
+                       for t, w in self.espera.items()},
+            'servicio': {t: self._resumen_muestra(w, self.servicio_cuantiles[t])
+                         for t, w in self.servicio.items()},
+            'largo_cola': {
+                **{t: {'media': c.media(t_fin), 'max': c.maximo} for t, c in self.cola.items()},
+                'total': {'media': self.cola_total.media(t_fin), 'max': self.cola_total.maximo},
+            },
+            'utilizacion': {t: o.media(t_fin) / self.capacidad[t] for t, o in self.ocupadas.items()},
+        }
@@ -1,13 +1,180 @@
+import heapq
+import io
+import math
+import pickle
 import random
+import threading
+import time
+from array import array
+from collections.abc import Mapping
+from operator import itemgetter
 from Modelo.Cliente import Cliente
+from Modelo.Tabla_clientes import TablaClientes
 from Tda.Ventanillas import Ventanilla
-from Tda.Cola_prioridad import ColaPrioridadGlobal
-from Tda.Lista_historial import ListaEnlazadaHistorial
+from Tda.Cola_prioridad import ColaPrioridadGlobal, ColaPrioridadCompacta
+from Tda.Lista_historial import ListaEnlazadaHistorial, HistorialCompacto
+from Tda.Buffer_circular import BufferCircular
+from Tda.Log_eventos import LogEventos
+from Tda.Rueda_temporal import RuedaTemporal
+from Modelo.Metricas import MetricasSimulacion
+from config import instrumentacion
+
+# Motores de ejecución disponibles
+MOTOR_TICKS = 'ticks'
+MOTOR_EVENTOS = 'eventos'
+MOTORES = (MOTOR_TICKS, MOTOR_EVENTOS)
+
+# Fases dentro de un mismo tick (mismo orden que el motor por ticks). Los
+# abandonos van primero; -1 también es la última serie de `series_fases`
+FASE_ABANDONO = -1
+FASE_LLEGADA = 0
+FASE_ASIGNACION = 1
+FASE_FINALIZACION = 2
+
+# Políticas de despacho de ventanillas libres
+POLITICA_ESTRICTA = 'estricta'      # sólo atiende clientes de su tipo
+POLITICA_ROBO = 'robo'              # si no hay de su tipo, el de mayor prioridad
+POLITICA_COLA_LARGA = 'cola_larga'  # si no hay de su tipo, del carril más largo
+POLITICAS = (POLITICA_ESTRICTA, POLITICA_ROBO, POLITICA_COLA_LARGA)
+
+# Topología por defecto: una ventanilla por tipo
+TOPOLOGIA_BASE = {'A': 1, 'M': 1, 'B': 1}
+NOMBRES_VENTANILLA = {'A': 'V_Preferencial', 'M': 'V_Intermedia', 'B': 'V_Regular'}
+
+# Versión del formato de snapshot()
+VERSION_SNAPSHOT = 1
+# Versión de la dinámica del simulador: subirla cuando un cambio altere los
+# resultados de una misma semilla (invalida el cache de resultados)
+VERSION_MOTOR = 1
+# Parámetros que se pueden cambiar al restaurar un snapshot (escenarios "qué pasa si")
+CAMBIOS_RESTAURABLES = ('tiempo_total', 'prob_llegada', 'prob_servicio', 'ticks_por_segundo', 'semilla')
+
+
+class _CargadorSnapshot(pickle.Unpickler):
+    """Unpickler que sólo admite tipos básicos y las clases de métricas:
+    un snapshot recibido por HTTP no puede instanciar nada más."""
+
+    PERMITIDAS = {('Modelo.Metricas', n) for n in
+                  ('MetricasSimulacion', 'Welford', 'CuantilP2', 'PromedioTemporal')}
+
+    def find_class(self, modulo, nombre):
+        if (modulo, nombre) in self.PERMITIDAS:
+            return super().find_class(modulo, nombre)
+        raise pickle.UnpicklingError(f"clase no permitida en snapshot: {modulo}.{nombre}")
+
+
+# ------------------------
+# FUENTES DE LLEGADAS
+# ------------------------
+class FuenteLlegadas:
+    """Origen de las llegadas de una corrida.
+
+    El motor por ticks llama `generar(t, registrar)` una vez por tick, en
+    orden; `registrar(t, tipo)` da de alta al cliente. El motor de eventos
+    agenda cada flujo de `flujos()` en el tick `siguiente(desde, flujo)`
+    (primer tick con llegadas > `desde`, o None) y al llegar a ese tick
+    pide los tipos con `llegada(t, flujo)`. Ambos caminos deben producir
+    las mismas llegadas en el mismo orden.
+    """
+
+    # Sólo las llegadas aleatorias dependen de prob_llegada y de la semilla
+    aleatoria = False
+
+    def flujos(self):
+        raise NotImplementedError
+
+    def generar(self, t, registrar):
+        raise NotImplementedError
+
+    def siguiente(self, desde, flujo):
+        raise NotImplementedError
+
+    def llegada(self, t, flujo):
+        raise NotImplementedError
+
+    def estado(self):
+        """Datos (tipos básicos) para reabrir la fuente desde un snapshot."""
+        return None
+
+
+class FuenteAleatoria(FuenteLlegadas):
+    """Llegadas Bernoulli(prob_llegada) por tipo y tick, con el generador del simulador.
+
+    Lee `prob_llegada` del simulador en cada llamada, así que los cambios
+    de escenario (`restaurar(..., prob_llegada=...)`) se aplican solos. En
+    el motor de eventos hay un flujo por tipo con huecos Geométrica(p).
+    """
+
+    aleatoria = True
+
+    def __init__(self, sim):
+        self.sim = sim
+
+    def flujos(self):
+        return range(len(self.sim._tipos_llegada))
+
+    def generar(self, t, registrar):
+        aleatorio = self.sim.rng.random
+        for tipo, p in self.sim.prob_llegada.items():
+            if aleatorio() < p:
+                registrar(t, tipo)
+
+    def siguiente(self, desde, flujo):
+        sim = self.sim
+        hueco = sim._geometrica(sim.prob_llegada[sim._tipos_llegada[flujo]])
+        return None if hueco is None else desde + hueco
+
+    def llegada(self, t, flujo):
+        return (self.sim._tipos_llegada[flujo],)
+
+
+# ------------------------
+# RESULTADO DE UNA CORRIDA
+# ------------------------
+class ResultadoCorrida(Mapping):
+    """Lo que devuelve `run()`: un dict de sólo lectura con 'estadisticas',
+    'historial', 'cola_prioridad', 'logs' y 'metricas'.
+
+    Estadísticas, logs y métricas ya están calculados; el historial y la
+    cola se listan (y se guardan) recién la primera vez que se piden, así
+    un barrido o un acierto de cache no pagan O(n) por datos que no usan.
+    """
+
+    CLAVES = ('estadisticas', 'historial', 'cola_prioridad', 'logs', 'metricas')
+
+    def __init__(self, sim, metricas):
+        self._sim = sim
+        self._datos = {'estadisticas': sim.stats, 'logs': sim.logs, 'metricas': metricas}
+
+    def __getitem__(self, clave):
+        if clave not in self._datos:
+            if clave == 'historial':
+                self._datos[clave] = self._sim.historial.to_list()
+            elif clave == 'cola_prioridad':
+                self._datos[clave] = self._sim.cola_prioridad.ver_lista()
+            else:
+                raise KeyError(clave)
+        return self._datos[clave]
+
+    def __iter__(self):
+        return iter(self.CLAVES)
+
+    def __len__(self):
+        return len(self.CLAVES)
+
 
 class SimuladorBanco:
-    def __init__(self, tiempo_total_ticks, prob_llegada, prob_servicio):
+    def __init__(self, tiempo_total_ticks, prob_llegada, prob_servicio, motor=MOTOR_TICKS,
+                 capacidad_eventos=4096, ticks_por_segundo=None, topologia=None,
+                 politica=POLITICA_ESTRICTA, guardar_historial=True, semilla=None,
+                 compacto=False, fuente=None, prob_abandono=None):
+
+        if motor not in MOTORES:
+            raise ValueError(f"motor desconocido: {motor!r} (opciones: {', '.join(MOTORES)})")
+        if politica not in POLITICAS:
+            raise ValueError(f"politica desconocida: {politica!r} (opciones: {', '.join(POLITICAS)})")
 
-        # Guarda paerametros iniciales 
+        # Guarda paerametros iniciales
         self.parametros_iniciales = {
             "tiempo_total": tiempo_total_ticks,
             "prob_llegada": prob_llegada.copy(),
@@ -17,155 +184,761 @@ class SimuladorBanco:
         self.tiempo_total = tiempo_total_ticks
         self.prob_llegada = prob_llegada
         self.prob_servicio = prob_servicio
+        # Paciencia por tipo: cada tick en cola el cliente abandona con esta
+        # probabilidad (paciencia Geométrica, media 1/p); sin entrada, no abandona
+        self.prob_abandono = dict(prob_abandono or {})
+        self.motor = motor
+        self.capacidad_eventos = capacidad_eventos
+
+        # Generador propio: con la misma `semilla` la corrida es reproducible
+        # y no depende del estado global de `random`
+        self.semilla = semilla
+        self.rng = random.Random(semilla)
+
+        # Estados Pausas y Detener (sin espera activa)
+        self._en_marcha = threading.Event()   # limpio mientras está pausada
+        self._en_marcha.set()
+        self._en_pausa = threading.Event()    # el hilo de run() confirma la pausa
+        self._detenido = threading.Event()
 
-        # Estados Pausas y Detener
-        self.pausado = False
-        self.detener = False
+        # Ritmo: None = lo más rápido posible; n = n ticks por segundo reales
+        self.ticks_por_segundo = ticks_por_segundo
+        self._ritmo_base = None
+        self.tick = 0
+        self.corrida = None        # id de la corrida (etiqueta de instrumentación)
+        self._avance = None        # (cada_ticks, callback) de observar_avance()
+        self._siguiente_tick = 0   # próximo tick a ejecutar (motor por ticks)
 
-        self.cola_prioridad = ColaPrioridadGlobal()
-        self.historial = ListaEnlazadaHistorial()
+        # Agenda del motor de eventos; vive en la instancia para poder
+        # hacer snapshot y continuar una corrida detenida
+        self._agenda = None
+        self._despachos = set()
+        self._revisiones = set()   # ticks con revisión de abandonos agendada
+        self._tipos_llegada = list(prob_llegada)   # índice de tipo en la agenda
 
-        self.ventanillas = [
-            Ventanilla('A', 'V_Preferencial'),
-            Ventanilla('M', 'V_Intermedia'),
-            Ventanilla('B', 'V_Regular'),
-        ]
+        # Origen de las llegadas: aleatorio (prob_llegada) o una traza
+        # (Modelo.Traza_llegadas) reproducida tal cual
+        if fuente is None:
+            fuente = FuenteAleatoria(self)
+        elif not set(getattr(fuente, 'tipos', ())) <= set(ColaPrioridadGlobal.prioridad_val):
+            raise ValueError(f"la fuente trae tipos desconocidos: {fuente.tipos}")
+        self.fuente = fuente
+
+        # Modo compacto (corridas grandes): los clientes viven en una tabla
+        # columnar y cola / historial guardan sólo números de fila
+        if compacto:
+            self.clientes = TablaClientes()
+            self.cola_prioridad = ColaPrioridadCompacta(self.clientes)
+            self.historial = HistorialCompacto(self.clientes)
+        else:
+            self.clientes = None
+            self.cola_prioridad = ColaPrioridadGlobal()
+            self.historial = ListaEnlazadaHistorial()
+        # False = no retener los clientes atendidos (las métricas en línea
+        # siguen disponibles); útil en corridas muy largas
+        self.guardar_historial = guardar_historial
+
+        # Topología: cantidad de ventanillas por tipo
+        self.topologia = dict(TOPOLOGIA_BASE if topologia is None else topologia)
+        self.politica = politica
+        self.ventanillas = self._crear_ventanillas(self.topologia)
+
+        # Índices de ventanillas libres por tipo (heap de índices) y heap de
+        # ocupadas por tick de fin `(fin, indice)`: despachar y finalizar
+        # cuestan O(log n) por evento en lugar de recorrer todas las ventanillas.
+        self._libres = {tipo: [] for tipo in ColaPrioridadGlobal.prioridad_val}
+        for j, v in enumerate(self.ventanillas):
+            self._libres[v.tipo].append(j)
+        self._ocupadas = []
+
+        # Vencimientos de paciencia: `(seq en la cola, cliente)` por tick de
+        # abandono. Los ya atendidos se descartan al vencer
+        self._abandonos = RuedaTemporal()
 
         self.stats = {
-            'A': {'llegaron': 0, 'atendidos': 0, 'no_atendidos': 0},
-            'M': {'llegaron': 0, 'atendidos': 0, 'no_atendidos': 0},
-            'B': {'llegaron': 0, 'atendidos': 0, 'no_atendidos': 0}
+            'A': {'llegaron': 0, 'atendidos': 0, 'no_atendidos': 0, 'abandonaron': 0},
+            'M': {'llegaron': 0, 'atendidos': 0, 'no_atendidos': 0, 'abandonaron': 0},
+            'B': {'llegaron': 0, 'atendidos': 0, 'no_atendidos': 0, 'abandonaron': 0}
         }
 
+        self.metricas = MetricasSimulacion(ColaPrioridadGlobal.prioridad_val, self.ventanillas)
+
         self.next_id = 1
-        self.logs = []
+        self.logs = LogEventos(self.ventanillas)
+        # Índices de los últimos eventos del log para streaming (SSE); acotado
+        self.eventos = BufferCircular(capacidad_eventos)
+
 
-   
     # Metodo pausar simulacion
-    
+
     def pausar(self):
-        self.pausado = True
+        self._en_marcha.clear()
+
 
-   
     # Metodo reanudar simulacion
- 
+
     def reanudar(self):
-        self.pausado = False
+        self._en_marcha.set()
+
 
-   
     # Metodo detener simulacion
- 
+
     def detener_simulacion(self):
-        self.detener = True
+        self._detenido.set()
+        self._en_marcha.set()  # despierta a run() si estaba pausada
+
+    @property
+    def pausado(self):
+        return not self._en_marcha.is_set()
+
+    @property
+    def detener(self):
+        return self._detenido.is_set()
+
+    def esperar_pausa(self, timeout=None):
+        """Espera a que run() confirme que quedó pausada. Devuelve True si lo hizo."""
+        return self._en_pausa.wait(timeout)
+
+    def observar_avance(self, cada_ticks, callback):
+        """Llama `callback(tick, instantanea())` cada `cada_ticks` ticks
+        simulados, desde el hilo de run(). El callback no debe bloquear
+        (p. ej. encolar en `EscritorDiferido`). None desactiva."""
+        self._avance = (cada_ticks, callback) if callback is not None else None
+
+    def instantanea(self):
+        """Foto barata de los contadores: {tipo: {'llegaron', 'atendidos', 'en_cola'}}."""
+        cola = self.cola_prioridad
+        return {tipo: {'llegaron': dato['llegaron'], 'atendidos': dato['atendidos'],
+                       'en_cola': cola.tamaño_de_tipo(tipo)}
+                for tipo, dato in self.stats.items()}
+
+    def fijar_ritmo(self, ticks_por_segundo):
+        """Cambia el ritmo en caliente (None = lo más rápido posible)."""
+        self.ticks_por_segundo = ticks_por_segundo
+        self._ritmo_base = None
+
 
-   
     # Metodo restaurar a parametros iniciales
-    
+
     def restaurar_parametros(self):
         self.tiempo_total = self.parametros_iniciales["tiempo_total"]
         self.prob_llegada = self.parametros_iniciales["prob_llegada"].copy()
         self.prob_servicio = self.parametros_iniciales["prob_servicio"].copy()
 
+    # ------------------------
+    # TOPOLOGÍA
+    # ------------------------
+    @staticmethod
+    def _crear_ventanillas(topologia):
+        """Crea las ventanillas en orden de prioridad de tipo.
+
+        Con una sola ventanilla de un tipo se conserva el nombre histórico
+        (p. ej. 'V_Preferencial'); con varias se numeran ('V_Preferencial_2').
+        """
+        desconocidos = set(topologia) - set(ColaPrioridadGlobal.prioridad_val)
+        if desconocidos:
+            raise ValueError(f"tipos de ventanilla desconocidos: {sorted(desconocidos)}")
+        ventanillas = []
+        for tipo in sorted(topologia, key=ColaPrioridadGlobal.prioridad_val.get):
+            n = topologia[tipo]
+            if not isinstance(n, int) or n < 0:
+                raise ValueError(f"cantidad de ventanillas inválida para {tipo}: {n!r}")
+            base = NOMBRES_VENTANILLA[tipo]
+            for k in range(1, n + 1):
+                ventanillas.append(Ventanilla(tipo, base if n == 1 else f"{base}_{k}"))
+        return ventanillas
+
+    # ------------------------
+    # MUESTREO GEOMÉTRICO
+    # ------------------------
+    def _geometrica(self, p):
+        """Número de ensayos Bernoulli(p) hasta el primer éxito (>= 1).
+
+        Se muestrea por inversión con un único número aleatorio en lugar de
+        simular ensayo por ensayo. Devuelve None si `p <= 0` (nunca ocurre).
+        """
+        if p >= 1:
+            return 1
+        if p <= 0:
+            return None
+        return int(math.log(1.0 - self.rng.random()) / math.log1p(-p)) + 1
+
+    # ------------------------
+    # EVENTOS ELEMENTALES
+    # ------------------------
+    def _num(self, cliente):
+        # "C<n>" -> n, para guardar el id como entero en el log
+        if self.clientes is not None:
+            return cliente.fila + 1
+        return int(cliente.id[1:])
+
+    def _registrar_llegada(self, t, tipo):
+        num = self.next_id
+        self.next_id += 1
+        if self.clientes is not None:
+            c = self.clientes.vista(self.clientes.agregar(tipo, t))
+        else:
+            c = Cliente(f"C{num}", tipo, t)
+        seq = self.cola_prioridad.encolar(c)
+        if self.prob_abandono:
+            paciencia = self._geometrica(self.prob_abandono.get(tipo, 0))
+            if paciencia is not None:
+                self._abandonos.insertar(t + paciencia, (seq, c))
+        self.stats[tipo]['llegaron'] += 1
+        self.metricas.llegada(t, tipo)
+        self.eventos.agregar(self.logs.agregar_llegada(t, num, tipo))
+
+    def _atender(self, t, j, cliente):
+        """Asigna `cliente` a la ventanilla libre `j`. Devuelve la duración."""
+        v = self.ventanillas[j]
+        dur = self.sample_service_duration(cliente.tipo)
+        cliente.tiempo_inicio_atencion = t
+        v.asignar(cliente, dur)
+        heapq.heappush(self._ocupadas, (t + dur - 1, j))
+        self.metricas.inicio_atencion(t, cliente, j)
+        self.eventos.agregar(self.logs.agregar_asignacion(t, self._num(cliente), cliente.tipo, j, dur))
+        return dur
+
+    def _finalizar(self, t, j):
+        v = self.ventanillas[j]
+        finalizado = v.liberar()
+        heapq.heappush(self._libres[v.tipo], j)
+        finalizado.tiempo_fin_atencion = t
+        if self.guardar_historial:
+            self.historial.insertar_final(finalizado)
+        self.stats[finalizado.tipo]['atendidos'] += 1
+        self.metricas.fin_atencion(t, finalizado, j)
+        dur = t - finalizado.tiempo_inicio_atencion + 1
+        self.eventos.agregar(self.logs.agregar_finalizacion(t, self._num(finalizado), finalizado.tipo, j, dur))
+
+    def _abandonar(self, t, cliente):
+        self.stats[cliente.tipo]['abandonaron'] += 1
+        self.metricas.abandono(t, cliente.tipo)
+        espera = t - cliente.tiempo_llegada
+        self.eventos.agregar(self.logs.agregar_abandono(t, self._num(cliente), cliente.tipo, espera))
+
+    def leer_eventos(self, cursor, limite=None):
+        """Lee del buffer de streaming: `(pares, siguiente_cursor, perdidos)`.
+
+        Los pares son `(cursor, evento)` con el evento ya como dict.
+        """
+        pares, siguiente, perdidos = self.eventos.leer_desde(cursor, limite)
+        pares = [(c, self.logs.vista(e) if isinstance(e, int) else e) for c, e in pares]
+        return pares, siguiente, perdidos
+
     # ------------------------
     # LLEGADAS
     # ------------------------
     def generar_llegadas(self, t):
-        for tipo, p in self.prob_llegada.items():
-            if random.random() < p:
-                cid = f"C{self.next_id}"
-                self.next_id += 1
-                c = Cliente(cid, tipo, t)
-                self.cola_prioridad.encolar(c)
-                self.stats[tipo]['llegaron'] += 1
-                self.logs.append({
-                    'tick': t,
-                    'event': 'llegada',
-                    'cliente': {'id': c.id, 'tipo': c.tipo, 'llegada': c.tiempo_llegada}
-                })
+        self.fuente.generar(t, self._registrar_llegada)
+
+    # ------------------------
+    # ABANDONOS
+    # ------------------------
+    def procesar_abandonos(self, t):
+        """Retira de la cola a los clientes cuya paciencia vence en `t`.
+
+        La rueda entrega los vencimientos sin recorrer la cola; los de
+        clientes ya atendidos se descartan (`retirar` devuelve False). Se
+        procesan en orden de llegada para que ambos motores coincidan.
+        """
+        vencidos = self._abandonos.avanzar(t)
+        if len(vencidos) > 1:
+            vencidos.sort(key=itemgetter(0))
+        cola = self.cola_prioridad
+        for seq, cliente in vencidos:
+            if cola.retirar(seq, cliente.tipo):
+                self._abandonar(t, cliente)
 
     # ------------------------
     # TIEMPO DE SERVICIO
     # ------------------------
     def sample_service_duration(self, tipo):
-        p = self.prob_servicio[tipo]
-        trials = 1
-        while random.random() > p:
-            trials += 1
-        return trials
+        dur = self._geometrica(self.prob_servicio[tipo])
+        if dur is None:
+            # Con p = 0 el servicio nunca termina dentro del horizonte
+            return self.tiempo_total + 1
+        return dur
 
     # ------------------------
     # ASIGNAR A VENTANILLAS
     # ------------------------
+    def _puede_despachar(self, tipo=None):
+        """¿Hay alguna ventanilla libre que pueda atender un cliente de `tipo`
+        (o de cualquier tipo si es None) según la política?"""
+        if tipo is not None and self.politica == POLITICA_ESTRICTA:
+            return bool(self._libres[tipo])
+        return any(self._libres.values())
+
+    def _cliente_ajeno(self):
+        """Cliente de otro carril para una ventanilla sin clientes de su tipo."""
+        cola = self.cola_prioridad
+        if self.politica == POLITICA_ROBO:
+            return cola.extraer_siguiente()
+        # POLITICA_COLA_LARGA: descargar el carril con más espera (equivale a
+        # mandar cada cliente a la fila más corta cuando la cola es compartida)
+        tipo = max(cola.prioridad_val, key=cola.tamaño_de_tipo)
+        return cola.extraer_siguiente_de_tipo(tipo)
+
     def asignar_ventanillas(self, t):
-        for v in self.ventanillas:
-            if v.libre:
-                cliente = self.cola_prioridad.extraer_siguiente_de_tipo(v.tipo)
-                if cliente:
-                    dur = self.sample_service_duration(v.tipo)
-                    cliente.tiempo_inicio_atencion = t
-                    v.asignar(cliente, dur)
-                    self.logs.append({
-                        'tick': t,
-                        'event': 'asignacion',
-                        'ventanilla': {'nombre': v.nombre, 'tipo': v.tipo},
-                        'cliente': {'id': cliente.id, 'tipo': cliente.tipo},
-                        'duracion': dur
-                    })
+        cola = self.cola_prioridad
+        # 1) Cada tipo atiende primero su propio carril
+        for tipo, libres in self._libres.items():
+            while libres and cola.tamaño_de_tipo(tipo):
+                self._atender(t, heapq.heappop(libres), cola.extraer_siguiente_de_tipo(tipo))
+
+        # 2) Con robo / cola_larga, las que siguen libres toman de otros carriles
+        if self.politica != POLITICA_ESTRICTA:
+            for libres in self._libres.values():
+                while libres and cola.tamaño():
+                    self._atender(t, heapq.heappop(libres), self._cliente_ajeno())
 
     # ------------------------
     # PROCESAR VENTANILLAS
     # ------------------------
     def procesar_ventanillas(self, t):
-        for v in self.ventanillas:
-            finalizado = v.procesar_tick()
-            if finalizado:
-                finalizado.tiempo_fin_atencion = t
-                self.historial.insertar_final(finalizado)
-                self.stats[finalizado.tipo]['atendidos'] += 1
-                self.logs.append({
-                    'tick': t,
-                    'event': 'finalizacion',
-                    'cliente': {'id': finalizado.id, 'tipo': finalizado.tipo},
-                    'inicio': finalizado.tiempo_inicio_atencion,
-                    'fin': finalizado.tiempo_fin_atencion
-                })
+        ocupadas = self._ocupadas
+        while ocupadas and ocupadas[0][0] <= t:
+            _, j = heapq.heappop(ocupadas)
+            self._finalizar(t, j)
+
+    # ------------------------
+    # PAUSA Y RITMO
+    # ------------------------
+    def _punto_de_control(self):
+        """Bloquea (sin consumir CPU) mientras esté pausada.
+
+        Devuelve False si hay que detener la simulación.
+        """
+        if self._detenido.is_set():
+            return False
+        if not self._en_marcha.is_set():
+            self._en_pausa.set()
+            self._en_marcha.wait()
+            self._en_pausa.clear()
+            self._ritmo_base = None
+            return not self._detenido.is_set()
+        return True
+
+    def _esperar_ritmo(self, t):
+        """Con `ticks_por_segundo`, duerme hasta la hora real del tick `t`.
+
+        Duerme en tramos cortos para reaccionar a pausar/detener.
+        """
+        tps = self.ticks_por_segundo
+        if not tps:
+            return
+        ahora = time.monotonic()
+        if self._ritmo_base is None:
+            self._ritmo_base = (ahora, t)
+            return
+        inicio, t0 = self._ritmo_base
+        espera = inicio + (t - t0) / tps - ahora
+        while espera > 0 and self._en_marcha.is_set() and not self._detenido.is_set():
+            self._detenido.wait(min(espera, 0.1))
+            espera = inicio + (t - t0) / tps - time.monotonic()
 
     # ------------------------
     # EJECUTAR SIMULACIÓN
     # ------------------------
     def run(self):
+        # Con la instrumentación desactivada `fases` es None y el costo es nulo
+        fases = instrumentacion.series_fases(self.corrida, self.motor)
+        tick_inicial = self._siguiente_tick
+        if self.motor == MOTOR_EVENTOS:
+            self._run_eventos(fases)
+            self._siguiente_tick = self.tick + 1
+        else:
+            self._run_ticks(fases)
+        if fases is not None:
+            instrumentacion.TICKS.inc(max(0, self._siguiente_tick - tick_inicial),
+                                      corrida=self.corrida or 'sin_id', motor=self.motor)
+        return self._cerrar()
 
-        for t in range(self.tiempo_total):
+    def _run_ticks(self, fases=None):
+        if fases is not None:
+            reloj = time.perf_counter
+            llegadas, asignacion, proceso, abandonos = (f.observar for f in fases)
+        con_abandonos = bool(self.prob_abandono)
+        avance = self._avance
+        if avance is not None:
+            cada, notificar = avance
+            proximo_avance = self._siguiente_tick + cada - 1
 
-            
-            # DETENIDA → parar
-          
-            if self.detener:
-                break
+        for t in range(self._siguiente_tick, self.tiempo_total):
 
-          
-            #  PAUSADA → esperar
-            
-            while self.pausado:
-                pass  
+            # Ritmo real (opcional), luego DETENIDA → parar / PAUSADA → esperar
+            self._esperar_ritmo(t)
+            if not self._punto_de_control():
+                break
 
             # Programa normal
-            self.generar_llegadas(t)
-            self.asignar_ventanillas(t)
-            self.procesar_ventanillas(t)
+            self.tick = t
+            if fases is None:
+                if con_abandonos:
+                    self.procesar_abandonos(t)
+                self.generar_llegadas(t)
+                self.asignar_ventanillas(t)
+                self.procesar_ventanillas(t)
+            else:
+                if con_abandonos:
+                    t0 = reloj()
+                    self.procesar_abandonos(t)
+                    abandonos(reloj() - t0)
+                t0 = reloj()
+                self.generar_llegadas(t)
+                t1 = reloj()
+                self.asignar_ventanillas(t)
+                t2 = reloj()
+                self.procesar_ventanillas(t)
+                t3 = reloj()
+                llegadas(t1 - t0)
+                asignacion(t2 - t1)
+                proceso(t3 - t2)
+            self._siguiente_tick = t + 1
+            if avance is not None and t >= proximo_avance:
+                proximo_avance = t + cada
+                notificar(t, self.instantanea())
 
-        # NO ATENDIDOS
-        restantes = self.cola_prioridad._lista
-        for _, _, c in restantes:
+    def _run_eventos(self, fases=None):
+        """Motor de eventos discretos sobre heaps de eventos futuros.
+
+        Produce la misma dinámica (y el mismo orden de logs dentro de un tick)
+        que `_run_ticks`, pero salta directamente al siguiente evento:
+        - los huecos entre llegadas de cada tipo son Geométrica(prob_llegada)
+          (o los ticks de la traza, con otra `fuente`),
+        - una ventanilla que termina en t puede volver a atender en t + 1,
+        - un servicio de duración d asignado en t termina en t + d - 1,
+        - los abandonos de un tick se revisan antes que sus llegadas.
+
+        `self._agenda` guarda `(tick, fase, indice)` de llegadas (indice =
+        flujo de la fuente), despachos y revisiones de abandono (en la cota
+        que da `RuedaTemporal.proximo()`); las finalizaciones salen de `self._ocupadas`, que
+        es la misma estructura que usa el motor por ticks. Dentro de un tick
+        la finalización es la última fase, así que sólo se atiende cuando no
+        quedan llegadas ni despachos en ese tick. Si la agenda ya existe (una
+        corrida detenida o restaurada) se continúa desde ella.
+
+        Con `fases` (instrumentación activa) se mide cada evento en la serie
+        de la fase equivalente del motor por ticks.
+        """
+        total = self.tiempo_total
+        if self._agenda is None:
+            self._agenda = []
+            for i in self.fuente.flujos():
+                self._programar_llegada(-1, i)
+        if self.prob_abandono:
+            self._programar_abandono()
+        agenda = self._agenda
+        ocupadas = self._ocupadas
+        avance = self._avance
+        if avance is not None:
+            cada, notificar = avance
+            proximo_avance = self.tick + cada
+
+        while True:
+            t_evento = agenda[0][0] if agenda else total
+            t_fin = ocupadas[0][0] if ocupadas else total
+            t = min(t_evento, t_fin)
+            if t >= total:
+                # Sin más eventos: el reloj llega al final, como en `_run_ticks`
+                self.tick = max(self.tick, total - 1)
+                break
+
+            self._esperar_ritmo(t)
+            if not self._punto_de_control():
+                break
+            self.tick = t
+            if fases is not None:
+                inicio = time.perf_counter()
+
+            if t_evento <= t_fin:
+                _, fase, idx = heapq.heappop(agenda)
+                if fase == FASE_LLEGADA:
+                    tipos = self.fuente.llegada(t, idx)
+                    for tipo in tipos:
+                        self._registrar_llegada(t, tipo)
+                    self._programar_llegada(t, idx)
+                    if any(self._puede_despachar(tipo) for tipo in tipos):
+                        self._programar_despacho(t)
+                    if self.prob_abandono:
+                        self._programar_abandono()
+                elif fase == FASE_ABANDONO:
+                    self._revisiones.discard(t)
+                    self.procesar_abandonos(t)
+                    self._programar_abandono()
+                else:
+                    self._despachos.discard(t)
+                    self.asignar_ventanillas(t)
+            else:
+                _, j = heapq.heappop(ocupadas)
+                tipo = self.ventanillas[j].tipo
+                self._finalizar(t, j)
+                if self.politica == POLITICA_ESTRICTA:
+                    pendientes = self.cola_prioridad.tamaño_de_tipo(tipo)
+                else:
+                    pendientes = self.cola_prioridad.tamaño()
+                if pendientes:
+                    self._programar_despacho(t + 1)
+                fase = FASE_FINALIZACION
+
+            if fases is not None:
+                fases[fase].observar(time.perf_counter() - inicio)
+            if avance is not None and t >= proximo_avance:
+                # Foto al llegar al primer evento en o después del umbral
+                proximo_avance = t + cada
+                notificar(t, self.instantanea())
+
+    def _programar_llegada(self, desde, i):
+        t = self.fuente.siguiente(desde, i)
+        if t is not None and t < self.tiempo_total:
+            heapq.heappush(self._agenda, (t, FASE_LLEGADA, i))
+
+    def _programar_despacho(self, t):
+        if t < self.tiempo_total and t not in self._despachos:
+            self._despachos.add(t)
+            heapq.heappush(self._agenda, (t, FASE_ASIGNACION, 0))
+
+    def _programar_abandono(self):
+        """Agenda una revisión en el próximo vencimiento posible de la rueda.
+
+        Los vencimientos anteriores ya se procesaron, así que la cota se
+        acota a `tick + 1` (la rueda puede tener el reloj atrasado).
+        """
+        t = self._abandonos.proximo()
+        if t is None:
+            return
+        t = max(t, self.tick + 1)
+        if t < self.tiempo_total and t not in self._revisiones:
+            self._revisiones.add(t)
+            heapq.heappush(self._agenda, (t, FASE_ABANDONO, 0))
+
+    def _replanificar(self):
+        """Rehace la agenda de eventos tras cambiar horizonte o llegadas.
+
+        Las llegadas son geométricas (sin memoria), así que volver a
+        muestrear el próximo hueco desde el tick actual no altera la
+        distribución; una traza simplemente se vuelve a buscar desde ahí.
+        También se agenda un despacho si quedó alguno pendiente fuera del
+        horizonte anterior.
+        """
+        if self._agenda is None:
+            return
+        self._agenda = [e for e in self._agenda if e[1] != FASE_LLEGADA]
+        heapq.heapify(self._agenda)
+        for i in self.fuente.flujos():
+            self._programar_llegada(self.tick, i)
+        if self.cola_prioridad.tamaño() and any(self._libres.values()):
+            self._programar_despacho(self.tick + 1)
+
+    def _cerrar(self):
+        # NO ATENDIDOS: se recalculan (no se acumulan) para que cerrar de
+        # nuevo una corrida continuada no los cuente dos veces
+        for dato in self.stats.values():
+            dato['no_atendidos'] = 0
+        for c in self.cola_prioridad.clientes():
             self.stats[c.tipo]['no_atendidos'] += 1
 
         for v in self.ventanillas:
             if not v.libre:
-                self.stats[v.tipo]['no_atendidos'] += 1
+                self.stats[v.cliente.tipo]['no_atendidos'] += 1
+
+        metricas = self.resumen_metricas()
+        self.publicar_fin(metricas)
+        return ResultadoCorrida(self, metricas)
+
+    def publicar_fin(self, metricas=None):
+        """Emite el evento 'fin' y cierra el stream. Sirve para una corrida ya
+        terminada (p. ej. restaurada del cache) sin volver a cerrarla."""
+        if metricas is None:
+            metricas = self.resumen_metricas()
+        self.eventos.agregar({'event': 'fin', 'estadisticas': self.stats,
+                              'metricas': metricas})
+        self.eventos.cerrar()
+
+    def resumen_metricas(self):
+        """Métricas en línea hasta el tick actual (sirve también en marcha)."""
+        return self.metricas.resumen(self.tick + 1)
+
+    # ------------------------
+    # SNAPSHOT Y RESTAURACIÓN
+    # ------------------------
+    @staticmethod
+    def _cliente_a_tupla(c):
+        return (c.id, c.tipo, c.tiempo_llegada, c.tiempo_inicio_atencion, c.tiempo_fin_atencion)
+
+    @staticmethod
+    def _tupla_a_cliente(datos):
+        id_cliente, tipo, llegada, inicio, fin = datos
+        c = Cliente(id_cliente, tipo, llegada)
+        c.tiempo_inicio_atencion = inicio
+        c.tiempo_fin_atencion = fin
+        return c
 
-        return {
-            'estadisticas': self.stats,
-            'historial': self.historial.to_list(),
-            'cola_prioridad': self.cola_prioridad.ver_lista(),
-            'logs': self.logs,
+    def snapshot(self):
+        """Estado completo de la corrida como bytes (pickle, protocolo 5).
+
+        Incluye parámetros, estado del generador aleatorio, reloj, cola,
+        ventanillas, contadores, métricas, historial, log y agenda del
+        motor de eventos (con una traza, su ruta y posición, no su
+        contenido); no incluye el buffer de streaming. Debe tomarse
+        con la corrida pausada, detenida o terminada.
+        """
+        a_tupla = self._cliente_a_tupla
+        estado = {
+            'version': VERSION_SNAPSHOT,
+            'parametros': {
+                'tiempo_total': self.tiempo_total,
+                'prob_llegada': dict(self.prob_llegada),
+                'prob_servicio': dict(self.prob_servicio),
+                'motor': self.motor,
+                'capacidad_eventos': self.capacidad_eventos,
+                'ticks_por_segundo': self.ticks_por_segundo,
+                'topologia': dict(self.topologia),
+                'politica': self.politica,
+                'guardar_historial': self.guardar_historial,
+                'semilla': self.semilla,
+                'compacto': self.clientes is not None,
+                'prob_abandono': dict(self.prob_abandono),
+            },
+            'parametros_iniciales': self.parametros_iniciales,
+            'rng': self.rng.getstate(),
+            'tick': self.tick,
+            'siguiente_tick': self._siguiente_tick,
+            'next_id': self.next_id,
+            'stats': self.stats,
+            'libres': self._libres,
+            'ocupadas': self._ocupadas,
+            'agenda': self._agenda,
+            'despachos': self._despachos,
+            'revisiones': self._revisiones,
+            'abandonos': {'actual': self._abandonos.actual,
+                          'entradas': [(t, seq) for t, (seq, _) in self._abandonos.entradas()]},
+            'fuente': self.fuente.estado(),
+            'logs': self.logs.estado(),
+            'metricas': self.metricas,
         }
+        if self.clientes is not None:
+            # Modo compacto: la tabla en bytes y sólo números de fila
+            estado['tabla'] = self.clientes.estado()
+            estado['cola'] = self.cola_prioridad.filas()
+            estado['ventanillas'] = [(v.cliente.fila, v.tiempo_restante) if not v.libre else None
+                                     for v in self.ventanillas]
+            estado['historial'] = self.historial.filas.tobytes()
+        else:
+            estado['cola'] = [(seq, a_tupla(c)) for _, seq, c in self.cola_prioridad]
+            estado['cola_seq'] = self.cola_prioridad._seq
+            estado['ventanillas'] = [(a_tupla(v.cliente), v.tiempo_restante) if not v.libre else None
+                                     for v in self.ventanillas]
+            estado['historial'] = [a_tupla(c) for c in self.historial]
+        return pickle.dumps(estado, protocol=5)
+
+    @classmethod
+    def restaurar(cls, datos, trazas_dir=None, **cambios):
+        """Crea un simulador a partir de `snapshot()` listo para continuar con run().
+
+        `cambios` permite bifurcar un escenario desde el estado ya caliente:
+        tiempo_total, prob_llegada, prob_servicio, ticks_por_segundo o
+        semilla (re-siembra el generador). Un snapshot con llegadas de una
+        traza sólo se restaura si la traza está en `trazas_dir`. Lanza
+        ValueError si el snapshot es inválido o el cambio no está permitido.
+        """
+        desconocidos = set(cambios) - set(CAMBIOS_RESTAURABLES)
+        if desconocidos:
+            raise ValueError(f"no se puede cambiar al restaurar: {sorted(desconocidos)}")
+        try:
+            estado = _CargadorSnapshot(io.BytesIO(datos)).load()
+        except Exception as e:
+            raise ValueError(f"snapshot inválido: {e}") from e
+        if not isinstance(estado, dict) or estado.get('version') != VERSION_SNAPSHOT:
+            raise ValueError("versión de snapshot no soportada")
+        # El snapshot puede venir de afuera: una clave faltante o de otro tipo
+        # es un snapshot inválido, no un error del servidor
+        try:
+            sim = cls._reconstruir(estado, trazas_dir)
+        except (KeyError, TypeError, ValueError, AttributeError, IndexError) as e:
+            raise ValueError(f"snapshot inválido: {e}") from e
+
+        if cambios:
+            sim._aplicar_cambios(cambios)
+        return sim
+
+    @classmethod
+    def _reconstruir(cls, estado, trazas_dir):
+        p = estado['parametros']
+        sim = cls(p['tiempo_total'], p['prob_llegada'], p['prob_servicio'], motor=p['motor'],
+                  capacidad_eventos=p['capacidad_eventos'], ticks_por_segundo=p['ticks_por_segundo'],
+                  topologia=p['topologia'], politica=p['politica'],
+                  guardar_historial=p['guardar_historial'], semilla=p['semilla'],
+                  compacto=p.get('compacto', False), prob_abandono=p.get('prob_abandono'))
+        sim.parametros_iniciales = estado['parametros_iniciales']
+        sim.rng.setstate(estado['rng'])
+        sim.tick = estado['tick']
+        sim._siguiente_tick = estado['siguiente_tick']
+        sim.next_id = estado['next_id']
+        sim.stats = estado['stats']
+        for dato in sim.stats.values():
+            dato.setdefault('abandonaron', 0)   # snapshots sin abandonos
+
+        if sim.clientes is not None:
+            tabla = sim.clientes = TablaClientes.desde_estado(estado['tabla'])
+            a_cliente = tabla.vista
+            sim.cola_prioridad = ColaPrioridadCompacta.desde_filas(tabla, estado['cola'])
+            sim.historial = HistorialCompacto(tabla)
+            sim.historial.filas = array('q', estado['historial'])
+            historial = ()
+        else:
+            a_cliente = cls._tupla_a_cliente
+            sim.cola_prioridad = ColaPrioridadGlobal.desde_entradas(
+                ((seq, a_cliente(c)) for seq, c in estado['cola']), estado['cola_seq'])
+            historial = estado['historial']
+        for v, ocupada in zip(sim.ventanillas, estado['ventanillas']):
+            if ocupada is not None:
+                cliente, restante = ocupada
+                v.asignar(a_cliente(cliente), restante)
+        sim._libres = estado['libres']
+        sim._ocupadas = estado['ocupadas']
+        sim._agenda = estado['agenda']
+        sim._despachos = estado['despachos']
+        sim._revisiones = estado.get('revisiones', set())
+        abandonos = estado.get('abandonos')
+        if abandonos is not None:
+            # Sólo se reconstruyen los vencimientos de clientes que siguen en cola
+            if sim.clientes is not None:
+                en_cola = {seq: a_cliente(seq) for seq in sim.cola_prioridad.filas()}
+            else:
+                en_cola = {seq: c for _, seq, c in sim.cola_prioridad}
+            sim._abandonos = RuedaTemporal.desde_entradas(
+                ((t, (seq, en_cola[seq])) for t, seq in abandonos['entradas'] if seq in en_cola),
+                inicio=abandonos['actual'])
+        if estado.get('fuente') is not None:
+            if trazas_dir is None:
+                raise ValueError("el snapshot usa una traza de llegadas y no hay directorio de trazas")
+            # Import tardío: Traza_llegadas depende de este módulo
+            from Modelo.Traza_llegadas import TrazaLlegadas
+            sim.fuente = TrazaLlegadas.desde_estado(estado['fuente'], trazas_dir)
+        for c in historial:
+            sim.historial.insertar_final(a_cliente(c))
+        sim.logs = LogEventos.desde_estado(estado['logs'])
+        sim.metricas = estado['metricas']
+        return sim
+
+    def _aplicar_cambios(self, cambios):
+        if 'semilla' in cambios:
+            self.semilla = cambios['semilla']
+            self.rng.seed(self.semilla)
+        if 'ticks_por_segundo' in cambios:
+            self.fijar_ritmo(cambios['ticks_por_segundo'])
+        if 'prob_servicio' in cambios:
+            self.prob_servicio = dict(cambios['prob_servicio'])
+        replanificar = False
+        if 'tiempo_total' in cambios:
+            self.tiempo_total = cambios['tiempo_total']
+            replanificar = True
+        if 'prob_llegada' in cambios:
+            if set(cambios['prob_llegada']) != set(self.prob_llegada):
+                raise ValueError("prob_llegada debe tener los mismos tipos que el snapshot")
+            self.prob_llegada = {tipo: cambios['prob_llegada'][tipo] for tipo in self.prob_llegada}
+            replanificar = True
+        if replanificar:
+            self._replanificar()
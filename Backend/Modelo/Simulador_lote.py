@@ -0,0 +1,125 @@
+"""Simulación vectorizada (NumPy) de muchas réplicas de `SimuladorBanco`.
+
+Todas las réplicas avanzan juntas tick a tick: las llegadas y las duraciones
+geométricas de servicio se pre-generan como arreglos `(ticks, réplicas, tipos)`
+por bloques, y el estado de cada réplica se reduce a dos matrices
+`(réplicas, tipos)`: clientes en cola y ticks restantes de la ventanilla.
+
+La dinámica es la misma que el motor por ticks de `SimuladorBanco` (una
+ventanilla por tipo que sólo atiende su tipo): en cada tick abandonan los
+impacientes, llegan clientes, se asignan las ventanillas libres y se
+procesa un tick de servicio. Con paciencia Geométrica cada cliente en cola
+abandona con probabilidad `prob_abandono` por tick sin importar cuánto
+esperó, así que los abandonos de un carril son Binomial(cola, p).
+"""
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+# Elementos (tick x réplica x tipo) que se pre-generan como máximo por bloque
+ELEMENTOS_POR_BLOQUE = 1 << 22
+
+
+def _duraciones(rng, p_servicio, forma, tiempo):
+    """Duraciones Geométricas(p) >= 1; con p <= 0 el servicio no termina."""
+    p = np.where(p_servicio > 0, np.minimum(p_servicio, 1.0), 1.0)
+    dur = rng.geometric(p, size=forma)
+    if np.any(p_servicio <= 0):
+        dur[..., p_servicio <= 0] = tiempo + 1
+    return dur
+
+
+def _intervalo(valores, z):
+    n = len(valores)
+    media = float(valores.mean())
+    if n < 2:
+        return media, (media, media)
+    error = z * float(valores.std(ddof=1)) / math.sqrt(n)
+    return media, (media - error, media + error)
+
+
+def simular_lote(n_replicas, tiempo, prob_llegada, prob_servicio, seed=None, confianza=0.95,
+                 prob_abandono=None):
+    """Ejecuta `n_replicas` réplicas independientes y agrega sus estadísticas.
+
+    Devuelve un dict con:
+    - 'replicas': lista con el `stats` de cada réplica (mismo formato que
+      `SimuladorBanco.stats`),
+    - 'medias': media por tipo y campo,
+    - 'intervalos': intervalo de confianza normal `(inf, sup)` por tipo y campo,
+    - 'n_replicas' y 'confianza'.
+    """
+    if n_replicas < 1:
+        raise ValueError("n_replicas debe ser >= 1")
+
+    rng = np.random.default_rng(seed)
+    tipos = list(prob_llegada)
+    p_llegada = np.array([prob_llegada[t] for t in tipos], dtype=float)
+    p_servicio = np.array([prob_servicio[t] for t in tipos], dtype=float)
+    p_abandono = None
+    if prob_abandono:
+        p_abandono = np.clip([prob_abandono.get(t, 0) for t in tipos], 0.0, 1.0)
+
+    forma = (n_replicas, len(tipos))
+    cola = np.zeros(forma, dtype=np.int64)
+    restante = np.zeros(forma, dtype=np.int64)
+    llegaron = np.zeros(forma, dtype=np.int64)
+    atendidos = np.zeros(forma, dtype=np.int64)
+    abandonaron = np.zeros(forma, dtype=np.int64)
+
+    bloque = max(1, ELEMENTOS_POR_BLOQUE // (n_replicas * len(tipos)))
+    for inicio in range(0, tiempo, bloque):
+        n = min(bloque, tiempo - inicio)
+        llegadas = rng.random((n,) + forma) < p_llegada
+        duraciones = _duraciones(rng, p_servicio, (n,) + forma, tiempo)
+
+        for k in range(n):
+            # Abandonos de los que ya esperaban
+            if p_abandono is not None:
+                abandonan = rng.binomial(cola, p_abandono)
+                cola -= abandonan
+                abandonaron += abandonan
+            # Llegadas
+            cola += llegadas[k]
+            llegaron += llegadas[k]
+            # Asignar ventanillas libres con clientes de su tipo en cola
+            asignar = (restante == 0) & (cola > 0)
+            cola -= asignar
+            np.copyto(restante, duraciones[k], where=asignar)
+            # Procesar un tick de servicio
+            ocupado = restante > 0
+            restante -= ocupado
+            atendidos += ocupado & (restante == 0)
+
+    no_atendidos = cola + (restante > 0)
+
+    campos = {'llegaron': llegaron, 'atendidos': atendidos, 'no_atendidos': no_atendidos,
+              'abandonaron': abandonaron}
+    replicas = [
+        {
+            tipo: {campo: int(m[r, i]) for campo, m in campos.items()}
+            for i, tipo in enumerate(tipos)
+        }
+        for r in range(n_replicas)
+    ]
+
+    z = NormalDist().inv_cdf((1 + confianza) / 2)
+    medias = {}
+    intervalos = {}
+    for i, tipo in enumerate(tipos):
+        medias[tipo] = {}
+        intervalos[tipo] = {}
+        for campo, m in campos.items():
+            media, ic = _intervalo(m[:, i], z)
+            medias[tipo][campo] = media
+            intervalos[tipo][campo] = ic
+
+    return {
+        'replicas': replicas,
+        'medias': medias,
+        'intervalos': intervalos,
+        'n_replicas': n_replicas,
+        'confianza': confianza,
+    }
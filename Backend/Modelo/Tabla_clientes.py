@@ -0,0 +1,118 @@
+from array import array
+
+TIPOS = ('A', 'M', 'B')
+CODIGO_TIPO = {tipo: i for i, tipo in enumerate(TIPOS)}
+SIN_TIEMPO = -1   # tiempo_inicio / tiempo_fin aún no asignados (None en Cliente)
+
+
+class TablaClientes:
+    """Clientes de una corrida como columnas (struct-of-arrays).
+
+    Una fila por llegada: tipo (int8), llegada, inicio y fin (int64). El id
+    no se guarda: la fila `i` es el cliente "C<i+1>", igual que la
+    numeración de `SimuladorBanco.next_id`. Cada cliente ocupa 25 bytes en
+    lugar de un objeto `Cliente`; la cola y el historial compactos guardan
+    sólo números de fila y `vista(fila)` entrega un proxy con la misma
+    interfaz que `Cliente`.
+    """
+
+    COLUMNAS = ('tipo', 'llegada', 'inicio', 'fin')
+
+    def __init__(self):
+        self.tipo = array('b')
+        self.llegada = array('q')
+        self.inicio = array('q')
+        self.fin = array('q')
+
+    def agregar(self, tipo, llegada):
+        """Agrega un cliente y devuelve su fila."""
+        self.tipo.append(CODIGO_TIPO[tipo])
+        self.llegada.append(llegada)
+        self.inicio.append(SIN_TIEMPO)
+        self.fin.append(SIN_TIEMPO)
+        return len(self.tipo) - 1
+
+    def __len__(self):
+        return len(self.tipo)
+
+    def vista(self, fila):
+        return ClienteVista(self, fila)
+
+    def a_dict(self, fila):
+        """Dict con el formato de `ListaEnlazadaHistorial._a_dict`, sin crear la vista."""
+        inicio = self.inicio[fila]
+        fin = self.fin[fila]
+        return {
+            'id': f"C{fila + 1}",
+            'tipo': TIPOS[self.tipo[fila]],
+            'llegada': self.llegada[fila],
+            'inicio': None if inicio == SIN_TIEMPO else inicio,
+            'fin': None if fin == SIN_TIEMPO else fin,
+        }
+
+    def memoria_bytes(self):
+        return sum(len(getattr(self, c)) * getattr(self, c).itemsize for c in self.COLUMNAS)
+
+    # ---------------------------
+    # Snapshot
+    # ---------------------------
+    def estado(self):
+        return {c: getattr(self, c).tobytes() for c in self.COLUMNAS}
+
+    @classmethod
+    def desde_estado(cls, estado):
+        tabla = cls()
+        for c in cls.COLUMNAS:
+            getattr(tabla, c).frombytes(estado[c])
+        return tabla
+
+
+class ClienteVista:
+    """Proxy de una fila de `TablaClientes` con la interfaz de `Cliente`."""
+
+    __slots__ = ('tabla', 'fila')
+
+    def __init__(self, tabla, fila):
+        self.tabla = tabla
+        self.fila = fila
+
+    @property
+    def id(self):
+        return f"C{self.fila + 1}"
+
+    @property
+    def tipo(self):
+        return TIPOS[self.tabla.tipo[self.fila]]
+
+    @property
+    def tiempo_llegada(self):
+        return self.tabla.llegada[self.fila]
+
+    @property
+    def tiempo_inicio_atencion(self):
+        t = self.tabla.inicio[self.fila]
+        return None if t == SIN_TIEMPO else t
+
+    @tiempo_inicio_atencion.setter
+    def tiempo_inicio_atencion(self, t):
+        self.tabla.inicio[self.fila] = SIN_TIEMPO if t is None else t
+
+    @property
+    def tiempo_fin_atencion(self):
+        t = self.tabla.fin[self.fila]
+        return None if t == SIN_TIEMPO else t
+
+    @tiempo_fin_atencion.setter
+    def tiempo_fin_atencion(self, t):
+        self.tabla.fin[self.fila] = SIN_TIEMPO if t is None else t
+
+    def __eq__(self, otro):
+        return (isinstance(otro, ClienteVista) and otro.tabla is self.tabla
+                and otro.fila == self.fila)
+
+    def __hash__(self):
+        return hash((id(self.tabla), self.fila))
+
+    def __str__(self):
+        tipo_nombre = {'A': 'Preferencial', 'M': 'Intermedio', 'B': 'Regular'}
+        return f"{self.id} ({tipo_nombre[self.tipo]}) - Llego en t={self.tiempo_llegada}"
@@ -0,0 +1,322 @@
+"""Trazas de llegadas reales en formato binario, leídas con mmap.
+
+Formato (little-endian):
+- cabecera de 32 bytes: firma `TRAZALLG`, versión (u16), tamaño de
+  registro (u16), reservado (u32), cantidad de registros (u64) y los
+  tipos en orden de código (8 bytes ASCII, rellenos con NUL);
+- registros de 8 bytes: un u64 con `tick << 8 | codigo_tipo`, ordenados.
+
+Como cada registro es un solo entero ordenado, el archivo se ve como un
+`memoryview` de u64 sin copiar nada (`cast('Q')`) y buscar el primer
+registro de un tick es una búsqueda binaria sobre él. Dentro de un tick
+las llegadas quedan en orden de código de tipo (A, M, B).
+
+`TrazaLlegadas` es una `FuenteLlegadas`: la reproducción avanza un cursor
+sobre el mapa, así que la memoria es constante sin importar el tamaño de
+la traza. `csv_a_traza()` convierte un CSV de llegadas a este formato:
+
+    python -m Modelo.Traza_llegadas llegadas.csv llegadas.trz --segundos-por-tick 60
+"""
+
+import argparse
+import csv
+import datetime
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from Modelo.Simulador import FuenteLlegadas
+from Modelo.Tabla_clientes import TIPOS
+
+FIRMA = b'TRAZALLG'
+VERSION_TRAZA = 1
+CABECERA = struct.Struct('<8sHHIQ8s')
+REGISTRO = struct.Struct('<Q')
+BITS_TIPO = 8
+EXTENSION = '.trz'
+
+
+def _empaquetar(tick, codigo):
+    return (tick << BITS_TIPO) | codigo
+
+
+def ruta_en(directorio, nombre):
+    """Ruta real de la traza `nombre` dentro de `directorio`.
+
+    Sólo acepta un nombre de archivo (se agrega `EXTENSION` si falta);
+    lanza ValueError si es una ruta o si resuelve (enlaces incluidos)
+    fuera del directorio.
+    """
+    base = os.path.realpath(directorio)
+    nombre = str(nombre)
+    if not nombre or nombre in ('.', '..') or os.path.basename(nombre) != nombre:
+        raise ValueError(f"nombre de traza inválido: {nombre!r}")
+    if not nombre.endswith(EXTENSION):
+        nombre += EXTENSION
+    ruta = os.path.realpath(os.path.join(base, nombre))
+    if os.path.dirname(ruta) != base:
+        raise ValueError(f"la traza {nombre!r} está fuera del directorio de trazas")
+    return ruta
+
+
+class _RegistrosGrandes:
+    """Vista de los registros para máquinas big-endian (sin `cast` directo)."""
+
+    def __init__(self, mapa, inicio, cantidad):
+        self._mapa = mapa
+        self._inicio = inicio
+        self._cantidad = cantidad
+
+    def __len__(self):
+        return self._cantidad
+
+    def __getitem__(self, i):
+        return REGISTRO.unpack_from(self._mapa, self._inicio + i * REGISTRO.size)[0]
+
+
+class TrazaLlegadas(FuenteLlegadas):
+    """Reproduce una traza binaria como fuente de llegadas del simulador.
+
+    El tick 0 de la corrida corresponde al tick `inicio` de la traza
+    (`inicio` > 0 salta directo a esa parte del día); las llegadas
+    anteriores se ignoran. El motor de eventos la ve como un único flujo
+    cuyo próximo tick es el del siguiente registro.
+    """
+
+    def __init__(self, ruta, inicio=0):
+        self.ruta = os.path.abspath(ruta)
+        self.inicio = inicio
+        self._archivo = open(self.ruta, 'rb')
+        try:
+            self._abrir()
+        except Exception:
+            self._archivo.close()
+            raise
+
+    def _abrir(self):
+        tamaño = os.fstat(self._archivo.fileno()).st_size
+        if tamaño < CABECERA.size:
+            raise ValueError(f"traza demasiado corta: {self.ruta}")
+        firma, version, tamaño_registro, _, cantidad, tipos = CABECERA.unpack(
+            self._archivo.read(CABECERA.size))
+        if firma != FIRMA or version != VERSION_TRAZA or tamaño_registro != REGISTRO.size:
+            raise ValueError(f"no es una traza de llegadas v{VERSION_TRAZA}: {self.ruta}")
+        if tamaño < CABECERA.size + cantidad * REGISTRO.size:
+            raise ValueError(f"traza truncada: {self.ruta}")
+        self.tipos = tuple(tipos.rstrip(b'\0').decode('ascii'))
+        self.cantidad = cantidad
+        self._mapa = None
+        if cantidad == 0:
+            self._registros = ()
+        else:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            fin = CABECERA.size + cantidad * REGISTRO.size
+            if sys.byteorder == 'little':
+                self._registros = memoryview(self._mapa)[CABECERA.size:fin].cast('Q')
+            else:
+                self._registros = _RegistrosGrandes(self._mapa, CABECERA.size, cantidad)
+        self._cursor = 0
+        self.buscar(0)
+
+    # -----------------------
+    # Posición
+    # -----------------------
+    def buscar(self, tick):
+        """Ubica el cursor en el primer registro del tick `tick` de la corrida (o posterior)."""
+        self._cursor = bisect_left(self._registros, _empaquetar(self.inicio + max(tick, 0), 0))
+        return self._cursor
+
+    def tick_de(self, i):
+        """Tick (de la corrida) del registro `i`."""
+        return (self._registros[i] >> BITS_TIPO) - self.inicio
+
+    @property
+    def primer_tick(self):
+        return self.tick_de(0) if self.cantidad else None
+
+    @property
+    def ultimo_tick(self):
+        return self.tick_de(self.cantidad - 1) if self.cantidad else None
+
+    def _alinear(self, objetivo):
+        """Deja el cursor en el primer registro con tick absoluto >= `objetivo`.
+
+        En una reproducción normal el cursor ya está ahí; si no (salto o
+        retroceso) se busca en O(log n).
+        """
+        registros = self._registros
+        i = self._cursor
+        umbral = objetivo << BITS_TIPO
+        anterior_ok = i == 0 or registros[i - 1] < umbral
+        if not anterior_ok or (i < self.cantidad and registros[i] < umbral):
+            i = self._cursor = bisect_left(registros, umbral)
+        return i
+
+    # -----------------------
+    # FuenteLlegadas
+    # -----------------------
+    def _llegadas(self, t):
+        objetivo = self.inicio + t
+        i = self._alinear(objetivo)
+        registros = self._registros
+        tipos = self.tipos
+        fin = (objetivo + 1) << BITS_TIPO
+        llegadas = []
+        while i < self.cantidad and registros[i] < fin:
+            llegadas.append(tipos[registros[i] & 0xFF])
+            i += 1
+        self._cursor = i
+        return llegadas
+
+    def flujos(self):
+        return (0,)
+
+    def generar(self, t, registrar):
+        for tipo in self._llegadas(t):
+            registrar(t, tipo)
+
+    def siguiente(self, desde, flujo):
+        i = self._alinear(self.inicio + desde + 1)
+        return self.tick_de(i) if i < self.cantidad else None
+
+    def llegada(self, t, flujo):
+        return self._llegadas(t)
+
+    def estado(self):
+        return {'tipo': 'traza', 'ruta': self.ruta, 'inicio': self.inicio, 'cursor': self._cursor}
+
+    @classmethod
+    def desde_estado(cls, estado, directorio):
+        """Reabre la traza de un snapshot en la misma posición.
+
+        El snapshot puede venir de afuera: sólo se abre si su ruta es un
+        archivo de `directorio` (ValueError si no).
+        """
+        if estado.get('tipo') != 'traza':
+            raise ValueError(f"fuente de llegadas desconocida: {estado.get('tipo')!r}")
+        ruta = ruta_en(directorio, os.path.basename(str(estado['ruta'])))
+        if os.path.realpath(str(estado['ruta'])) != ruta:
+            raise ValueError("la traza del snapshot está fuera del directorio de trazas")
+        try:
+            traza = cls(ruta, inicio=int(estado['inicio']))
+        except OSError as e:
+            raise ValueError(f"no se puede reabrir la traza: {e}") from e
+        traza._cursor = min(int(estado['cursor']), traza.cantidad)
+        return traza
+
+    # -----------------------
+    # Cierre
+    # -----------------------
+    def cerrar(self):
+        if isinstance(self._registros, memoryview):
+            self._registros.release()
+        self._registros = ()
+        self.cantidad = 0
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def __len__(self):
+        return self.cantidad
+
+
+# ------------------------
+# ESCRITURA Y CONVERSIÓN
+# ------------------------
+def escribir_traza(destino, llegadas, tipos=TIPOS):
+    """Escribe una traza con `llegadas` (iterable de `(tick, tipo)`).
+
+    Se acumulan en un `array` de 8 bytes por llegada y, si no venían
+    ordenadas por tick, se ordenan en memoria. Escribe a un temporal y lo
+    reemplaza de forma atómica.
+    Devuelve la cantidad de registros.
+    """
+    codigo = {tipo: i for i, tipo in enumerate(tipos)}
+    registros = array('Q')
+    ordenados = True
+    anterior = 0
+    for tick, tipo in llegadas:
+        if not 0 <= tick < 1 << (64 - BITS_TIPO):
+            raise ValueError(f"tick fuera de rango en la traza: {tick}")
+        if tipo not in codigo:
+            raise ValueError(f"tipo desconocido en la traza: {tipo!r}")
+        valor = _empaquetar(tick, codigo[tipo])
+        ordenados = ordenados and valor >= anterior
+        anterior = valor
+        registros.append(valor)
+    if not ordenados:
+        registros = array('Q', sorted(registros))
+    if sys.byteorder != 'little':
+        registros.byteswap()
+
+    temporal = f"{destino}.tmp"
+    with open(temporal, 'wb') as f:
+        f.write(CABECERA.pack(FIRMA, VERSION_TRAZA, REGISTRO.size, 0, len(registros),
+                              ''.join(tipos).encode('ascii')))
+        registros.tofile(f)
+    os.replace(temporal, destino)
+    return len(registros)
+
+
+def _leer_csv(origen, columna_tick, columna_tipo, columna_tiempo, segundos_por_tick,
+              origen_tiempo):
+    with open(origen, newline='', encoding='utf-8') as f:
+        for fila in csv.DictReader(f):
+            tipo = fila[columna_tipo].strip()
+            if columna_tiempo is None:
+                yield int(fila[columna_tick]), tipo
+                continue
+            instante = datetime.datetime.fromisoformat(fila[columna_tiempo].strip())
+            if origen_tiempo is None:
+                # Por defecto, el tick 0 es la medianoche del primer registro
+                origen_tiempo = instante.replace(hour=0, minute=0, second=0, microsecond=0)
+            segundos = (instante - origen_tiempo).total_seconds()
+            yield int(segundos // segundos_por_tick), tipo
+
+
+def csv_a_traza(origen, destino, columna_tick='tick', columna_tipo='tipo', columna_tiempo=None,
+                segundos_por_tick=1.0, origen_tiempo=None, tipos=TIPOS):
+    """Convierte un CSV de llegadas en una traza binaria.
+
+    Con `columna_tiempo` (fechas ISO 8601) el tick es
+    `(instante - origen_tiempo) // segundos_por_tick`; si no, se lee el
+    tick entero de `columna_tick`. Devuelve la cantidad de registros.
+    """
+    if columna_tiempo is not None and segundos_por_tick <= 0:
+        raise ValueError("segundos_por_tick debe ser positivo")
+    return escribir_traza(destino, _leer_csv(origen, columna_tick, columna_tipo, columna_tiempo,
+                                             segundos_por_tick, origen_tiempo), tipos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convierte un CSV de llegadas a traza binaria.")
+    parser.add_argument('origen')
+    parser.add_argument('destino')
+    parser.add_argument('--columna-tick', default='tick')
+    parser.add_argument('--columna-tipo', default='tipo')
+    parser.add_argument('--columna-tiempo', default=None,
+                        help="columna con fecha/hora ISO 8601 (en lugar de --columna-tick)")
+    parser.add_argument('--segundos-por-tick', type=float, default=1.0)
+    parser.add_argument('--origen-tiempo', type=datetime.datetime.fromisoformat, default=None,
+                        help="instante del tick 0 (por defecto, medianoche del primer registro)")
+    args = parser.parse_args(argv)
+
+    cantidad = csv_a_traza(args.origen, args.destino, columna_tick=args.columna_tick,
+                           columna_tipo=args.columna_tipo, columna_tiempo=args.columna_tiempo,
+                           segundos_por_tick=args.segundos_por_tick,
+                           origen_tiempo=args.origen_tiempo)
+    print(f"{cantidad} llegadas escritas en {args.destino}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import threading
+from collections import deque
+from itertools import islice
+
+
+class BufferCircular:
+    """Buffer circular acotado de eventos con lectura por cursor.
+
+    Cada elemento agregado recibe un número de secuencia creciente (su
+    cursor). Los lectores piden "todo desde el cursor N" y reciben sólo lo
+    nuevo; si el productor ya sobrescribió parte de lo pedido, se informa
+    cuántos elementos se perdieron. Es seguro entre hilos: un productor
+    (la simulación) y varios lectores (clientes SSE).
+    """
+
+    def __init__(self, capacidad=4096):
+        self._datos = deque(maxlen=capacidad)
+        self._siguiente = 0
+        self._cerrado = False
+        self._cond = threading.Condition()
+
+    def agregar(self, elemento):
+        with self._cond:
+            self._datos.append(elemento)
+            self._siguiente += 1
+            self._cond.notify_all()
+
+    def cerrar(self):
+        """Marca el fin del flujo y despierta a los lectores en espera."""
+        with self._cond:
+            self._cerrado = True
+            self._cond.notify_all()
+
+    @property
+    def cerrado(self):
+        return self._cerrado
+
+    @property
+    def siguiente(self):
+        """Cursor que recibirá el próximo elemento."""
+        return self._siguiente
+
+    def leer_desde(self, cursor, limite=None):
+        """Devuelve `(pares, siguiente_cursor, perdidos)`.
+
+        `pares` es una lista de `(cursor, elemento)` desde `cursor` (como
+        máximo `limite`); `perdidos` cuenta los elementos pedidos que ya no
+        están en el buffer.
+        """
+        with self._cond:
+            primero = self._siguiente - len(self._datos)
+            inicio = max(cursor, primero)
+            perdidos = inicio - cursor if cursor < primero else 0
+            fin = self._siguiente if limite is None else min(self._siguiente, inicio + limite)
+            elementos = list(islice(self._datos, inicio - primero, fin - primero))
+        return list(zip(range(inicio, fin), elementos)), fin, perdidos
+
+    def esperar(self, cursor, timeout=None):
+        """Bloquea hasta que haya elementos desde `cursor` o el buffer se cierre.
+
+        Devuelve True si hay datos nuevos (o el buffer está cerrado).
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._siguiente > cursor or self._cerrado, timeout)
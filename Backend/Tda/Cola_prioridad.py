@@ -1,26 +1,353 @@
+from bisect import bisect_left, insort
+
+
+class _Carril:
+    """Carril FIFO como dos pilas: `salida` (el frente, invertido) y `entrada`.
+
+    Encolar es `entrada.append()` y extraer `salida.pop()`; cuando `salida`
+    se vacía se invierte `entrada` en su lugar (O(1) amortizado). A
+    diferencia de un `deque`, cualquier posición se lee por índice en O(1)
+    y un tramo se copia sin recorrer lo anterior.
+    """
+
+    __slots__ = ('salida', 'entrada')
+
+    def __init__(self, entradas=()):
+        self.salida = []
+        self.entrada = list(entradas)
+
+    def __len__(self):
+        return len(self.salida) + len(self.entrada)
+
+    def __bool__(self):
+        return bool(self.salida or self.entrada)
+
+    def __getitem__(self, i):
+        salida = self.salida
+        if i < 0:
+            i += len(self)
+        if i < len(salida):
+            return salida[-1 - i]
+        return self.entrada[i - len(salida)]
+
+    def append(self, entrada):
+        self.entrada.append(entrada)
+
+    def voltear(self):
+        """Pasa `entrada` (invertida) a `salida`, que debe estar vacía."""
+        self.entrada.reverse()
+        self.salida, self.entrada = self.entrada, []
+        return self.salida
+
+    def popleft(self):
+        return (self.salida or self.voltear()).pop()
+
+    def tramo(self, inicio, fin=None):
+        """Lista con las entradas de las posiciones [inicio, fin)."""
+        salida = self.salida
+        n_salida = len(salida)
+        fin = len(self) if fin is None else min(fin, len(self))
+        if inicio >= fin:
+            return []
+        tramo = []
+        if inicio < n_salida:
+            tramo = salida[n_salida - min(fin, n_salida):n_salida - inicio][::-1]
+        if fin > n_salida:
+            tramo += self.entrada[max(inicio - n_salida, 0):fin - n_salida]
+        return tramo
+
+    def __iter__(self):
+        return iter(self.tramo(0))
+
+
 class ColaPrioridadGlobal:
+    """Cola de prioridad con un carril FIFO (`_Carril`) por tipo de cliente.
+
+    Cada entrada guarda `(prioridad, seq, cliente)`; `seq` es un contador
+    global que fija el orden de llegada entre todos los carriles. Como cada
+    carril recibe sus entradas con `seq` creciente, el orden global
+    `(prioridad, seq)` es simplemente la concatenación de los carriles en
+    orden de prioridad, sin necesidad de reordenar nada.
+
+    Un cliente que abandona se retira con una marca (`retirar`): su entrada
+    queda en el carril pero se salta al extraer y al recorrer. El frente de
+    cada carril nunca es una entrada marcada y, cuando las marcadas llegan
+    a la mitad del carril, se compacta.
+
+    - encolar: O(1)
+    - extraer_siguiente_de_tipo: O(1) amortizado
+    - extraer_siguiente: O(número de tipos)
+    - retirar: O(log n) (búsqueda binaria del `seq` en su carril)
+    - iter_desde: O(log² n + limit)
+    """
 
     prioridad_val = {'A': 0, 'M': 1, 'B': 2}
 
     def __init__(self):
-        self._lista = []
         self._seq = 0
+        self._tamaño = 0
+        # Carriles ordenados por prioridad (A, M, B)
+        self._carriles = {
+            tipo: _Carril()
+            for tipo in sorted(self.prioridad_val, key=self.prioridad_val.get)
+        }
+        # `seq` de las entradas retiradas que siguen en su carril; por tipo,
+        # además, ordenados (para ubicar posiciones en `iter_desde`)
+        self._retirados = set()
+        self._retirados_tipo = {tipo: [] for tipo in self._carriles}
 
     def encolar(self, cliente):
-        entry = (self.prioridad_val[cliente.tipo], self._seq, cliente)
+        """Encola `cliente` y devuelve su `seq` (para `retirar`)."""
+        seq = self._seq
         self._seq += 1
-        self._lista.append(entry)
-        self._lista.sort(key=lambda x: (x[0], x[1]))
+        self._carriles[cliente.tipo].entrada.append(
+            (self.prioridad_val[cliente.tipo], seq, cliente))
+        self._tamaño += 1
+        return seq
 
     def extraer_siguiente_de_tipo(self, tipo):
-        for i, (_, _, cliente) in enumerate(self._lista):
-            if cliente.tipo == tipo:
-                return self._lista.pop(i)[2]
+        carril = self._carriles.get(tipo)
+        if carril is None:
+            return None
+        salida = carril.salida
+        if not salida:
+            if not carril.entrada:
+                return None
+            salida = carril.voltear()
+        self._tamaño -= 1
+        entrada = salida.pop()
+        if self._retirados:
+            self._depurar(tipo)
+        return entrada[2]
+
+    def extraer_siguiente(self):
+        """Extrae el cliente de mayor prioridad (y más antiguo) de cualquier tipo."""
+        for tipo, carril in self._carriles.items():
+            if carril.salida or carril.entrada:
+                return self.extraer_siguiente_de_tipo(tipo)
+        return None
+
+    # -----------------------
+    # Retiro (abandonos)
+    # -----------------------
+    @staticmethod
+    def _seq_de(entrada):
+        return entrada[1]
+
+    def retirar(self, seq, tipo):
+        """Saca de la cola la entrada `seq` (devuelta por `encolar`) de `tipo`.
+
+        Devuelve False si ya no está: fue extraída para atenderla o ya se
+        retiró (también si una compactación ya la sacó del carril). Como
+        cada carril tiene `seq` crecientes, se busca por bisección.
+        """
+        carril = self._carriles[tipo]
+        if (not carril or seq < self._seq_de(carril[0]) or seq > self._seq_de(carril[-1])
+                or seq in self._retirados or self._indice(carril, seq) is None):
+            return False
+        self._retirados.add(seq)
+        insort(self._retirados_tipo[tipo], seq)
+        self._tamaño -= 1
+        self._depurar(tipo)
+        if len(self._retirados_tipo[tipo]) * 2 > len(carril):
+            self._compactar(tipo)
+        return True
+
+    def _indice(self, carril, seq):
+        """Posición de `seq` en `carril`, o None si no está."""
+        bajo, alto = 0, len(carril)
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self._seq_de(carril[medio]) < seq:
+                bajo = medio + 1
+            else:
+                alto = medio
+        if bajo < len(carril) and self._seq_de(carril[bajo]) == seq:
+            return bajo
         return None
 
+    def _depurar(self, tipo):
+        """Quita las entradas retiradas del frente del carril."""
+        carril = self._carriles[tipo]
+        retirados = self._retirados
+        quitados = 0
+        while True:
+            salida = carril.salida
+            if not salida:
+                if not carril.entrada:
+                    break
+                salida = carril.voltear()
+            if self._seq_de(salida[-1]) not in retirados:
+                break
+            retirados.discard(self._seq_de(salida.pop()))
+            quitados += 1
+        if quitados:
+            # Son los `seq` más chicos del carril: los primeros de la lista ordenada
+            del self._retirados_tipo[tipo][:quitados]
+
+    def _compactar(self, tipo):
+        """Reconstruye el carril sin las entradas retiradas."""
+        retirados = self._retirados
+        vivos = _Carril()
+        for entrada in self._carriles[tipo]:
+            seq = self._seq_de(entrada)
+            if seq in retirados:
+                retirados.discard(seq)
+            else:
+                vivos.append(entrada)
+        self._carriles[tipo] = vivos
+        self._retirados_tipo[tipo] = []
+
+    def _vivas(self, tipo):
+        """Entradas del carril `tipo` sin las retiradas."""
+        carril = self._carriles[tipo]
+        if not self._retirados_tipo[tipo]:
+            return carril
+        retirados = self._retirados
+        return (e for e in carril if self._seq_de(e) not in retirados)
+
     def tamaño(self):
-        return len(self._lista)
+        return self._tamaño
+
+    def tamaño_de_tipo(self, tipo):
+        carril = self._carriles.get(tipo)
+        if carril is None:
+            return 0
+        # Sin pasar por `_Carril.__len__`: el motor lo consulta en cada tick
+        return len(carril.salida) + len(carril.entrada) - len(self._retirados_tipo[tipo])
+
+    def __iter__(self):
+        """Recorre las entradas `(prioridad, seq, cliente)` en orden global."""
+        for tipo in self._carriles:
+            yield from self._vivas(tipo)
+
+    def clientes(self):
+        for _, _, c in self:
+            yield c
+
+    def _posicion_viva(self, tipo, offset):
+        """Posición en el carril de la entrada viva número `offset`.
+
+        Las vivas antes de la posición `i` son `i` menos las retiradas con
+        `seq` menor; como crece con `i`, se busca por bisección. Puede caer
+        sobre una retirada: la viva buscada es la siguiente no retirada.
+        """
+        carril = self._carriles[tipo]
+        retirados = self._retirados_tipo[tipo]
+        bajo, alto = offset, min(offset + len(retirados), len(carril))
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if medio - bisect_left(retirados, self._seq_de(carril[medio])) < offset:
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+
+    def _tramo(self, tipo, offset, cantidad):
+        """Hasta `cantidad` entradas vivas del carril desde la viva número `offset`."""
+        carril = self._carriles[tipo]
+        if not self._retirados_tipo[tipo]:
+            return carril.tramo(offset, None if cantidad is None else offset + cantidad)
+        i = self._posicion_viva(tipo, offset)
+        retirados = self._retirados
+        tramo = []
+        while i < len(carril) and (cantidad is None or len(tramo) < cantidad):
+            bloque = carril.tramo(i, None if cantidad is None else i + cantidad - len(tramo))
+            tramo.extend(e for e in bloque if self._seq_de(e) not in retirados)
+            i += len(bloque)
+        return tramo
+
+    def iter_desde(self, offset=0, limit=None):
+        """Entradas `(prioridad, seq, cliente)` a partir de la posición `offset`
+        del orden global. Los carriles completos anteriores a `offset` se
+        saltan por su longitud y, dentro del carril, se llega a `offset` por
+        índice: una página cuesta O(limit) sin importar su profundidad."""
+        offset = max(offset, 0)
+        restantes = limit
+        for tipo in self._carriles:
+            if restantes is not None and restantes <= 0:
+                return
+            largo = self.tamaño_de_tipo(tipo)
+            if offset >= largo:
+                offset -= largo
+                continue
+            tramo = self._tramo(tipo, offset, restantes)
+            offset = 0
+            if restantes is not None:
+                restantes -= len(tramo)
+            yield from tramo
+
+    @classmethod
+    def desde_entradas(cls, entradas, seq):
+        """Reconstruye una cola a partir de `(seq, cliente)` en orden global
+        y del valor del contador `seq` (para restaurar un snapshot)."""
+        cola = cls()
+        for s, cliente in entradas:
+            cola._carriles[cliente.tipo].append((cls.prioridad_val[cliente.tipo], s, cliente))
+            cola._tamaño += 1
+        cola._seq = seq
+        return cola
 
     def ver_lista(self):
-        return [(p, s, c.id, c.tipo) for (p, s, c) in self._lista]
+        return [(p, s, c.id, c.tipo) for (p, s, c) in self]
+
+
+class ColaPrioridadCompacta(ColaPrioridadGlobal):
+    """Variante de `ColaPrioridadGlobal` sobre una `TablaClientes`.
+
+    Cada carril guarda sólo el número de fila del cliente. Las filas se
+    asignan en orden de llegada, así que la fila hace también de `seq`.
+    Hacia afuera entrega vistas (`ClienteVista`) y las mismas entradas
+    `(prioridad, seq, cliente)` que la cola original.
+    """
+
+    def __init__(self, tabla):
+        super().__init__()
+        self.tabla = tabla
+
+    def encolar(self, cliente):
+        self._carriles[cliente.tipo].entrada.append(cliente.fila)
+        self._tamaño += 1
+        return cliente.fila
+
+    def extraer_siguiente_de_tipo(self, tipo):
+        carril = self._carriles.get(tipo)
+        if carril is None:
+            return None
+        salida = carril.salida
+        if not salida:
+            if not carril.entrada:
+                return None
+            salida = carril.voltear()
+        self._tamaño -= 1
+        fila = salida.pop()
+        if self._retirados:
+            self._depurar(tipo)
+        return self.tabla.vista(fila)
+
+    @staticmethod
+    def _seq_de(entrada):
+        return entrada
+
+    def _entrada(self, fila):
+        cliente = self.tabla.vista(fila)
+        return self.prioridad_val[cliente.tipo], fila, cliente
+
+    def __iter__(self):
+        for fila in super().__iter__():
+            yield self._entrada(fila)
+
+    def iter_desde(self, offset=0, limit=None):
+        for fila in super().iter_desde(offset, limit):
+            yield self._entrada(fila)
+
+    def filas(self):
+        """Filas en orden global (para snapshots)."""
+        return [fila for tipo in self._carriles for fila in self._vivas(tipo)]
 
+    @classmethod
+    def desde_filas(cls, tabla, filas):
+        cola = cls(tabla)
+        for fila in filas:
+            cola.encolar(tabla.vista(fila))
+        return cola
@@ -1,30 +1,106 @@
+from array import array
+from itertools import islice
+
 from Tda.Nodo import Nodo
 
+
 class ListaEnlazadaHistorial:
+    """Lista enlazada de clientes atendidos, en orden de finalización.
+
+    Mantiene puntero a la cola para insertar en O(1) y, cada `SALTO` nodos,
+    guarda una referencia en `_saltos` para que `iter_desde(offset, ...)`
+    no tenga que recorrer la lista desde la cabeza.
+    """
+
+    SALTO = 1024
+
     def __init__(self):
         self.cabeza = None
+        self.cola = None
+        self._tamaño = 0
+        self._saltos = []
 
     def insertar_final(self, cliente):
         nuevo = Nodo(cliente)
         if not self.cabeza:
             self.cabeza = nuevo
-            return
-        actual = self.cabeza
-        while actual.siguiente:
+        else:
+            self.cola.siguiente = nuevo
+        self.cola = nuevo
+        if self._tamaño % self.SALTO == 0:
+            self._saltos.append(nuevo)
+        self._tamaño += 1
+
+    def __len__(self):
+        return self._tamaño
+
+    def _nodo_en(self, indice):
+        if indice < 0 or indice >= self._tamaño:
+            return None
+        actual = self._saltos[indice // self.SALTO]
+        for _ in range(indice % self.SALTO):
             actual = actual.siguiente
-        actual.siguiente = nuevo
+        return actual
 
-    def to_list(self):
-        out = []
-        actual = self.cabeza
+    def _iter_clientes(self, offset=0):
+        actual = self._nodo_en(offset) if offset else self.cabeza
         while actual:
-            c = actual.cliente
-            out.append({
-                'id': c.id,
-                'tipo': c.tipo,
-                'llegada': c.tiempo_llegada,
-                'inicio': c.tiempo_inicio_atencion,
-                'fin': c.tiempo_fin_atencion
-            })
+            yield actual.cliente
             actual = actual.siguiente
-        return out
+
+    def __iter__(self):
+        return self._iter_clientes()
+
+    @staticmethod
+    def _a_dict(c):
+        return {
+            'id': c.id,
+            'tipo': c.tipo,
+            'llegada': c.tiempo_llegada,
+            'inicio': c.tiempo_inicio_atencion,
+            'fin': c.tiempo_fin_atencion
+        }
+
+    def iter_desde(self, offset=0, limit=None):
+        """Generador perezoso de dicts a partir de `offset` (máximo `limit`)."""
+        clientes = self._iter_clientes(offset)
+        if limit is not None:
+            clientes = islice(clientes, limit)
+        for c in clientes:
+            yield self._a_dict(c)
+
+    def to_list(self):
+        return list(self.iter_desde())
+
+
+class HistorialCompacto:
+    """Historial con la interfaz de `ListaEnlazadaHistorial` para el modo
+    compacto: guarda los números de fila de una `TablaClientes` en un
+    `array` (8 bytes por cliente atendido, sin nodos). `iter_desde` llega
+    a `offset` por índice, en O(1).
+    """
+
+    def __init__(self, tabla):
+        self.tabla = tabla
+        self.filas = array('q')
+
+    def insertar_final(self, cliente):
+        self.filas.append(cliente.fila)
+
+    def __len__(self):
+        return len(self.filas)
+
+    def __iter__(self):
+        vista = self.tabla.vista
+        for fila in self.filas:
+            yield vista(fila)
+
+    def iter_desde(self, offset=0, limit=None):
+        fin = len(self.filas) if limit is None else min(len(self.filas), offset + limit)
+        a_dict = self.tabla.a_dict
+        filas = self.filas
+        for i in range(max(offset, 0), fin):
+            yield a_dict(filas[i])
+
+    def to_list(self):
+        return list(self.iter_desde())
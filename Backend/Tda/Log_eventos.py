@@ -0,0 +1,196 @@
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Códigos de evento (columna `evento`)
+LLEGADA = 0
+ASIGNACION = 1
+FINALIZACION = 2
+ABANDONO = 3
+NOMBRES_EVENTO = ('llegada', 'asignacion', 'finalizacion', 'abandono')
+CODIGO_EVENTO = {nombre: codigo for codigo, nombre in enumerate(NOMBRES_EVENTO)}
+
+
+class LogEventos:
+    """Log de eventos columnar: un `array` compacto por campo.
+
+    Columnas: tick, evento, cliente (número del id "C<n>"), tipo, ventanilla
+    (índice, -1 si no aplica) y duración del servicio (en un abandono, la
+    espera hasta abandonar). Ninguna clave se
+    repite por evento; los dicts con el formato histórico de `logs` se
+    construyen sólo al pedirlos (`log[i]`, iteración, `filtrar`).
+
+    Los ticks se agregan en orden no decreciente, así que filtrar por rango
+    de ticks es una búsqueda binaria.
+    """
+
+    COLUMNAS = ('tick', 'evento', 'cliente', 'tipo', 'ventanilla', 'duracion')
+
+    def __init__(self, ventanillas=()):
+        self.tick = array('q')
+        self.evento = array('b')
+        self.cliente = array('q')
+        self.tipo = array('b')
+        self.ventanilla = array('h')
+        self.duracion = array('q')
+
+        self._tipos = []
+        self._codigo_tipo = {}
+        # (nombre, tipo) de cada ventanilla, por índice
+        self._ventanillas = [(v.nombre, v.tipo) for v in ventanillas]
+
+    # ---------------------------
+    # Escritura
+    # ---------------------------
+    def _cod_tipo(self, tipo):
+        codigo = self._codigo_tipo.get(tipo)
+        if codigo is None:
+            codigo = self._codigo_tipo[tipo] = len(self._tipos)
+            self._tipos.append(tipo)
+        return codigo
+
+    def _agregar(self, t, evento, cliente, tipo, ventanilla, duracion):
+        self.tick.append(t)
+        self.evento.append(evento)
+        self.cliente.append(cliente)
+        self.tipo.append(self._cod_tipo(tipo))
+        self.ventanilla.append(ventanilla)
+        self.duracion.append(duracion)
+        return len(self.tick) - 1
+
+    def agregar_llegada(self, t, cliente, tipo):
+        return self._agregar(t, LLEGADA, cliente, tipo, -1, 0)
+
+    def agregar_asignacion(self, t, cliente, tipo, ventanilla, duracion):
+        return self._agregar(t, ASIGNACION, cliente, tipo, ventanilla, duracion)
+
+    def agregar_finalizacion(self, t, cliente, tipo, ventanilla, duracion):
+        return self._agregar(t, FINALIZACION, cliente, tipo, ventanilla, duracion)
+
+    def agregar_abandono(self, t, cliente, tipo, espera):
+        return self._agregar(t, ABANDONO, cliente, tipo, -1, espera)
+
+    # ---------------------------
+    # Vistas tipo dict
+    # ---------------------------
+    def __len__(self):
+        return len(self.tick)
+
+    def vista(self, i):
+        """Dict del evento `i` con el mismo formato que el antiguo `logs`."""
+        t = self.tick[i]
+        cid = f"C{self.cliente[i]}"
+        tipo = self._tipos[self.tipo[i]]
+        evento = self.evento[i]
+        if evento == LLEGADA:
+            return {'tick': t, 'event': 'llegada',
+                    'cliente': {'id': cid, 'tipo': tipo, 'llegada': t}}
+        if evento == ASIGNACION:
+            nombre, tipo_v = self._ventanillas[self.ventanilla[i]]
+            return {'tick': t, 'event': 'asignacion',
+                    'ventanilla': {'nombre': nombre, 'tipo': tipo_v},
+                    'cliente': {'id': cid, 'tipo': tipo},
+                    'duracion': self.duracion[i]}
+        if evento == ABANDONO:
+            return {'tick': t, 'event': 'abandono',
+                    'cliente': {'id': cid, 'tipo': tipo, 'llegada': t - self.duracion[i]},
+                    'espera': self.duracion[i]}
+        return {'tick': t, 'event': NOMBRES_EVENTO[evento],
+                'cliente': {'id': cid, 'tipo': tipo},
+                'inicio': t - self.duracion[i] + 1, 'fin': t}
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.vista(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("índice fuera de rango")
+        return self.vista(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.vista(i)
+
+    # ---------------------------
+    # Filtros
+    # ---------------------------
+    def indices(self, evento=None, tipo=None, desde=None, hasta=None):
+        """Índices de los eventos que cumplen los filtros.
+
+        `evento` es un nombre ('llegada', ...) o código; `tipo` un tipo de
+        cliente; `desde`/`hasta` un rango de ticks inclusivo.
+        """
+        inicio = bisect_left(self.tick, desde) if desde is not None else 0
+        fin = bisect_right(self.tick, hasta) if hasta is not None else len(self)
+        cod_evento = CODIGO_EVENTO.get(evento, evento)
+        cod_tipo = self._codigo_tipo.get(tipo, -1) if tipo is not None else None
+        for i in range(inicio, fin):
+            if cod_evento is not None and self.evento[i] != cod_evento:
+                continue
+            if cod_tipo is not None and self.tipo[i] != cod_tipo:
+                continue
+            yield i
+
+    def filtrar(self, evento=None, tipo=None, desde=None, hasta=None):
+        for i in self.indices(evento, tipo, desde, hasta):
+            yield self.vista(i)
+
+    # ---------------------------
+    # Exportación
+    # ---------------------------
+    def exportar_jsonl(self, destino, **filtros):
+        """Escribe un evento JSON por línea en `destino` (ruta o archivo de texto)."""
+        if isinstance(destino, str):
+            with open(destino, 'w', encoding='utf-8') as f:
+                return self.exportar_jsonl(f, **filtros)
+        n = 0
+        for evento in self.filtrar(**filtros):
+            destino.write(json.dumps(evento))
+            destino.write('\n')
+            n += 1
+        return n
+
+    def _catalogos(self):
+        return {
+            'nombres_evento': list(NOMBRES_EVENTO),
+            'tipos': list(self._tipos),
+            'ventanillas': [list(v) for v in self._ventanillas],
+        }
+
+    def exportar_npz(self, ruta):
+        """Guarda las columnas como arreglos NumPy comprimidos (requiere numpy)."""
+        import numpy as np
+        columnas = {c: np.frombuffer(getattr(self, c), dtype=getattr(self, c).typecode)
+                    for c in self.COLUMNAS}
+        np.savez_compressed(ruta, catalogos=np.array(json.dumps(self._catalogos())), **columnas)
+
+    def exportar_parquet(self, ruta):
+        """Guarda las columnas en Parquet (requiere pyarrow)."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        tabla = pa.table({c: pa.array(getattr(self, c)) for c in self.COLUMNAS})
+        tabla = tabla.replace_schema_metadata({'catalogos': json.dumps(self._catalogos())})
+        pq.write_table(tabla, ruta)
+
+    def estado(self):
+        """Columnas como bytes más los catálogos (para snapshots)."""
+        return {
+            'columnas': {c: getattr(self, c).tobytes() for c in self.COLUMNAS},
+            'tipos': list(self._tipos),
+            'ventanillas': list(self._ventanillas),
+        }
+
+    @classmethod
+    def desde_estado(cls, estado):
+        log = cls()
+        for c in cls.COLUMNAS:
+            getattr(log, c).frombytes(estado['columnas'][c])
+        log._tipos = list(estado['tipos'])
+        log._codigo_tipo = {tipo: i for i, tipo in enumerate(log._tipos)}
+        log._ventanillas = [tuple(v) for v in estado['ventanillas']]
+        return log
+
+    def memoria_bytes(self):
+        """Bytes ocupados por las columnas."""
+        return sum(len(getattr(self, c)) * getattr(self, c).itemsize for c in self.COLUMNAS)
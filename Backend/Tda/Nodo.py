@@ -1,4 +1,6 @@
 class Nodo:
+    __slots__ = ('cliente', 'siguiente')
+
     def __init__(self, cliente):
         self.cliente = cliente
-        self.siguiente = None
\ No newline at end of file
+        self.siguiente = None
@@ -0,0 +1,117 @@
+class RuedaTemporal:
+    """Rueda de tiempo jerárquica: vencimientos por tick en O(1) amortizado.
+
+    Cada nivel tiene `2**bits` ranuras; el nivel `l` cubre ventanas de
+    `2**(bits*l)` ticks. Un elemento con vencimiento `t` va al nivel del
+    dígito (en base `2**bits`) más alto en que `t` difiere del tick
+    actual, en la ranura de ese dígito. Al avanzar el reloj, la ranura de
+    cada nivel en la que se entra se redistribuye hacia niveles más bajos
+    ("cascada"); cada elemento baja a lo sumo una vez por nivel, así que
+    insertar y vencer cuestan O(1) amortizado sin recorrer los pendientes.
+    Los niveles se agregan según hace falta.
+
+    Una máscara de bits por nivel marca las ranuras ocupadas: `proximo()`
+    da una cota inferior del próximo vencimiento en O(niveles), lo que le
+    permite al motor de eventos saltar directo a ese tick.
+
+    No hay cancelación: quien inserta descarta al vencer los elementos que
+    ya no aplican. Dentro de un mismo tick no se garantiza el orden.
+    """
+
+    def __init__(self, bits=6, inicio=0):
+        self.bits = bits
+        self._mascara = (1 << bits) - 1
+        self.actual = inicio
+        self._niveles = []     # nivel -> lista de ranuras (listas de (t, elemento))
+        self._ocupadas = []    # nivel -> máscara de ranuras no vacías
+        self._vencidos = []    # insertados con t <= actual
+        self._cantidad = 0
+
+    def __len__(self):
+        return self._cantidad
+
+    def insertar(self, t, elemento):
+        """Agenda `elemento` para vencer en el tick `t`."""
+        self._cantidad += 1
+        self._ubicar(t, elemento)
+
+    def _ubicar(self, t, elemento):
+        if t <= self.actual:
+            self._vencidos.append((t, elemento))
+            return
+        nivel = ((t ^ self.actual).bit_length() - 1) // self.bits
+        while len(self._niveles) <= nivel:
+            self._niveles.append([[] for _ in range(self._mascara + 1)])
+            self._ocupadas.append(0)
+        ranura = (t >> (self.bits * nivel)) & self._mascara
+        self._niveles[nivel][ranura].append((t, elemento))
+        self._ocupadas[nivel] |= 1 << ranura
+
+    def proximo(self):
+        """Cota inferior del próximo vencimiento (exacta en el nivel 0), o None si está vacía."""
+        if self._vencidos:
+            return self.actual
+        for nivel, ocupadas in enumerate(self._ocupadas):
+            if not ocupadas:
+                continue
+            desplazamiento = self.bits * nivel
+            digito = (self.actual >> desplazamiento) & self._mascara
+            siguientes = ocupadas >> (digito + 1) << (digito + 1)
+            if siguientes:
+                ranura = (siguientes & -siguientes).bit_length() - 1
+                base = self.actual >> (desplazamiento + self.bits) << (desplazamiento + self.bits)
+                return base | (ranura << desplazamiento)
+        return None
+
+    def _mover(self, t):
+        """Lleva el reloj a `t` (sin saltar ranuras ocupadas) y baja en cascada
+        las ranuras en cuya ventana se entra."""
+        anterior = self.actual
+        self.actual = t
+        for nivel in range(len(self._niveles) - 1, 0, -1):
+            desplazamiento = self.bits * nivel
+            if (t >> desplazamiento) == (anterior >> desplazamiento):
+                continue
+            ranura = (t >> desplazamiento) & self._mascara
+            elementos = self._niveles[nivel][ranura]
+            if elementos:
+                self._niveles[nivel][ranura] = []
+                self._ocupadas[nivel] &= ~(1 << ranura)
+                for t_venc, elemento in elementos:
+                    self._ubicar(t_venc, elemento)
+
+    def avanzar(self, hasta):
+        """Avanza el reloj hasta `hasta` y devuelve los elementos vencidos (t <= hasta)."""
+        vencidos = [e for _, e in self._vencidos]
+        self._vencidos = []
+        while True:
+            t = self.proximo()
+            if t is None or t > hasta:
+                break
+            if t > self.actual:
+                self._mover(t)
+            ranura = t & self._mascara
+            if self._niveles and self._ocupadas[0] >> ranura & 1:
+                vencidos.extend(e for _, e in self._niveles[0][ranura])
+                self._niveles[0][ranura] = []
+                self._ocupadas[0] &= ~(1 << ranura)
+            vencidos.extend(e for _, e in self._vencidos)
+            self._vencidos = []
+        if hasta > self.actual:
+            self._mover(hasta)
+        self._cantidad -= len(vencidos)
+        return vencidos
+
+    def entradas(self):
+        """Todos los `(t, elemento)` pendientes, sin orden (para snapshots)."""
+        yield from self._vencidos
+        for nivel in self._niveles:
+            for ranura in nivel:
+                yield from ranura
+
+    @classmethod
+    def desde_entradas(cls, entradas, inicio=0, bits=6):
+        rueda = cls(bits, inicio)
+        for t, elemento in entradas:
+            rueda.insertar(t, elemento)
+        return rueda
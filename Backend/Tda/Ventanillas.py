@@ -1,4 +1,6 @@
 class Ventanilla:
+    __slots__ = ('tipo', 'nombre', 'libre', 'cliente', 'tiempo_restante')
+
     def __init__(self, tipo, nombre):
         self.tipo = tipo
         self.nombre = nombre
@@ -11,12 +13,16 @@ class Ventanilla:
         self.tiempo_restante = duracion
         self.libre = False
 
+    def liberar(self):
+        finalizado = self.cliente
+        self.cliente = None
+        self.tiempo_restante = 0
+        self.libre = True
+        return finalizado
+
     def procesar_tick(self):
         if not self.libre:
             self.tiempo_restante -= 1
             if self.tiempo_restante <= 0:
-                finalizado = self.cliente
-                self.cliente = None
-                self.libre = True
-                return finalizado
-        return None
\ No newline at end of file
+                return self.liberar()
+        return None
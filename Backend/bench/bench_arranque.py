@@ -0,0 +1,128 @@
+"""Costo de arranque: imports del núcleo, de `server` y de `create_app()`.
+
+Cada medición corre en un intérprete nuevo (`sys.executable`), así los
+módulos ya importados por una medición no abaratan la siguiente. Además
+de los tiempos comprueba que:
+- importar el núcleo de simulación (`Modelo`, `Tda`) no carga Flask, el
+  conector MySQL ni dotenv;
+- importar `server` y crear la app no carga el conector ni crea servicios;
+- la primera petición crea sólo lo que usa;
+- en modo precarga el conector queda importado antes del fork.
+
+Uso (desde `Backend/`):
+    python -m bench.bench_arranque
+    python -m bench.bench_arranque --repeticiones 10
+
+Sale con código 1 si alguna comprobación falla.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+PESADOS = ('flask', 'mysql.connector', 'dotenv')
+
+# Cada script imprime un dict JSON con 'ms' y lo que haga falta comprobar
+SCRIPTS = {
+    'nucleo': """
+import sys, time
+t = time.perf_counter()
+import Modelo.Simulador, Tda.Cola_prioridad, Tda.Lista_historial, Tda.Log_eventos
+ms = (time.perf_counter() - t) * 1000
+print(json.dumps({'ms': ms, 'cargados': [m for m in PESADOS if m in sys.modules]}))
+""",
+    'import_server': """
+import sys, time
+t = time.perf_counter()
+import server
+ms = (time.perf_counter() - t) * 1000
+print(json.dumps({'ms': ms, 'cargados': [m for m in PESADOS if m in sys.modules]}))
+""",
+    'create_app': """
+import sys, time
+import server
+t = time.perf_counter()
+app = server.create_app({'PERSISTENCIA_DIFERIDA': False})
+ms = (time.perf_counter() - t) * 1000
+print(json.dumps({'ms': ms, 'cargados': [m for m in PESADOS if m in sys.modules],
+                  'creados': app.extensions['simulacion'].creados()}))
+""",
+    'primera_peticion': """
+import sys, time
+import server
+from bench.sqlite_db import crear_db_sqlite
+app = server.create_app({'DB': crear_db_sqlite, 'PERSISTENCIA_DIFERIDA': False})
+cliente = app.test_client()
+t = time.perf_counter()
+estado = cliente.get('/simulacion/status').status_code
+ms = (time.perf_counter() - t) * 1000
+print(json.dumps({'ms': ms, 'estado': estado, 'creados': app.extensions['simulacion'].creados()}))
+""",
+    'precarga': """
+import sys, time
+import server
+t = time.perf_counter()
+app = server.create_app({'PRECARGAR': True, 'PERSISTENCIA_DIFERIDA': False})
+ms = (time.perf_counter() - t) * 1000
+print(json.dumps({'ms': ms, 'cargados': [m for m in PESADOS if m in sys.modules],
+                  'creados': app.extensions['simulacion'].creados()}))
+""",
+}
+
+
+def _correr(nombre):
+    codigo = f"import json\nPESADOS = {PESADOS!r}\n" + SCRIPTS[nombre]
+    salida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True)
+    if salida.returncode != 0:
+        raise RuntimeError(f"{nombre} falló:\n{salida.stderr}")
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def medir(nombre, repeticiones):
+    """Mejor tiempo de `repeticiones` procesos y el resto de datos del último."""
+    mejores = [_correr(nombre) for _ in range(repeticiones)]
+    ultimo = mejores[-1]
+    ultimo['ms'] = min(m['ms'] for m in mejores)
+    return ultimo
+
+
+def comprobar(resultados):
+    """Lista de fallas (vacía si todo está bien)."""
+    fallas = []
+    if resultados['nucleo']['cargados']:
+        fallas.append(f"el núcleo carga {resultados['nucleo']['cargados']}")
+    for nombre in ('import_server', 'create_app'):
+        if 'mysql.connector' in resultados[nombre]['cargados']:
+            fallas.append(f"{nombre} importa mysql.connector")
+    if resultados['create_app']['creados']:
+        fallas.append(f"create_app crea {resultados['create_app']['creados']}")
+    primera = resultados['primera_peticion']
+    if primera['estado'] != 200 or 'gestor' in primera['creados']:
+        fallas.append(f"/simulacion/status: estado {primera['estado']}, crea {primera['creados']}")
+    precarga = resultados['precarga']
+    if 'mysql.connector' not in precarga['cargados'] or precarga['creados']:
+        fallas.append("la precarga no importa el conector o crea servicios antes del fork")
+    return fallas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    resultados = {}
+    print(f"{'medición':<20}{'ms':>10}  detalle")
+    for nombre in SCRIPTS:
+        r = resultados[nombre] = medir(nombre, args.repeticiones)
+        detalle = {k: v for k, v in r.items() if k != 'ms'}
+        print(f"{nombre:<20}{r['ms']:>10.1f}  {detalle}")
+
+    fallas = comprobar(resultados)
+    for falla in fallas:
+        print(f"FALLA: {falla}", file=sys.stderr)
+    return 1 if fallas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Benchmark de `ColaPrioridadGlobal`.
+
+Mide encolar / extraer por tipo con backlogs de 1k a 10M clientes y, para
+tamaños pequeños, lo compara con la versión anterior (lista reordenada en
+cada inserción).
+
+Uso (desde `Backend/`):
+    python -m bench.bench_cola_prioridad
+    python -m bench.bench_cola_prioridad --tamaños 1000 100000 --max-legado 5000
+"""
+
+import argparse
+import time
+
+from Tda.Cola_prioridad import ColaPrioridadGlobal
+
+TIPOS = ('A', 'M', 'B')
+
+
+class _ClienteMin:
+    __slots__ = ('id', 'tipo')
+
+    def __init__(self, id_cliente, tipo):
+        self.id = id_cliente
+        self.tipo = tipo
+
+
+class ColaLegado:
+    """Implementación anterior: append + sort en cada llegada, scan + pop(i)."""
+
+    prioridad_val = {'A': 0, 'M': 1, 'B': 2}
+
+    def __init__(self):
+        self._lista = []
+        self._seq = 0
+
+    def encolar(self, cliente):
+        entry = (self.prioridad_val[cliente.tipo], self._seq, cliente)
+        self._seq += 1
+        self._lista.append(entry)
+        self._lista.sort(key=lambda x: (x[0], x[1]))
+
+    def extraer_siguiente_de_tipo(self, tipo):
+        for i, (_, _, cliente) in enumerate(self._lista):
+            if cliente.tipo == tipo:
+                return self._lista.pop(i)[2]
+        return None
+
+
+def medir(cola_cls, n):
+    clientes = [_ClienteMin(i, TIPOS[i % 3]) for i in range(n)]
+    cola = cola_cls()
+
+    inicio = time.perf_counter()
+    for c in clientes:
+        cola.encolar(c)
+    t_encolar = time.perf_counter() - inicio
+
+    # Se extrae primero el tipo de menor prioridad, el peor caso del scan lineal
+    inicio = time.perf_counter()
+    for tipo in reversed(TIPOS):
+        while cola.extraer_siguiente_de_tipo(tipo) is not None:
+            pass
+    t_extraer = time.perf_counter() - inicio
+
+    return {
+        'n': n,
+        'encolar_s': t_encolar,
+        'extraer_s': t_extraer,
+        'encolar_ops_s': n / t_encolar if t_encolar else float('inf'),
+        'extraer_ops_s': n / t_extraer if t_extraer else float('inf'),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamaños', type=int, nargs='+',
+                        default=[1_000, 10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--max-legado', type=int, default=10_000,
+                        help='tamaño máximo para medir la implementación anterior')
+    args = parser.parse_args(argv)
+
+    print(f"{'impl':<8}{'n':>12}{'encolar ops/s':>18}{'extraer ops/s':>18}")
+    for n in args.tamaños:
+        filas = [('carriles', medir(ColaPrioridadGlobal, n))]
+        if n <= args.max_legado:
+            filas.append(('legado', medir(ColaLegado, n)))
+        for nombre, r in filas:
+            print(f"{nombre:<8}{r['n']:>12}{r['encolar_ops_s']:>18,.0f}{r['extraer_ops_s']:>18,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark de memoria: `logs` como lista de dicts vs `LogEventos` columnar.
+
+Genera la misma secuencia de eventos (llegada / asignación / finalización)
+en ambas representaciones y mide la memoria retenida con `tracemalloc`.
+
+Uso (desde `Backend/`):
+    python -m bench.bench_logs
+    python -m bench.bench_logs --eventos 100000 1000000
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from Tda.Log_eventos import LogEventos
+from Tda.Ventanillas import Ventanilla
+
+VENTANILLAS = [Ventanilla('A', 'V_Preferencial'), Ventanilla('M', 'V_Intermedia'),
+               Ventanilla('B', 'V_Regular')]
+TIPOS = ('A', 'M', 'B')
+
+
+def _eventos(n):
+    """Tripletas llegada/asignación/finalización hasta completar `n` eventos."""
+    for i in range(n):
+        cliente = i // 3 + 1
+        j = cliente % 3
+        yield i % 3, i // 3, cliente, TIPOS[j], j
+
+
+def llenar_dicts(n):
+    logs = []
+    for evento, t, cliente, tipo, j in _eventos(n):
+        cid = f"C{cliente}"
+        if evento == 0:
+            logs.append({'tick': t, 'event': 'llegada',
+                         'cliente': {'id': cid, 'tipo': tipo, 'llegada': t}})
+        elif evento == 1:
+            v = VENTANILLAS[j]
+            logs.append({'tick': t, 'event': 'asignacion',
+                         'ventanilla': {'nombre': v.nombre, 'tipo': v.tipo},
+                         'cliente': {'id': cid, 'tipo': tipo}, 'duracion': 1})
+        else:
+            logs.append({'tick': t, 'event': 'finalizacion',
+                         'cliente': {'id': cid, 'tipo': tipo}, 'inicio': t, 'fin': t})
+    return logs
+
+
+def llenar_columnar(n):
+    logs = LogEventos(VENTANILLAS)
+    for evento, t, cliente, tipo, j in _eventos(n):
+        if evento == 0:
+            logs.agregar_llegada(t, cliente, tipo)
+        elif evento == 1:
+            logs.agregar_asignacion(t, cliente, tipo, j, 1)
+        else:
+            logs.agregar_finalizacion(t, cliente, tipo, j, 1)
+    return logs
+
+
+def medir(llenar, n):
+    gc.collect()
+    tracemalloc.start()
+    logs = llenar(n)
+    actual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del logs
+    return actual, pico
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--eventos', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'eventos':>10}{'dicts MB':>12}{'columnar MB':>14}{'B/evento dicts':>17}"
+          f"{'B/evento col.':>15}{'razón':>8}")
+    for n in args.eventos:
+        dicts, _ = medir(llenar_dicts, n)
+        col, _ = medir(llenar_columnar, n)
+        print(f"{n:>10}{dicts / 1e6:>12.1f}{col / 1e6:>14.2f}{dicts / n:>17.0f}"
+              f"{col / n:>15.1f}{dicts / col:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
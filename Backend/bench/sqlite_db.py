@@ -0,0 +1,167 @@
+"""Sustituto local de MySQL para benchmarks: `DatabaseConnection` sobre sqlite3.
+
+Los DAOs usan el estilo de parámetros `%s`, cursores `dictionary=True`,
+`NOW()` y `DATE_FORMAT()` de MySQL; `ConexionSQLite` y `CursorSQLite` adaptan
+eso a sqlite3 para medir la capa de persistencia sin servidor.
+
+Uso:
+    from bench.sqlite_db import crear_db_sqlite
+    db = crear_db_sqlite()          # archivo temporal con el esquema creado
+    dao = DAOResultados(db)
+"""
+
+import datetime
+import os
+import sqlite3
+import tempfile
+
+from config.db import DatabaseConnection
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS corridas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tiempo TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS colas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    corrida_id INTEGER NOT NULL REFERENCES corridas(id),
+    nombre_id TEXT NOT NULL,
+    n_entrada INTEGER,
+    n_atendidos INTEGER,
+    n_no_atendidos INTEGER,
+    n_abandonaron INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS historial (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    corrida_id INTEGER NOT NULL REFERENCES corridas(id),
+    cliente_id TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    llegada INTEGER,
+    inicio INTEGER,
+    fin INTEGER
+);
+CREATE TABLE IF NOT EXISTS avances (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    corrida_id INTEGER NOT NULL REFERENCES corridas(id),
+    tick INTEGER NOT NULL,
+    tipo TEXT NOT NULL,
+    llegaron INTEGER,
+    atendidos INTEGER,
+    en_cola INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_colas_corrida_tipo ON colas (corrida_id, nombre_id);
+CREATE INDEX IF NOT EXISTS idx_corridas_tiempo ON corridas (tiempo);
+CREATE INDEX IF NOT EXISTS idx_historial_corrida ON historial (corrida_id, id);
+CREATE INDEX IF NOT EXISTS idx_avances_corrida_tick ON avances (corrida_id, tick);
+"""
+
+
+def _ahora():
+    return datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
+
+
+def _formatear_fecha(valor, formato):
+    # Sólo se usan %Y %m %d %H, que coinciden entre MySQL y strftime
+    if valor is None:
+        return None
+    return datetime.datetime.fromisoformat(valor).strftime(formato)
+
+
+class CursorSQLite:
+    """Cursor con la interfaz que usan los DAOs (`%s`, filas como dict)."""
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+        self._insercion = False
+
+    @staticmethod
+    def _adaptar(query):
+        return query.replace('%s', '?')
+
+    def execute(self, query, parametros=()):
+        self._cursor.execute(self._adaptar(query), parametros)
+        self._insercion = query.lstrip().upper().startswith('INSERT')
+
+    def executemany(self, query, filas):
+        self._cursor.executemany(self._adaptar(query), filas)
+
+    def _fila(self, fila):
+        if fila is None or not self._dictionary:
+            return fila
+        return {d[0]: v for d, v in zip(self._cursor.description, fila)}
+
+    def fetchone(self):
+        return self._fila(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._fila(f) for f in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._fila(f) for f in self._cursor.fetchall()]
+
+    @property
+    def lastrowid(self):
+        # Como en MySQL, tras un INSERT de varias filas es el id de la primera
+        # (SQLite da el de la última)
+        if self._insercion and self._cursor.rowcount > 1:
+            return self._cursor.lastrowid - self._cursor.rowcount + 1
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class ConexionSQLite:
+    def __init__(self, ruta):
+        self._conn = sqlite3.connect(ruta, check_same_thread=False)
+        self._conn.create_function('NOW', 0, _ahora)
+        self._conn.create_function('DATE_FORMAT', 2, _formatear_fecha)
+
+    def cursor(self, dictionary=False, **_):
+        return CursorSQLite(self._conn.cursor(), dictionary)
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def crear_db_sqlite(ruta=None, pool_size=1):
+    """`DatabaseConnection` respaldada por sqlite3 con el esquema ya creado.
+
+    Sin `ruta` usa un archivo temporal (se borra con `db.cerrar()`).
+    """
+    temporal = ruta is None
+    if temporal:
+        fd, ruta = tempfile.mkstemp(prefix='bench_', suffix='.sqlite3')
+        os.close(fd)
+
+    inicial = sqlite3.connect(ruta)
+    inicial.executescript(ESQUEMA)
+    inicial.close()
+
+    db = DatabaseConnection(pool_size=pool_size, fabrica=lambda: ConexionSQLite(ruta))
+    if temporal:
+        cerrar = db.cerrar
+
+        def cerrar_y_borrar():
+            cerrar()
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+        db.cerrar = cerrar_y_borrar
+    return db
@@ -0,0 +1,326 @@
+"""Suite de benchmarks del camino caliente de la simulación.
+
+Casos:
+- simulador: ticks/s de `SimuladorBanco.run` por motor y tasa de llegada
+  (y en modo compacto con backlog creciente).
+- cola: encolar / extraer por tipo en `ColaPrioridadGlobal` por backlog.
+- historial: `insertar_final`, `to_list` e `iter_desde` de `ListaEnlazadaHistorial`.
+- resultado: serialización JSON de `/simulacion/result` (completo, paginado y en
+  streaming con y sin gzip).
+- persistencia: `DAOResultados.guardar_resultado` sobre SQLite (`bench.sqlite_db`).
+
+Escribe los resultados en JSON y, con `--base`, compara contra una
+corrida anterior y termina con código 1 si algún caso empeora más que
+`--tolerancia`. `--perfil cprofile` guarda un .prof por caso e imprime
+las funciones más costosas; `--perfil tracemalloc` agrega el pico de
+memoria de cada caso.
+
+Uso (desde `Backend/`):
+    python -m bench.suite --salida bench_resultados.json
+    python -m bench.suite --rapido --casos simulador cola
+    python -m bench.suite --base bench_base.json --tolerancia 0.25
+    python -m bench.suite --rapido --perfil cprofile --dir-perfiles perfiles/
+"""
+
+import argparse
+import cProfile
+import gc
+import json
+import os
+import platform
+import pstats
+import sys
+import time
+import tracemalloc
+
+from Modelo.Simulador import SimuladorBanco, MOTORES
+from Modelo.Cliente import Cliente
+from Tda.Cola_prioridad import ColaPrioridadGlobal
+from Tda.Lista_historial import ListaEnlazadaHistorial
+from bench.bench_cola_prioridad import medir as medir_cola
+
+PROB_SERVICIO = {'A': 0.4, 'M': 0.3, 'B': 0.3}
+# Tasas de llegada por tipo: baja (ventanillas ociosas), media, alta (backlog creciente)
+TASAS = {'baja': 0.01, 'media': 0.15, 'alta': 0.5}
+TIPOS = ('A', 'M', 'B')
+
+
+def _cronometrar(funcion, repeticiones):
+    """Mejor tiempo de `repeticiones` llamadas y el valor de la última."""
+    mejor = float('inf')
+    valor = None
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        valor = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, valor
+
+
+# ---------------------------
+# Casos
+# ---------------------------
+def caso_simulador(tiempo, motor, tasa, repeticiones, compacto=False):
+    pl = {t: TASAS[tasa] for t in TIPOS}
+
+    def correr():
+        return SimuladorBanco(tiempo, pl, PROB_SERVICIO, motor=motor, semilla=1,
+                              compacto=compacto).run()
+
+    seg, resultado = _cronometrar(correr, repeticiones)
+    eventos = len(resultado['logs'])
+    return [('ticks_s', tiempo / seg, True), ('eventos_s', eventos / seg, True)]
+
+
+def caso_cola(n, repeticiones):
+    mejores = [medir_cola(ColaPrioridadGlobal, n) for _ in range(repeticiones)]
+    return [('encolar_ops_s', max(m['encolar_ops_s'] for m in mejores), True),
+            ('extraer_ops_s', max(m['extraer_ops_s'] for m in mejores), True)]
+
+
+def _clientes(n):
+    clientes = []
+    for i in range(n):
+        c = Cliente(f"C{i + 1}", TIPOS[i % 3], i)
+        c.tiempo_inicio_atencion = i + 1
+        c.tiempo_fin_atencion = i + 2
+        clientes.append(c)
+    return clientes
+
+
+def caso_historial(n, repeticiones):
+    clientes = _clientes(n)
+
+    def llenar():
+        historial = ListaEnlazadaHistorial()
+        for c in clientes:
+            historial.insertar_final(c)
+        return historial
+
+    seg_insertar, historial = _cronometrar(llenar, repeticiones)
+    seg_lista, _ = _cronometrar(historial.to_list, repeticiones)
+    seg_pagina, _ = _cronometrar(lambda: list(historial.iter_desde(n // 2, 100)), repeticiones)
+    return [('insertar_ops_s', n / seg_insertar, True),
+            ('to_list_s', seg_lista, False),
+            ('pagina_medio_s', seg_pagina, False)]
+
+
+def _simulacion_terminada(tiempo):
+    sim = SimuladorBanco(tiempo, {t: TASAS['media'] for t in TIPOS}, PROB_SERVICIO, semilla=1)
+    sim.run()
+    return sim
+
+
+def caso_resultado(tiempo, repeticiones):
+    """Mismo payload que `server._resultado` (sin Flask): completo y una página."""
+    from Controller.SimuladorController import SimuladorController
+    from config import serializacion
+    from Dao.DAO_colas import DAOColas
+    from Dao.DAO_corridas import DAOCorridas
+    from bench.sqlite_db import crear_db_sqlite
+
+    sim = _simulacion_terminada(tiempo)
+    db = crear_db_sqlite()
+    try:
+        ctrl = SimuladorController(None, None, None, DAOColas(db), DAOCorridas(db), simulador=sim)
+
+        def completo():
+            return json.dumps({
+                'estadisticas': sim.stats,
+                'metricas': sim.resumen_metricas(),
+                'historial': sim.historial.to_list(),
+                'cola_prioridad': sim.cola_prioridad.ver_lista(),
+                'logs': list(sim.logs),
+            })
+
+        def pagina():
+            return json.dumps(ctrl.pagina_resultado('logs', len(sim.logs) // 2, 500))
+
+        def streaming(codificacion=None):
+            bloques = serializacion.comprimir(
+                serializacion.codificar_secciones(ctrl.secciones_resultado()), codificacion)
+            return sum(len(b) for b in bloques)
+
+        def primer_bloque():
+            return next(serializacion.codificar_secciones(ctrl.secciones_resultado()))
+
+        seg_completo, cuerpo = _cronometrar(completo, repeticiones)
+        seg_pagina, _ = _cronometrar(pagina, repeticiones)
+        seg_stream, _ = _cronometrar(streaming, repeticiones)
+        seg_primero, _ = _cronometrar(primer_bloque, repeticiones)
+        seg_gzip, bytes_gzip = _cronometrar(lambda: streaming(serializacion.GZIP), repeticiones)
+    finally:
+        db.cerrar()
+    return [('completo_s', seg_completo, False),
+            ('completo_bytes', len(cuerpo), False),
+            ('pagina_500_s', seg_pagina, False),
+            ('streaming_s', seg_stream, False),
+            ('primer_bloque_s', seg_primero, False),
+            ('streaming_gzip_s', seg_gzip, False),
+            ('streaming_gzip_bytes', bytes_gzip, False)]
+
+
+def caso_persistencia(n, repeticiones):
+    from Dao.DAO_resultados import DAOResultados
+    from bench.sqlite_db import crear_db_sqlite
+
+    historial = ListaEnlazadaHistorial()
+    for c in _clientes(n):
+        historial.insertar_final(c)
+    stats = {t: {'llegaron': n, 'atendidos': n, 'no_atendidos': 0} for t in TIPOS}
+
+    db = crear_db_sqlite()
+    try:
+        dao = DAOResultados(db)
+        seg, corrida_id = _cronometrar(
+            lambda: dao.guardar_resultado(None, stats, historial.iter_desde(), tiempo=n),
+            repeticiones)
+        if corrida_id is None:
+            raise RuntimeError("guardar_resultado falló")
+    finally:
+        db.cerrar()
+    return [('filas_s', n / seg, True)]
+
+
+def casos(rapido):
+    """Lista de `(nombre, función, params)` a ejecutar."""
+    tiempo = 20_000 if rapido else 200_000
+    tamaños = [10_000, 100_000] if rapido else [10_000, 100_000, 1_000_000]
+    lista = []
+    for motor in MOTORES:
+        for tasa in TASAS:
+            lista.append(('simulador', caso_simulador, {'tiempo': tiempo, 'motor': motor, 'tasa': tasa}))
+        lista.append(('simulador', caso_simulador,
+                      {'tiempo': tiempo, 'motor': motor, 'tasa': 'alta', 'compacto': True}))
+    for n in tamaños:
+        lista.append(('cola', caso_cola, {'n': n}))
+    for n in tamaños:
+        lista.append(('historial', caso_historial, {'n': n}))
+    for t in ([5_000] if rapido else [5_000, 50_000]):
+        lista.append(('resultado', caso_resultado, {'tiempo': t}))
+    for n in tamaños[:2]:
+        lista.append(('persistencia', caso_persistencia, {'n': n}))
+    return lista
+
+
+# ---------------------------
+# Ejecución, perfiles y regresiones
+# ---------------------------
+def _clave(r):
+    return f"{r['caso']}[{json.dumps(r['params'], sort_keys=True)}].{r['metrica']}"
+
+
+def ejecutar(seleccion, rapido, repeticiones, perfil=None, dir_perfiles=None):
+    resultados = []
+    for nombre, funcion, params in casos(rapido):
+        if seleccion and nombre not in seleccion:
+            continue
+        etiqueta = f"{nombre} {json.dumps(params, sort_keys=True)}"
+        print(f"-> {etiqueta}", file=sys.stderr)
+
+        perfilador = None
+        if perfil == 'cprofile':
+            perfilador = cProfile.Profile()
+            perfilador.enable()
+        elif perfil == 'tracemalloc':
+            tracemalloc.start()
+
+        metricas = funcion(repeticiones=repeticiones, **params)
+
+        pico = None
+        if perfilador is not None:
+            perfilador.disable()
+            _reportar_perfil(perfilador, etiqueta, dir_perfiles)
+        elif perfil == 'tracemalloc':
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        for metrica, valor, mayor_es_mejor in metricas:
+            r = {'caso': nombre, 'params': params, 'metrica': metrica,
+                 'valor': valor, 'mayor_es_mejor': mayor_es_mejor}
+            if pico is not None:
+                r['pico_memoria_b'] = pico
+            resultados.append(r)
+    return resultados
+
+
+def _reportar_perfil(perfilador, etiqueta, dir_perfiles):
+    if dir_perfiles:
+        os.makedirs(dir_perfiles, exist_ok=True)
+        nombre = ''.join(ch if ch.isalnum() else '_' for ch in etiqueta).strip('_')
+        perfilador.dump_stats(os.path.join(dir_perfiles, f"{nombre}.prof"))
+    print(f"\n== perfil: {etiqueta}", file=sys.stderr)
+    pstats.Stats(perfilador, stream=sys.stderr).sort_stats('cumulative').print_stats(12)
+
+
+def comparar(resultados, base, tolerancia):
+    """Devuelve las regresiones: casos que empeoran más que `tolerancia` (fracción)."""
+    previos = {_clave(r): r['valor'] for r in base.get('resultados', [])}
+    regresiones = []
+    for r in resultados:
+        anterior = previos.get(_clave(r))
+        if not anterior or r['metrica'].endswith('_bytes'):
+            continue
+        if r['mayor_es_mejor']:
+            empeora = (anterior - r['valor']) / anterior
+        else:
+            empeora = (r['valor'] - anterior) / anterior
+        r['cambio_vs_base'] = -empeora
+        if empeora > tolerancia:
+            regresiones.append((r, anterior, empeora))
+    return regresiones
+
+
+def _imprimir(resultados):
+    print(f"{'caso':<62}{'métrica':<18}{'valor':>16}{'vs base':>10}")
+    for r in resultados:
+        params = ','.join(f"{k}={v}" for k, v in r['params'].items())
+        cambio = r.get('cambio_vs_base')
+        cambio = f"{cambio:+.1%}" if cambio is not None else ''
+        print(f"{r['caso'] + ' ' + params:<62}{r['metrica']:<18}{r['valor']:>16,.4g}{cambio:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--casos', nargs='+',
+                        choices=('simulador', 'cola', 'historial', 'resultado', 'persistencia'))
+    parser.add_argument('--rapido', action='store_true', help='tamaños reducidos (CI)')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--salida', help='archivo JSON de resultados')
+    parser.add_argument('--base', help='JSON de una corrida anterior para detectar regresiones')
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='empeoramiento máximo admitido frente a --base (fracción)')
+    parser.add_argument('--perfil', choices=('cprofile', 'tracemalloc'))
+    parser.add_argument('--dir-perfiles', help='dónde guardar los .prof de --perfil cprofile')
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar(args.casos, args.rapido, args.repeticiones, args.perfil, args.dir_perfiles)
+
+    regresiones = []
+    if args.base:
+        with open(args.base, encoding='utf-8') as f:
+            regresiones = comparar(resultados, json.load(f), args.tolerancia)
+
+    _imprimir(resultados)
+    if args.salida:
+        informe = {
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'rapido': args.rapido,
+            'perfil': args.perfil,
+            'resultados': resultados,
+        }
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2)
+
+    if regresiones:
+        print(f"\n{len(regresiones)} regresión(es) por encima de {args.tolerancia:.0%}:")
+        for r, anterior, empeora in regresiones:
+            print(f"  {_clave(r)}: {anterior:,.4g} -> {r['valor']:,.4g} ({empeora:.1%} peor)")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
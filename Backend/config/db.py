@@ -1,13 +1,242 @@
 """Helpers para la conexión a la base de datos.
 
-Provee la clase `DatabaseConnection` con el método `get_connection()`.
+Provee la clase `DatabaseConnection` con el método `get_connection()` y los
+context managers `conexion()` / `cursor()`, que reutilizan conexiones a
+través de un `PoolConexiones`.
+
+Importar este módulo no carga `mysql.connector` ni el `.env`: el `.env` se
+lee con `cargar_entorno()` (lo llama `DatabaseConnection` y `create_app`)
+y el conector se importa al abrir la primera conexión. `ErrorBD` es la
+excepción base del conector (o una que nunca se lanza si no está
+instalado), para los `except` de los DAOs.
 """
 
-import mysql.connector
-from dotenv import load_dotenv
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import os
 
-load_dotenv()
+_entorno_cargado = False
+
+
+def cargar_entorno():
+    """Carga el `.env` en `os.environ` una sola vez (no pisa variables ya definidas)."""
+    global _entorno_cargado
+    if not _entorno_cargado:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _entorno_cargado = True
+
+
+def __getattr__(nombre):
+    # `ErrorBD` se resuelve al evaluarse el primer `except db.ErrorBD`, es decir,
+    # sólo cuando ya ocurrió un error; así importar los DAOs no carga el conector
+    global ErrorBD
+    if nombre != 'ErrorBD':
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    try:
+        from mysql.connector import Error as ErrorBD
+    except ImportError:
+        class ErrorBD(Exception):
+            """Sustituto cuando `mysql.connector` no está instalado (nunca se lanza)."""
+    return ErrorBD
+
+# Formatos de DATE_FORMAT para agrupar por ventana de tiempo en los agregados
+FORMATOS_VENTANA = {
+    'hora': '%Y-%m-%d %H:00',
+    'dia': '%Y-%m-%d',
+    'mes': '%Y-%m',
+}
+
+
+class PoolConexiones:
+    """Pool de conexiones DB-API acotado y seguro entre hilos.
+
+    - `tamaño`: máximo de conexiones abiertas a la vez.
+    - `timeout`: segundos que `obtener()` espera una conexión libre antes de
+      lanzar `TimeoutError`.
+    - `validar_tras`: una conexión que estuvo inactiva más de estos segundos
+      se verifica antes de entregarla; si no responde se descarta y se
+      abre una nueva.
+
+    `fabrica` es cualquier callable que devuelva una conexión nueva, así el
+    pool funciona igual con MySQL o con un sustituto local (p. ej. sqlite3).
+    """
+
+    def __init__(self, fabrica, tamaño=5, timeout=10.0, validar_tras=30.0):
+        if tamaño < 1:
+            raise ValueError("tamaño del pool debe ser >= 1")
+        self._fabrica = fabrica
+        self.tamaño = tamaño
+        self.timeout = timeout
+        self.validar_tras = validar_tras
+
+        self._cond = threading.Condition()
+        self._libres = deque()  # (conexion, instante_de_devolucion)
+        self._abiertas = 0
+        self._en_uso = 0
+        self._cerrado = False
+
+        # Métricas
+        self._checkouts = 0
+        self._esperas = 0
+        self._timeouts = 0
+        self._descartadas = 0
+        self._latencia_total = 0.0
+        self._latencia_max = 0.0
+
+    # ---------------------------
+    # Checkout / devolución
+    # ---------------------------
+    def obtener(self):
+        """Entrega una conexión del pool (o una nueva si hay cupo)."""
+        inicio = time.perf_counter()
+        limite = time.monotonic() + self.timeout
+        conn = None
+        inactiva_desde = None
+        with self._cond:
+            espero = False
+            while True:
+                if self._cerrado:
+                    raise RuntimeError("el pool de conexiones está cerrado")
+                if self._libres:
+                    conn, inactiva_desde = self._libres.pop()
+                    break
+                if self._abiertas < self.tamaño:
+                    self._abiertas += 1
+                    break
+                if not espero:
+                    self._esperas += 1
+                    espero = True
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self._timeouts += 1
+                    raise TimeoutError(
+                        f"sin conexiones libres tras {self.timeout}s (pool de {self.tamaño})")
+                self._cond.wait(restante)
+            self._en_uso += 1
+
+        # Apertura y validación fuera del lock: pueden ir a la red
+        try:
+            if conn is not None and time.monotonic() - inactiva_desde > self.validar_tras:
+                if not self._es_sana(conn):
+                    self._cerrar_silencioso(conn)
+                    with self._cond:
+                        self._descartadas += 1
+                    conn = None
+            if conn is None:
+                conn = self._fabrica()
+        except Exception:
+            with self._cond:
+                self._abiertas -= 1
+                self._en_uso -= 1
+                self._cond.notify()
+            raise
+
+        latencia = time.perf_counter() - inicio
+        with self._cond:
+            self._checkouts += 1
+            self._latencia_total += latencia
+            self._latencia_max = max(self._latencia_max, latencia)
+        return conn
+
+    def devolver(self, conn, descartar=False):
+        """Devuelve `conn` al pool; con `descartar=True` la cierra y libera el cupo."""
+        with self._cond:
+            self._en_uso -= 1
+            if descartar or self._cerrado:
+                self._abiertas -= 1
+                if descartar:
+                    self._descartadas += 1
+            else:
+                self._libres.append((conn, time.monotonic()))
+                conn = None
+            self._cond.notify()
+        if conn is not None:
+            self._cerrar_silencioso(conn)
+
+    @contextmanager
+    def conexion(self):
+        """Context manager: entrega una conexión y la devuelve al salir.
+
+        Si el bloque lanza una excepción se hace `rollback()`; si el rollback
+        también falla la conexión se considera rota y se descarta. Una
+        transacción que quedó abierta sin commit (p. ej. tras un SELECT) se
+        cierra antes de devolver la conexión, para que el siguiente usuario
+        no lea una instantánea vieja.
+        """
+        conn = self.obtener()
+        try:
+            yield conn
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                self.devolver(conn, descartar=True)
+                raise
+            self.devolver(conn)
+            raise
+        try:
+            if getattr(conn, 'in_transaction', False):
+                conn.rollback()
+        except Exception:
+            self.devolver(conn, descartar=True)
+            raise
+        self.devolver(conn)
+
+    # ---------------------------
+    # Salud y cierre
+    # ---------------------------
+    @staticmethod
+    def _es_sana(conn):
+        try:
+            if hasattr(conn, 'is_connected'):
+                return conn.is_connected()
+            cur = conn.cursor()
+            try:
+                cur.execute("SELECT 1")
+                cur.fetchall()
+            finally:
+                cur.close()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _cerrar_silencioso(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def cerrar(self):
+        """Cierra las conexiones libres; las que están en uso se cierran al devolverse."""
+        with self._cond:
+            self._cerrado = True
+            libres = [c for c, _ in self._libres]
+            self._libres.clear()
+            self._abiertas -= len(libres)
+            self._cond.notify_all()
+        for conn in libres:
+            self._cerrar_silencioso(conn)
+
+    def metricas(self):
+        with self._cond:
+            return {
+                'tamaño': self.tamaño,
+                'abiertas': self._abiertas,
+                'en_uso': self._en_uso,
+                'libres': len(self._libres),
+                'checkouts': self._checkouts,
+                'esperas': self._esperas,
+                'timeouts': self._timeouts,
+                'descartadas': self._descartadas,
+                'latencia_checkout_media_s': (self._latencia_total / self._checkouts
+                                              if self._checkouts else 0.0),
+                'latencia_checkout_max_s': self._latencia_max,
+            }
 
 
 class DatabaseConnection:
@@ -16,22 +245,82 @@ class DatabaseConnection:
     Lee las variables de entorno `DB_HOST`, `DB_USERNAME`, `DB_PASSWORD` y
     `DB_NAME` al inicializar y expone `get_connection()` para obtener una
     conexión nueva.
+
+    Los DAOs usan `conexion()` / `cursor()`, que toman la conexión de un
+    pool (`DB_POOL_SIZE`, `DB_POOL_TIMEOUT`, `DB_POOL_VALIDAR`). Con
+    `DB_POOL_SIZE=0` se abre y cierra una conexión por operación.
     """
 
-    def __init__(self):
+    def __init__(self, pool_size=None, pool_timeout=None, validar_tras=None, fabrica=None):
+        cargar_entorno()
         self.host = os.getenv("DB_HOST")
         self.user = os.getenv("DB_USERNAME")
         self.password = os.getenv("DB_PASSWORD")
         self.database = os.getenv("DB_NAME")
 
+        self.pool_size = int(os.getenv("DB_POOL_SIZE", 5) if pool_size is None else pool_size)
+        self.pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", 10) if pool_timeout is None else pool_timeout)
+        self.validar_tras = float(os.getenv("DB_POOL_VALIDAR", 30) if validar_tras is None else validar_tras)
+
+        self._fabrica = fabrica or self.get_connection
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
     def get_connection(self):
         """Devuelve una nueva conexión `mysql.connector` usando la config.
 
         Lanza excepciones de `mysql.connector` si la conexión falla.
         """
+        import mysql.connector
         return mysql.connector.connect(
             host=self.host,
             user=self.user,
             password=self.password,
             database=self.database,
-        )
\ No newline at end of file
+        )
+
+    def _obtener_pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = PoolConexiones(self._fabrica, self.pool_size,
+                                                self.pool_timeout, self.validar_tras)
+        return self._pool
+
+    @contextmanager
+    def conexion(self):
+        """Context manager que entrega una conexión y la devuelve (o cierra) al salir."""
+        if self.pool_size > 0:
+            with self._obtener_pool().conexion() as conn:
+                yield conn
+            return
+        conn = self._fabrica()
+        try:
+            yield conn
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            conn.close()
+
+    @contextmanager
+    def cursor(self, **kwargs):
+        """Context manager que entrega `(conexion, cursor)` y cierra el cursor al salir."""
+        with self.conexion() as conn:
+            cur = conn.cursor(**kwargs)
+            try:
+                yield conn, cur
+            finally:
+                cur.close()
+
+    def metricas_pool(self):
+        if self._pool is None:
+            return {'tamaño': self.pool_size, 'abiertas': 0, 'en_uso': 0}
+        return self._pool.metricas()
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.cerrar()
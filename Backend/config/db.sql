@@ -3,7 +3,8 @@ USE sistema_colas;
 
 CREATE TABLE IF NOT EXISTS corridas (
     id INT AUTO_INCREMENT PRIMARY KEY,
-    tiempo DATETIME NOT NULL
+    tiempo DATETIME NOT NULL,
+    INDEX idx_corridas_tiempo (tiempo)
 );
 
 CREATE TABLE IF NOT EXISTS colas (
@@ -13,5 +14,34 @@ CREATE TABLE IF NOT EXISTS colas (
     n_entrada INT,
     n_atendidos INT,
     n_no_atendidos INT,
+    n_abandonaron INT DEFAULT 0,
+    INDEX idx_colas_corrida_tipo (corrida_id, nombre_id),
     FOREIGN KEY (corrida_id) REFERENCES corridas(id)
-);
\ No newline at end of file
+);
+
+CREATE TABLE IF NOT EXISTS historial (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    corrida_id INT NOT NULL,
+    cliente_id VARCHAR(20) NOT NULL,
+    tipo VARCHAR(1) NOT NULL,
+    llegada INT,
+    inicio INT,
+    fin INT,
+    INDEX idx_historial_corrida (corrida_id, id),
+    FOREIGN KEY (corrida_id) REFERENCES corridas(id)
+);
+
+CREATE TABLE IF NOT EXISTS avances (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    corrida_id INT NOT NULL,
+    tick INT NOT NULL,
+    tipo VARCHAR(1) NOT NULL,
+    llegaron INT,
+    atendidos INT,
+    en_cola INT,
+    INDEX idx_avances_corrida_tick (corrida_id, tick),
+    FOREIGN KEY (corrida_id) REFERENCES corridas(id)
+);
+
+-- Cambios sobre bases existentes: config/migraciones/ (idempotentes: también
+-- se pueden aplicar sobre una base recién creada con este archivo)
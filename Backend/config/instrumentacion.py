@@ -0,0 +1,291 @@
+"""Instrumentación liviana: contadores, medidores e histogramas.
+
+Se activa con la variable de entorno `INSTRUMENTACION=1` (o con
+`registro.activar()`); desactivada, los puntos instrumentados se reducen
+a comprobar un booleano y el motor de simulación ni siquiera eso (elige
+su bucle una vez por corrida). `exportar()` devuelve todo en formato de
+texto de Prometheus para el endpoint `/metrics`.
+
+Uso:
+    from config import instrumentacion
+
+    with instrumentacion.SERIALIZACION.medir(endpoint='result'):
+        ...
+
+    @instrumentacion.cronometrado(instrumentacion.DAO, operacion='crear_cola')
+    def crear_cola(...): ...
+"""
+
+import functools
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Cubetas por defecto (segundos): de microsegundos (fases de un tick) a segundos (DAO)
+CUBETAS_SEGUNDOS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _escapar_ayuda(texto):
+    # En HELP sólo se escapan la barra y el salto de línea
+    return str(texto).replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _formato(valor):
+    if valor == math.inf:
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _clave(self, etiquetas):
+        if set(etiquetas) != set(self.etiquetas):
+            raise ValueError(f"{self.nombre}: etiquetas esperadas {self.etiquetas}, "
+                             f"recibidas {tuple(etiquetas)}")
+        return tuple(str(etiquetas[e]) for e in self.etiquetas)
+
+    def serie(self, **etiquetas):
+        """Serie para un juego de etiquetas; guardarla evita resolverlas en cada uso."""
+        clave = self._clave(etiquetas)
+        serie = self._series.get(clave)
+        if serie is None:
+            with self._lock:
+                serie = self._series.setdefault(clave, self._nueva_serie())
+        return serie
+
+    def descartar(self, **filtro):
+        """Quita las series cuyas etiquetas coinciden con `filtro`."""
+        posiciones = [(self.etiquetas.index(k), str(v)) for k, v in filtro.items()
+                      if k in self.etiquetas]
+        if len(posiciones) != len(filtro):
+            return
+        with self._lock:
+            for clave in [c for c in self._series if all(c[i] == v for i, v in posiciones)]:
+                del self._series[clave]
+
+    def _etiquetas_texto(self, clave, extra=()):
+        pares = list(zip(self.etiquetas, clave)) + list(extra)
+        if not pares:
+            return ''
+        return '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in pares) + '}'
+
+    def exportar(self):
+        lineas = [f"# HELP {self.nombre} {_escapar_ayuda(self.ayuda)}",
+                  f"# TYPE {self.nombre} {self.tipo}"]
+        with self._lock:
+            series = list(self._series.items())
+        for clave, serie in series:
+            lineas.extend(self._lineas(clave, serie))
+        return lineas
+
+
+class _SerieValor:
+    __slots__ = ('valor', '_lock')
+
+    def __init__(self):
+        self.valor = 0
+        self._lock = threading.Lock()
+
+    def inc(self, delta=1):
+        with self._lock:
+            self.valor += delta
+
+    def fijar(self, valor):
+        self.valor = valor
+
+
+class Contador(_Metrica):
+    tipo = 'counter'
+
+    def _nueva_serie(self):
+        return _SerieValor()
+
+    def inc(self, delta=1, **etiquetas):
+        if registro.activa:
+            self.serie(**etiquetas).inc(delta)
+
+    def _lineas(self, clave, serie):
+        return [f"{self.nombre}{self._etiquetas_texto(clave)} {_formato(serie.valor)}"]
+
+
+class Medidor(Contador):
+    """Valor instantáneo (p. ej. conexiones en uso); se fija al exportar."""
+    tipo = 'gauge'
+
+    def fijar(self, valor, **etiquetas):
+        self.serie(**etiquetas).fijar(valor)
+
+
+class _SerieHistograma:
+    __slots__ = ('cubetas', 'cuentas', 'suma', 'n', '_lock')
+
+    def __init__(self, cubetas):
+        self.cubetas = cubetas
+        self.cuentas = [0] * (len(cubetas) + 1)
+        self.suma = 0.0
+        self.n = 0
+        self._lock = threading.Lock()
+
+    def observar(self, valor):
+        i = bisect_left(self.cubetas, valor)
+        with self._lock:
+            self.cuentas[i] += 1
+            self.suma += valor
+            self.n += 1
+
+    @contextmanager
+    def medir(self):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio)
+
+
+class Histograma(_Metrica):
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), cubetas=CUBETAS_SEGUNDOS):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.cubetas = tuple(sorted(cubetas))
+
+    def _nueva_serie(self):
+        return _SerieHistograma(self.cubetas)
+
+    def observar(self, valor, **etiquetas):
+        if registro.activa:
+            self.serie(**etiquetas).observar(valor)
+
+    @contextmanager
+    def medir(self, **etiquetas):
+        """Observa la duración del bloque (no hace nada si está desactivada)."""
+        if not registro.activa:
+            yield
+            return
+        with self.serie(**etiquetas).medir():
+            yield
+
+    def _lineas(self, clave, serie):
+        with serie._lock:
+            cuentas, suma, n = list(serie.cuentas), serie.suma, serie.n
+        lineas = []
+        acumulado = 0
+        for limite, cuenta in zip(self.cubetas + (math.inf,), cuentas):
+            acumulado += cuenta
+            le = self._etiquetas_texto(clave, [('le', _formato(limite))])
+            lineas.append(f"{self.nombre}_bucket{le} {acumulado}")
+        etiquetas = self._etiquetas_texto(clave)
+        lineas.append(f"{self.nombre}_sum{etiquetas} {_formato(suma)}")
+        lineas.append(f"{self.nombre}_count{etiquetas} {n}")
+        return lineas
+
+
+class Registro:
+    def __init__(self, activa=False):
+        self.activa = activa
+        self._metricas = []
+
+    def activar(self):
+        self.activa = True
+
+    def desactivar(self):
+        self.activa = False
+
+    def _registrar(self, metrica):
+        self._metricas.append(metrica)
+        return metrica
+
+    def contador(self, nombre, ayuda, etiquetas=()):
+        return self._registrar(Contador(nombre, ayuda, etiquetas))
+
+    def medidor(self, nombre, ayuda, etiquetas=()):
+        return self._registrar(Medidor(nombre, ayuda, etiquetas))
+
+    def histograma(self, nombre, ayuda, etiquetas=(), cubetas=CUBETAS_SEGUNDOS):
+        return self._registrar(Histograma(nombre, ayuda, etiquetas, cubetas))
+
+    def descartar(self, **filtro):
+        """Olvida las series con esas etiquetas (p. ej. `corrida=...` al desalojarla)."""
+        for m in self._metricas:
+            m.descartar(**filtro)
+
+    def exportar(self):
+        """Todas las métricas en formato de texto de Prometheus (0.0.4)."""
+        lineas = []
+        for m in self._metricas:
+            lineas.extend(m.exportar())
+        return '\n'.join(lineas) + '\n'
+
+
+registro = Registro(activa=os.getenv('INSTRUMENTACION', '0').lower() in ('1', 'true', 'si', 'sí'))
+
+# ---------------------------
+# Métricas de la aplicación
+# ---------------------------
+FASES = registro.histograma(
+    'simulacion_fase_segundos', 'Duración de cada fase del motor por tick o evento',
+    ('corrida', 'motor', 'fase'))
+TICKS = registro.contador(
+    'simulacion_ticks_total', 'Ticks simulados', ('corrida', 'motor'))
+CORRIDAS = registro.contador(
+    'corridas_total', 'Corridas terminadas por estado final', ('estado',))
+DURACION_CORRIDA = registro.histograma(
+    'corrida_duracion_segundos', 'Duración de run() más persistencia', ('motor',))
+DAO = registro.histograma(
+    'dao_operacion_segundos', 'Duración de las operaciones de los DAOs', ('operacion',))
+SERIALIZACION = registro.histograma(
+    'serializacion_segundos', 'Tiempo de construir y serializar respuestas JSON', ('endpoint',))
+SERIALIZACION_BYTES = registro.contador(
+    'serializacion_bytes_total', 'Bytes de respuestas JSON serializadas', ('endpoint',))
+POOL = registro.medidor(
+    'db_pool', 'Estado del pool de conexiones', ('dato',))
+GESTOR = registro.medidor(
+    'gestor_corridas', 'Ocupación del registro de corridas concurrentes', ('dato',))
+ESCRITOR = registro.medidor(
+    'escritor_diferido', 'Cola de escrituras diferidas (pendientes y acumulados)', ('dato',))
+CACHE = registro.medidor(
+    'cache_resultados', 'Aciertos, fallos y ocupación del cache de resultados', ('dato',))
+
+# Nombres de fase comunes a ambos motores
+FASE_LLEGADAS = 'generar_llegadas'
+FASE_ASIGNACION = 'asignar_ventanillas'
+FASE_PROCESO = 'procesar_ventanillas'
+FASE_ABANDONOS = 'procesar_abandonos'
+
+
+def series_fases(corrida, motor):
+    """Series de llegadas, asignación, proceso y abandonos para una corrida
+    (o None si está desactivada)."""
+    if not registro.activa:
+        return None
+    corrida = 'sin_id' if corrida is None else corrida
+    return tuple(FASES.serie(corrida=corrida, motor=motor, fase=f)
+                 for f in (FASE_LLEGADAS, FASE_ASIGNACION, FASE_PROCESO, FASE_ABANDONOS))
+
+
+def cronometrado(histograma, **etiquetas):
+    """Decorador que observa la duración de cada llamada en `histograma`."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not registro.activa:
+                return funcion(*args, **kwargs)
+            with histograma.serie(**etiquetas).medir():
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
@@ -0,0 +1,50 @@
+-- Migración 001: índices para las lecturas paginadas y los agregados.
+--
+-- Idempotente: los índices que ya existan (p. ej. en una base creada con
+-- el config/db.sql actual) se saltan, así que se puede aplicar sobre
+-- cualquier base:
+--     mysql -u <usuario> -p sistema_colas < config/migraciones/001_indices.sql
+--
+-- - colas (corrida_id, nombre_id): totales por corrida y por tipo, y la
+--   paginación de colas de una corrida. Como empieza por corrida_id también
+--   sirve a la FK; el índice que MySQL creó para la FK en bases anteriores
+--   se deja como está.
+-- - corridas (tiempo): filtros y agrupación por ventana de tiempo.
+-- - historial / avances (corrida_id, ...): lecturas de una corrida en orden.
+--
+-- MySQL no tiene CREATE INDEX IF NOT EXISTS: cada índice se crea con una
+-- sentencia preparada sólo si information_schema no lo lista.
+
+USE sistema_colas;
+
+SET @sql = IF((SELECT COUNT(*) FROM information_schema.statistics
+               WHERE table_schema = DATABASE() AND table_name = 'colas'
+                 AND index_name = 'idx_colas_corrida_tipo') = 0,
+              'CREATE INDEX idx_colas_corrida_tipo ON colas (corrida_id, nombre_id)', 'DO 0');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @sql = IF((SELECT COUNT(*) FROM information_schema.statistics
+               WHERE table_schema = DATABASE() AND table_name = 'corridas'
+                 AND index_name = 'idx_corridas_tiempo') = 0,
+              'CREATE INDEX idx_corridas_tiempo ON corridas (tiempo)', 'DO 0');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @sql = IF((SELECT COUNT(*) FROM information_schema.statistics
+               WHERE table_schema = DATABASE() AND table_name = 'historial'
+                 AND index_name = 'idx_historial_corrida') = 0,
+              'CREATE INDEX idx_historial_corrida ON historial (corrida_id, id)', 'DO 0');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @sql = IF((SELECT COUNT(*) FROM information_schema.statistics
+               WHERE table_schema = DATABASE() AND table_name = 'avances'
+                 AND index_name = 'idx_avances_corrida_tick') = 0,
+              'CREATE INDEX idx_avances_corrida_tick ON avances (corrida_id, tick)', 'DO 0');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
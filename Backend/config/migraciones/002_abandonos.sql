@@ -0,0 +1,20 @@
+-- Migración 002: clientes que abandonaron la cola por impaciencia.
+--
+-- Idempotente: si la columna ya existe (p. ej. en una base creada con el
+-- config/db.sql actual) no hace nada, así que se puede aplicar sobre
+-- cualquier base:
+--     mysql -u <usuario> -p sistema_colas < config/migraciones/002_abandonos.sql
+--
+-- - colas.n_abandonaron: `abandonaron` de las estadísticas por tipo; las
+--   corridas anteriores quedan en 0.
+
+USE sistema_colas;
+
+SET @sql = IF((SELECT COUNT(*) FROM information_schema.columns
+               WHERE table_schema = DATABASE() AND table_name = 'colas'
+                 AND column_name = 'n_abandonaron') = 0,
+              'ALTER TABLE colas ADD COLUMN n_abandonaron INT DEFAULT 0 AFTER n_no_atendidos',
+              'DO 0');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
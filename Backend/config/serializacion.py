@@ -0,0 +1,267 @@
+"""Serialización de respuestas: JSON rápido, streaming por secciones y compresión.
+
+- Codificador JSON: `orjson` si está instalado; si no, `json` de la
+  biblioteca estándar con separadores compactos. Ambos devuelven bytes y
+  escriben NaN/Infinity como null.
+- Formatos: JSON (un documento), NDJSON (una línea por elemento) y
+  MessagePack (si está instalado `msgpack`).
+- Streaming: `codificar_secciones()` recibe las secciones del resultado
+  (un valor o un iterable con su largo) y produce bloques de bytes de
+  ~`TAMAÑO_BLOQUE`; las listas grandes se codifican elemento a elemento,
+  así que nunca se materializa la respuesta completa.
+- Compresión: `comprimir()` aplica gzip o deflate en streaming según
+  `negociar_codificacion()`.
+
+No depende de Flask: server.py arma la respuesta con los bloques.
+"""
+
+import datetime
+import json
+import math
+import zlib
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:   # dependencia opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:   # dependencia opcional
+    msgpack = None
+
+JSON = 'application/json'
+NDJSON = 'application/x-ndjson'
+MSGPACK = 'application/msgpack'
+
+# Alias aceptados en `?format=` y en Accept
+FORMATOS = {
+    'json': JSON, JSON: JSON,
+    'ndjson': NDJSON, NDJSON: NDJSON, 'application/jsonl': NDJSON,
+    'msgpack': MSGPACK, MSGPACK: MSGPACK, 'application/x-msgpack': MSGPACK,
+}
+
+GZIP = 'gzip'
+DEFLATE = 'deflate'
+CODIFICACIONES = (GZIP, DEFLATE)   # en orden de preferencia
+
+TAMAÑO_BLOQUE = 64 * 1024
+NIVEL_COMPRESION = 6
+
+
+# ------------------------
+# CODIFICADOR
+# ------------------------
+def _por_defecto(obj):
+    """Tipos que ni orjson ni json serializan solos (Decimal de MySQL, fechas)."""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    raise TypeError(f"no serializable: {type(obj).__name__}")
+
+
+def _finitos(obj):
+    """Copia de `obj` con NaN/±Infinity como None (lo que hace orjson)."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {clave: _finitos(valor) for clave, valor in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finitos(valor) for valor in obj]
+    return obj
+
+
+# allow_nan=False: NaN/Infinity no son JSON válido
+_codificador = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), allow_nan=False,
+                                default=_por_defecto)
+
+
+def _dumps_estandar(obj):
+    """Codifica `obj` como JSON compacto en bytes UTF-8 (json estándar).
+
+    Los floats no finitos salen como null, igual que con orjson; sólo se
+    recorre el objeto para reemplazarlos si el primer intento los encuentra.
+    """
+    try:
+        texto = _codificador.encode(obj)
+    except ValueError:
+        texto = _codificador.encode(_finitos(obj))
+    return texto.encode('utf-8')
+
+
+if orjson is not None:
+    def dumps(obj):
+        """Codifica `obj` como JSON compacto en bytes UTF-8 (orjson)."""
+        return orjson.dumps(obj, default=_por_defecto, option=orjson.OPT_NON_STR_KEYS)
+else:
+    dumps = _dumps_estandar
+
+
+def disponibles():
+    """Formatos que se pueden servir con las dependencias instaladas."""
+    return (JSON, NDJSON) + ((MSGPACK,) if msgpack is not None else ())
+
+
+# ------------------------
+# NEGOCIACIÓN
+# ------------------------
+def _preferencias(cabecera):
+    """Valores de una cabecera Accept* con q > 0, de mayor a menor q."""
+    valores = []
+    for i, parte in enumerate((cabecera or '').split(',')):
+        valor, _, params = parte.strip().partition(';')
+        if not valor:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            nombre, _, dato = param.strip().partition('=')
+            if nombre == 'q':
+                try:
+                    q = float(dato)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            valores.append((-q, i, valor.strip().lower()))
+    return [valor for _, _, valor in sorted(valores)]
+
+
+def negociar_formato(accept=None, formato=None):
+    """Tipo de contenido a servir: `formato` explícito (`?format=`) o Accept.
+
+    Lanza ValueError si se pide explícitamente un formato no disponible;
+    con Accept se cae a JSON.
+    """
+    if formato:
+        tipo = FORMATOS.get(formato.lower())
+        if tipo is None or tipo not in disponibles():
+            raise ValueError(f"formato no disponible: {formato!r} "
+                             f"(opciones: {', '.join(disponibles())})")
+        return tipo
+    for valor in _preferencias(accept):
+        tipo = FORMATOS.get(valor)
+        if tipo in disponibles():
+            return tipo
+    return JSON
+
+
+def negociar_codificacion(accept_encoding=None):
+    """'gzip', 'deflate' o None según Accept-Encoding."""
+    preferidas = _preferencias(accept_encoding)
+    for valor in preferidas:
+        if valor in CODIFICACIONES:
+            return valor
+    if '*' in preferidas:
+        return CODIFICACIONES[0]
+    return None
+
+
+# ------------------------
+# STREAMING POR SECCIONES
+# ------------------------
+class Seccion:
+    """Sección del resultado: un valor completo o un iterable de elementos.
+
+    Para listas grandes se pasa un iterable perezoso y su `largo` (MessagePack
+    necesita conocerlo antes de escribir los elementos).
+    """
+
+    __slots__ = ('nombre', 'valor', 'largo')
+
+    def __init__(self, nombre, valor, largo=None):
+        self.nombre = nombre
+        self.valor = valor
+        self.largo = largo
+
+    @property
+    def es_lista(self):
+        return self.largo is not None
+
+
+def _agrupar(partes, tamaño):
+    """Junta fragmentos pequeños en bloques de ~`tamaño` bytes."""
+    bloque = []
+    acumulado = 0
+    for parte in partes:
+        bloque.append(parte)
+        acumulado += len(parte)
+        if acumulado >= tamaño:
+            yield b''.join(bloque)
+            bloque = []
+            acumulado = 0
+    if bloque:
+        yield b''.join(bloque)
+
+
+def _partes_json(secciones):
+    yield b'{'
+    for i, seccion in enumerate(secciones):
+        if i:
+            yield b','
+        yield dumps(seccion.nombre) + b':'
+        if not seccion.es_lista:
+            yield dumps(seccion.valor)
+            continue
+        yield b'['
+        primero = True
+        for elemento in seccion.valor:
+            if not primero:
+                yield b','
+            primero = False
+            yield dumps(elemento)
+        yield b']'
+    yield b'}'
+
+
+def _partes_ndjson(secciones):
+    # Una línea por elemento: {"section": ..., "item": ...}; las secciones
+    # que no son listas van en una sola línea con "value"
+    for seccion in secciones:
+        nombre = dumps(seccion.nombre)
+        if not seccion.es_lista:
+            yield b'{"section":' + nombre + b',"value":' + dumps(seccion.valor) + b'}\n'
+            continue
+        prefijo = b'{"section":' + nombre + b',"item":'
+        for elemento in seccion.valor:
+            yield prefijo + dumps(elemento) + b'}\n'
+
+
+def _partes_msgpack(secciones):
+    empaquetador = msgpack.Packer(default=_por_defecto)
+    yield empaquetador.pack_map_header(len(secciones))
+    for seccion in secciones:
+        yield empaquetador.pack(seccion.nombre)
+        if not seccion.es_lista:
+            yield empaquetador.pack(seccion.valor)
+            continue
+        yield empaquetador.pack_array_header(seccion.largo)
+        for elemento in seccion.valor:
+            yield empaquetador.pack(elemento)
+
+
+_PARTES = {JSON: _partes_json, NDJSON: _partes_ndjson, MSGPACK: _partes_msgpack}
+
+
+def codificar_secciones(secciones, formato=JSON, tamaño_bloque=TAMAÑO_BLOQUE):
+    """Generador de bloques de bytes con `secciones` (lista de `Seccion`).
+
+    En JSON el documento es `{nombre: valor, ...}`, igual al de `jsonify`
+    sobre el dict equivalente.
+    """
+    return _agrupar(_PARTES[formato](list(secciones)), tamaño_bloque)
+
+
+def comprimir(bloques, codificacion, nivel=NIVEL_COMPRESION):
+    """Comprime un flujo de bloques en streaming ('gzip', 'deflate' o None)."""
+    if codificacion is None:
+        yield from bloques
+        return
+    # deflate de HTTP es el formato zlib (RFC 1950); gzip lleva su propio encabezado
+    wbits = 16 + zlib.MAX_WBITS if codificacion == GZIP else zlib.MAX_WBITS
+    compresor = zlib.compressobj(nivel, zlib.DEFLATED, wbits)
+    for bloque in bloques:
+        salida = compresor.compress(bloque)
+        if salida:
+            yield salida
+    yield compresor.flush()
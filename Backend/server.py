@@ -1,9 +1,22 @@
-from flask import Flask, jsonify, request, render_template
+import json
+import os
+import threading
+import time
+
+from flask import (Blueprint, Flask, Response, current_app, jsonify, request, render_template,
+                   stream_with_context)
 from flask_cors import CORS
-from config.db import DatabaseConnection
+from config.db import DatabaseConnection, cargar_entorno
+from config import instrumentacion, serializacion
 from Dao.DAO_colas import DAOColas
 from Dao.DAO_corridas import DAOCorridas
+from Dao.DAO_resultados import DAOResultados
+from Dao.Persistencia_diferida import EscritorDiferido
 from Controller.SimuladorController import SimuladorController
+from Controller.BarridoController import BarridoController
+from Controller.GestorCorridas import GestorCorridas, CorridaRechazada
+from Controller.CacheResultados import CacheResultados
+from Modelo.Traza_llegadas import TrazaLlegadas, ruta_en as ruta_traza
 
 
 # Config por defecto (puedes permitir override desde front)
@@ -11,91 +24,679 @@ DEFAULT_PROB_LLEGADA = {'A': 0.1, 'M': 0.05, 'B': 0.02}
 DEFAULT_PROB_SERVICIO = {'A': 0.7, 'M': 0.6, 'B': 0.5}
 DEFAULT_TIEMPO = 100
 
-# Indicar a Flask dónde están templates y static (tu front está en ../frontend)
-app = Flask(__name__, template_folder='../frontend/templates', static_folder='../frontend/static')
-CORS(app)
 
-@app.route('/')
-def index():
-    return render_template('index.html')
+def _activo(valor):
+    return str(valor).lower() in ('1', 'true', 'si', 'sí')
+
+
+# -----------------------
+# Servicios perezosos (conexión, DAOs, controllers)
+# -----------------------
+class _perezoso:
+    """Atributo de `Servicios` que se construye en el primer acceso, una sola
+    vez aunque lo pidan varios hilos a la vez."""
+
+    def __init__(self, fabrica):
+        self.fabrica = fabrica
+        self.nombre = fabrica.__name__
+        self.__doc__ = fabrica.__doc__
+
+    def __get__(self, servicios, tipo=None):
+        if servicios is None:
+            return self
+        with servicios._lock:
+            if self.nombre not in servicios.__dict__:
+                servicios.__dict__[self.nombre] = self.fabrica(servicios)
+        # Desde aquí el atributo de instancia tapa al descriptor (acceso directo)
+        return servicios.__dict__[self.nombre]
+
+
+class Servicios:
+    """Singletons de la app, creados al primer uso y no al importar.
+
+    Nada abre conexiones ni arranca hilos hasta que una petición lo
+    necesita: arrancar un worker o importar `server` es barato.
+    `reiniciar()` olvida lo creado (se usa tras un fork en modo precarga).
+    """
+
+    NOMBRES = ('db', 'dao_colas', 'dao_corridas', 'dao_resultados', 'escritor', 'cache',
+               'controller', 'barrido', 'gestor')
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.RLock()
+
+    @_perezoso
+    def db(self):
+        db = self.config.get('DB')
+        return db() if callable(db) else (db or DatabaseConnection())
+
+    @_perezoso
+    def dao_colas(self):
+        return DAOColas(self.db)
+
+    @_perezoso
+    def dao_corridas(self):
+        return DAOCorridas(self.db)
+
+    @_perezoso
+    def dao_resultados(self):
+        return DAOResultados(self.db)
+
+    @_perezoso
+    def escritor(self):
+        """Escrituras diferidas: /simulacion/start no espera a la BD."""
+        if not self.config['PERSISTENCIA_DIFERIDA']:
+            return None
+        return EscritorDiferido(self.db)
+
+    @_perezoso
+    def cache(self):
+        """Cache de resultados de corridas con semilla (CACHE_MEMORIA_MB=0 lo desactiva)."""
+        megas = float(self.config['CACHE_MEMORIA_MB'])
+        if megas <= 0:
+            return None
+        return CacheResultados(max_bytes_memoria=int(megas * 2**20),
+                               directorio=self.config['CACHE_DIR'] or None,
+                               max_bytes_disco=int(float(self.config['CACHE_DISCO_MB']) * 2**20))
+
+    @_perezoso
+    def controller(self):
+        c = self.config
+        return SimuladorController(c['TIEMPO'], c['PROB_LLEGADA'], c['PROB_SERVICIO'],
+                                   self.dao_colas, self.dao_corridas,
+                                   dao_resultados=self.dao_resultados, escritor=self.escritor,
+                                   avance_cada=c['AVANCE_CADA_TICKS'], cache=self.cache)
+
+    @_perezoso
+    def barrido(self):
+        """Barridos de parámetros (pool de procesos)."""
+        return BarridoController(self.dao_colas, self.dao_corridas)
+
+    @_perezoso
+    def gestor(self):
+        """Registro de corridas concurrentes (/simulaciones/<id>/...)."""
+        return GestorCorridas(self.dao_colas, self.dao_corridas, self.dao_resultados,
+                              escritor=self.escritor, avance_cada=self.config['AVANCE_CADA_TICKS'],
+                              cache=self.cache)
+
+    def creados(self):
+        return [nombre for nombre in self.NOMBRES if nombre in self.__dict__]
+
+    def precargar(self):
+        """Importa lo que se usará después (conector MySQL) sin abrir nada, para
+        que los workers bifurcados lo hereden ya cargado."""
+        import mysql.connector  # noqa: F401
+
+    def reiniciar(self):
+        """Olvida los singletons sin cerrarlos: tras un fork, cerrar una conexión
+        heredada cortaría también la del proceso padre."""
+        self._lock = threading.RLock()
+        for nombre in self.NOMBRES:
+            self.__dict__.pop(nombre, None)
+
+
+def _servicios():
+    return current_app.extensions['simulacion']
+
+
+# -----------------------
+# App
+# -----------------------
+def create_app(config=None):
+    """Crea la app Flask. No abre conexiones ni crea DAOs/controllers: eso
+    ocurre en la primera petición que los usa (ver `Servicios`).
+
+    `config` pisa los valores por defecto y los del entorno:
+    - TIEMPO, PROB_LLEGADA, PROB_SERVICIO: parámetros por defecto de las corridas.
+    - DB: `DatabaseConnection` (o función que la crea) en lugar de la de MySQL.
+    - PERSISTENCIA_DIFERIDA, AVANCE_CADA_TICKS, CACHE_MEMORIA_MB, CACHE_DIR,
+      CACHE_DISCO_MB, TRAZAS_DIR, STREAM_INACTIVIDAD: como las variables de
+      entorno del mismo nombre.
+    - PRECARGAR: modo para servidores que bifurcan workers tras cargar la app
+      (p. ej. `gunicorn --preload "server:create_app()"`): importa todo en el
+      proceso padre y cada worker crea sus propias conexiones e hilos.
+    """
+    cargar_entorno()
+    if _activo(os.getenv('INSTRUMENTACION', '0')):
+        instrumentacion.registro.activar()
+
+    # Indicar a Flask dónde están templates y static (tu front está en ../frontend)
+    app = Flask(__name__, template_folder='../frontend/templates', static_folder='../frontend/static')
+    app.config.update(
+        TIEMPO=DEFAULT_TIEMPO,
+        PROB_LLEGADA=DEFAULT_PROB_LLEGADA,
+        PROB_SERVICIO=DEFAULT_PROB_SERVICIO,
+        DB=None,
+        PERSISTENCIA_DIFERIDA=_activo(os.getenv('PERSISTENCIA_DIFERIDA', '1')),
+        AVANCE_CADA_TICKS=int(os.getenv('AVANCE_CADA_TICKS', 0)) or None,
+        CACHE_MEMORIA_MB=float(os.getenv('CACHE_MEMORIA_MB', 256)),
+        CACHE_DIR=os.getenv('CACHE_DIR'),
+        CACHE_DISCO_MB=float(os.getenv('CACHE_DISCO_MB', 2048)),
+        TRAZAS_DIR=os.getenv('TRAZAS_DIR'),
+        STREAM_INACTIVIDAD=float(os.getenv('STREAM_INACTIVIDAD', 600)),
+        PRECARGAR=_activo(os.getenv('PRECARGAR', '0')),
+    )
+    app.config.update(config or {})
+    CORS(app)
+    app.register_blueprint(bp)
 
-# Bootstrap: crear conexión y DAOs
-db_conn = DatabaseConnection()
-dao_colas = DAOColas(db_conn)
-dao_corridas = DAOCorridas(db_conn)
+    servicios = Servicios(app.config)
+    app.extensions['simulacion'] = servicios
+    if app.config['PRECARGAR']:
+        servicios.precargar()
+        os.register_at_fork(after_in_child=servicios.reiniciar)
+    return app
 
-# Crear controller con DAOs inyectados
-controller = SimuladorController(DEFAULT_TIEMPO, DEFAULT_PROB_LLEGADA, DEFAULT_PROB_SERVICIO,
-                                 dao_colas, dao_corridas)
 
+bp = Blueprint('simulacion', __name__)
 
-@app.route('/simulacion/start', methods=['POST'])
+
+@bp.route('/')
+def index():
+    return render_template('index.html')
+
+
+@bp.route('/simulacion/start', methods=['POST'])
 def start_simulacion():
+    controller = _servicios().controller
     data = request.get_json(silent=True) or {}
     # Opcional: permitir sobrescribir params por petición
     tiempo = data.get('tiempo', controller.simulador.tiempo_total)
     prob_llegada = data.get('prob_llegada', controller.simulador.prob_llegada)
     prob_servicio = data.get('prob_servicio', controller.simulador.prob_servicio)
+    motor = data.get('motor', controller.simulador.motor)
+    ticks_por_segundo = data.get('ticks_por_segundo')
+    topologia = data.get('topologia', controller.simulador.topologia)
+    politica = data.get('politica', controller.simulador.politica)
+    semilla = data.get('semilla')
+    prob_abandono = data.get('prob_abandono', controller.simulador.prob_abandono)
 
     # Aplicar cambios si la simulación no está corriendo
     if controller.is_running():
         return jsonify({'started': False, 'reason': 'already_running'}), 409
 
     # Restaurar el simulador con parámetros recibidos
-    controller.simulador = controller.simulador.__class__(tiempo, prob_llegada, prob_servicio)
+    try:
+        controller.simulador = controller.simulador.__class__(tiempo, prob_llegada, prob_servicio,
+                                                              motor=motor,
+                                                              ticks_por_segundo=ticks_por_segundo,
+                                                              topologia=topologia,
+                                                              politica=politica,
+                                                              semilla=semilla,
+                                                              prob_abandono=prob_abandono)
+    except (ValueError, TypeError) as e:
+        return jsonify({'started': False, 'reason': str(e)}), 400
     started = controller.correr()
-    return jsonify({'started': started, 'corrida_id': controller.last_corrida_id}), (201 if started else 500)
+    return jsonify({'started': started, 'corrida_id': controller.last_corrida_id,
+                    'cached': controller.desde_cache}), (201 if started else 500)
 
 
-@app.route('/simulacion/pause', methods=['POST'])
+@bp.route('/simulacion/pause', methods=['POST'])
 def pause_simulacion():
+    controller = _servicios().controller
     controller.pausar()
     return jsonify({'paused': True})
 
 
-@app.route('/simulacion/resume', methods=['POST'])
+@bp.route('/simulacion/resume', methods=['POST'])
 def resume_simulacion():
+    controller = _servicios().controller
     controller.reanudar()
     return jsonify({'resumed': True})
 
 
-@app.route('/simulacion/stop', methods=['POST'])
+@bp.route('/simulacion/stop', methods=['POST'])
 def stop_simulacion():
+    controller = _servicios().controller
     controller.detener()
     return jsonify({'stopped': True})
 
 
-@app.route('/simulacion/restore', methods=['POST'])
+@bp.route('/simulacion/pace', methods=['POST'])
+def pace_simulacion():
+    controller = _servicios().controller
+    # {'ticks_por_segundo': n} para ver la corrida a velocidad humana; null = sin límite
+    data = request.get_json(silent=True) or {}
+    tps = data.get('ticks_por_segundo')
+    if tps is not None and (not isinstance(tps, (int, float)) or tps <= 0):
+        return jsonify({'error': 'ticks_por_segundo debe ser > 0 o null'}), 400
+    controller.fijar_ritmo(tps)
+    return jsonify({'ticks_por_segundo': tps})
+
+
+@bp.route('/simulacion/restore', methods=['POST'])
 def restore_simulacion():
+    controller = _servicios().controller
     controller.restaurar_parametros()
     return jsonify({'restored': True})
 
 
-@app.route('/simulacion/status', methods=['GET'])
-def status():
-    sim = controller.simulador
-    return jsonify({
-        'running': controller.is_running(),
+@bp.route('/simulacion/snapshot', methods=['GET'])
+def snapshot_simulacion():
+    controller = _servicios().controller
+    # Estado binario de la corrida; si está en marcha hay que pausarla antes
+    datos = controller.snapshot()
+    if datos is None:
+        return jsonify({'error': 'pausa la simulación antes de tomar el snapshot'}), 409
+    return Response(datos, mimetype='application/octet-stream',
+                    headers={'Content-Disposition': 'attachment; filename=simulacion.snapshot'})
+
+
+@bp.route('/simulacion/restaurar', methods=['POST'])
+def restaurar_simulacion():
+    """Carga un snapshot (cuerpo binario) y, salvo `?iniciar=0`, continúa la corrida.
+
+    Query opcional para bifurcar escenarios: `tiempo_total`, `semilla`,
+    `ticks_por_segundo`.
+    """
+    controller = _servicios().controller
+    cambios = {}
+    for clave, tipo in (('tiempo_total', int), ('semilla', int), ('ticks_por_segundo', float)):
+        valor = request.args.get(clave, type=tipo)
+        if valor is not None:
+            cambios[clave] = valor
+    try:
+        restaurada = controller.restaurar(request.get_data(),
+                                          trazas_dir=current_app.config['TRAZAS_DIR'], **cambios)
+    except ValueError as e:
+        return jsonify({'restored': False, 'reason': str(e)}), 400
+    if not restaurada:
+        return jsonify({'restored': False, 'reason': 'already_running'}), 409
+
+    started = False
+    if request.args.get('iniciar', 1, type=int):
+        started = controller.correr()
+    return jsonify({'restored': True, 'started': started, 'tick': controller.simulador.tick,
+                    'corrida_id': controller.last_corrida_id}), 201
+
+
+def _estado(ctrl):
+    sim = ctrl.simulador
+    return {
+        'running': ctrl.is_running(),
+        'estado': ctrl.estado,
+        'corrida_id': ctrl.last_corrida_id,
+        'cached': ctrl.desde_cache,
         'pausado': sim.pausado,
+        'tick': sim.tick,
         'tiempo_total': sim.tiempo_total,
+        'ticks_por_segundo': sim.ticks_por_segundo,
+        'motor': sim.motor,
+        'semilla': sim.semilla,
+        'politica': sim.politica,
+        'ventanillas': [{'nombre': v.nombre, 'tipo': v.tipo, 'libre': v.libre} for v in sim.ventanillas],
         'cola_tamaño': sim.cola_prioridad.tamaño(),
         'logs_count': len(sim.logs),
-    })
+    }
 
 
-@app.route('/simulacion/result', methods=['GET'])
-def result():
+# Máximo de elementos por página en /simulacion/result
+MAX_LIMITE_PAGINA = 5000
+
+
+def _resultado(ctrl):
     # Devuelve resultados finales si la simulación terminó
-    if controller.is_running():
+    if ctrl.is_running():
         return jsonify({'status': 'running'}), 202
-    res = {
-        'estadisticas': controller.simulador.stats,
-        'historial': controller.simulador.historial.to_list(),
-        'cola_prioridad': controller.simulador.cola_prioridad.ver_lista(),
-        'logs': controller.simulador.logs,
-    }
-    return jsonify(res)
+
+    # Paginado: ?section=historial&cursor=0&limit=100&fields=id,tipo
+    seccion = request.args.get('section')
+    if seccion:
+        cursor = request.args.get('cursor', 0, type=int)
+        limite = min(max(request.args.get('limit', 100, type=int), 1), MAX_LIMITE_PAGINA)
+        campos = [c for c in request.args.get('fields', '').split(',') if c] or None
+        try:
+            with instrumentacion.SERIALIZACION.medir(endpoint='result_pagina'):
+                respuesta = jsonify(ctrl.pagina_resultado(seccion, cursor, limite, campos))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return _contar_bytes(respuesta, 'result_pagina')
+
+    # Resultado completo: streaming por secciones en el formato y la
+    # compresión negociados (?format=json|ndjson|msgpack, Accept, Accept-Encoding)
+    try:
+        formato = serializacion.negociar_formato(request.headers.get('Accept'),
+                                                 request.args.get('format'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 406
+    codificacion = serializacion.negociar_codificacion(request.headers.get('Accept-Encoding'))
+
+    bloques = serializacion.comprimir(serializacion.codificar_secciones(ctrl.secciones_resultado(), formato),
+                                      codificacion)
+    cabeceras = {'Vary': 'Accept, Accept-Encoding'}
+    if codificacion is not None:
+        cabeceras['Content-Encoding'] = codificacion
+    return Response(stream_with_context(_flujo_medido(bloques, 'result')), mimetype=formato,
+                    headers=cabeceras)
+
+
+def _flujo_medido(bloques, endpoint):
+    """Cuenta bytes y tiempo de codificación de una respuesta en streaming
+    (sólo el tiempo dentro del generador, no la escritura al socket)."""
+    total = 0
+    segundos = 0.0
+    bloques = iter(bloques)
+    while True:
+        inicio = time.perf_counter()
+        bloque = next(bloques, None)
+        segundos += time.perf_counter() - inicio
+        if bloque is None:
+            break
+        total += len(bloque)
+        yield bloque
+    instrumentacion.SERIALIZACION.observar(segundos, endpoint=endpoint)
+    instrumentacion.SERIALIZACION_BYTES.inc(total, endpoint=endpoint)
+
+
+def _contar_bytes(respuesta, endpoint):
+    instrumentacion.SERIALIZACION_BYTES.inc(respuesta.content_length or 0, endpoint=endpoint)
+    return respuesta
+
+
+@bp.route('/simulacion/status', methods=['GET'])
+def status():
+    controller = _servicios().controller
+    return jsonify(_estado(controller))
+
+
+@bp.route('/simulacion/result', methods=['GET'])
+def result():
+    controller = _servicios().controller
+    return _resultado(controller)
+
+
+@bp.route('/simulacion/stream', methods=['GET'])
+def stream():
+    """Server-Sent Events con los eventos nuevos de la simulación actual.
+
+    El cliente retoma desde `Last-Event-ID` (reconexión automática de
+    EventSource) o desde `?cursor=N`. Cada mensaje lleva como `id` su cursor
+    en el buffer circular del simulador; el flujo termina tras el evento
+    `fin`. Si el cliente quedó tan atrás que el buffer ya descartó eventos,
+    se envía un evento `perdidos` con la cantidad.
+
+    Si no hay `fin` que esperar (la corrida nunca arrancó, falló o fue
+    reemplazada) o no llegan eventos en STREAM_INACTIVIDAD segundos, el
+    flujo termina con un evento `cerrado` cuyo `motivo` es 'sin_corrida'
+    o 'inactivo'.
+    """
+    controller = _servicios().controller
+    ultimo = request.headers.get('Last-Event-ID', type=int)
+    cursor = ultimo + 1 if ultimo is not None else request.args.get('cursor', 0, type=int)
+    sim = controller.simulador
+    buffer = sim.eventos
+    inactividad = current_app.config['STREAM_INACTIVIDAD']
+
+    def cerrado(motivo):
+        return f"event: cerrado\ndata: {json.dumps({'motivo': motivo})}\n\n"
+
+    def generar(cursor):
+        yield 'retry: 2000\n\n'
+        ultimo_evento = time.monotonic()
+        while True:
+            # Se mira antes de leer: lo agregado antes del cierre se envía igual
+            terminado = buffer.cerrado
+            pares, cursor, perdidos = sim.leer_eventos(cursor, limite=500)
+            if perdidos:
+                yield f"event: perdidos\ndata: {json.dumps({'perdidos': perdidos})}\n\n"
+            for seq, evento in pares:
+                yield f"id: {seq}\ndata: {json.dumps(evento)}\n\n"
+            if pares:
+                ultimo_evento = time.monotonic()
+                continue
+            if terminado:
+                return
+            if controller.simulador is not sim or not controller.is_running():
+                if buffer.cerrado:
+                    continue   # terminó recién: falta enviar el `fin`
+                yield cerrado('sin_corrida')
+                return
+            if buffer.esperar(cursor, timeout=min(15, inactividad)):
+                continue
+            if time.monotonic() - ultimo_evento >= inactividad:
+                yield cerrado('inactivo')
+                return
+            yield ': keep-alive\n\n'
+
+    return Response(stream_with_context(generar(cursor)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Métricas en formato de texto de Prometheus (ver config/instrumentacion.py).
+
+    Sólo reporta los servicios ya creados: consultar /metrics no abre la BD.
+    """
+    servicios = _servicios()
+    creados = servicios.creados()
+    fuentes = (('db', instrumentacion.POOL, 'metricas_pool'),
+               ('gestor', instrumentacion.GESTOR, 'metricas'),
+               ('escritor', instrumentacion.ESCRITOR, 'metricas'),
+               ('cache', instrumentacion.CACHE, 'metricas'))
+    for nombre, medidor, metodo in fuentes:
+        servicio = getattr(servicios, nombre) if nombre in creados else None
+        if servicio is not None:
+            for dato, valor in getattr(servicio, metodo)().items():
+                medidor.fijar(valor, dato=dato)
+    return Response(instrumentacion.registro.exportar(),
+                    mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+# -----------------------
+# Histórico en BD (paginado por clave y agregados en SQL)
+# -----------------------
+def _pagina_por_clave(items, limite, clave='id'):
+    siguiente = items[-1][clave] if len(items) == limite else None
+    return jsonify({'items': items, 'next_cursor': siguiente})
+
+
+@bp.route('/corridas', methods=['GET'])
+def listar_corridas():
+    """?cursor=<id>&limit=N&desde=AAAA-MM-DD&hasta=AAAA-MM-DD"""
+    dao_corridas = _servicios().dao_corridas
+    limite = min(max(request.args.get('limit', 100, type=int), 1), MAX_LIMITE_PAGINA)
+    items = dao_corridas.obtener_pagina(request.args.get('cursor', 0, type=int), limite,
+                                        request.args.get('desde'), request.args.get('hasta'))
+    return _pagina_por_clave(items, limite)
+
+
+@bp.route('/estadisticas/<agrupacion>', methods=['GET'])
+def estadisticas(agrupacion):
+    """Totales y tasa de atención agregados en SQL.
+
+    - /estadisticas/tipo?desde&hasta
+    - /estadisticas/ventana?granularidad=hora|dia|mes&desde&hasta
+    - /estadisticas/corrida?cursor=<corrida_id>&limit=N (paginado por clave)
+    """
+    dao_colas = _servicios().dao_colas
+    desde, hasta = request.args.get('desde'), request.args.get('hasta')
+    if agrupacion == 'tipo':
+        return jsonify({'items': dao_colas.totales_por_tipo(desde, hasta)})
+    if agrupacion == 'ventana':
+        try:
+            items = dao_colas.totales_por_ventana(request.args.get('granularidad', 'dia'),
+                                                  desde, hasta)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'items': items})
+    if agrupacion == 'corrida':
+        limite = min(max(request.args.get('limit', 100, type=int), 1), MAX_LIMITE_PAGINA)
+        items = dao_colas.totales_por_corrida(request.args.get('cursor', 0, type=int), limite)
+        return _pagina_por_clave(items, limite, clave='corrida_id')
+    return jsonify({'error': f"agrupación desconocida: {agrupacion!r} "
+                             "(opciones: tipo, ventana, corrida)"}), 404
+
+
+@bp.route('/cache', methods=['GET'])
+def estado_cache():
+    cache = _servicios().cache
+    if cache is None:
+        return jsonify({'activo': False})
+    return jsonify(dict(cache.metricas(), activo=True))
+
+
+@bp.route('/cache', methods=['DELETE'])
+def invalidar_cache():
+    """Invalida todo el cache o sólo `?clave=<sha256>`."""
+    cache = _servicios().cache
+    if cache is None:
+        return jsonify({'activo': False, 'invalidadas': 0})
+    try:
+        invalidadas = cache.invalidar(request.args.get('clave'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'activo': True, 'invalidadas': invalidadas})
+
+
+# -----------------------
+# Corridas concurrentes
+# -----------------------
+def _abrir_traza(data):
+    """`TrazaLlegadas` pedida con `traza` (nombre de un .trz en TRAZAS_DIR) y
+    `traza_inicio` (tick de la traza donde empieza la corrida), o None."""
+    nombre = data.get('traza')
+    if nombre is None:
+        return None
+    directorio = current_app.config['TRAZAS_DIR']
+    if not directorio:
+        raise ValueError("no hay trazas disponibles (TRAZAS_DIR sin configurar)")
+    # Sólo un nombre de archivo: nunca una ruta fuera de TRAZAS_DIR
+    ruta = ruta_traza(directorio, nombre)
+    try:
+        return TrazaLlegadas(ruta, inicio=int(data.get('traza_inicio', 0)))
+    except OSError:
+        raise ValueError(f"traza no encontrada: {os.path.basename(ruta)}")
+
+
+@bp.route('/simulaciones', methods=['POST'])
+def crear_simulacion():
+    gestor = _servicios().gestor
+    data = request.get_json(silent=True) or {}
+    permitidas = ('motor', 'ticks_por_segundo', 'topologia', 'politica', 'guardar_historial',
+                  'semilla', 'compacto', 'prob_abandono')
+    opciones = {k: data[k] for k in permitidas if k in data}
+    try:
+        traza = _abrir_traza(data)
+        if traza is not None:
+            opciones['fuente'] = traza
+        clave, ctrl = gestor.crear(data.get('tiempo', current_app.config['TIEMPO']),
+                                   data.get('prob_llegada', current_app.config['PROB_LLEGADA']),
+                                   data.get('prob_servicio', current_app.config['PROB_SERVICIO']),
+                                   **opciones)
+    except CorridaRechazada as e:
+        return jsonify({'started': False, 'reason': 'busy', 'detail': str(e)}), 429
+    except (ValueError, TypeError) as e:
+        return jsonify({'started': False, 'reason': str(e)}), 400
+    # `corrida_id` es None hasta que el escritor diferido inserta la corrida;
+    # luego `/simulaciones/<corrida_id>/...` también encuentra la corrida
+    return jsonify({'started': True, 'id': clave, 'corrida_id': ctrl.last_corrida_id,
+                    'estado': ctrl.estado, 'cached': ctrl.desde_cache}), 201
+
+
+@bp.route('/simulaciones', methods=['GET'])
+def listar_simulaciones():
+    gestor = _servicios().gestor
+    return jsonify({'simulaciones': gestor.listar(), 'capacidad': gestor.metricas()})
+
+
+def _corrida_o_404(clave):
+    gestor = _servicios().gestor
+    ctrl = gestor.obtener(clave)
+    if ctrl is None:
+        return None, (jsonify({'error': 'corrida no encontrada', 'id': clave}), 404)
+    return ctrl, None
+
+
+@bp.route('/simulaciones/<clave>/status', methods=['GET'])
+def status_simulacion(clave):
+    ctrl, error = _corrida_o_404(clave)
+    return error or jsonify(_estado(ctrl))
+
+
+@bp.route('/simulaciones/<clave>/result', methods=['GET'])
+def result_simulacion(clave):
+    ctrl, error = _corrida_o_404(clave)
+    return error or _resultado(ctrl)
+
+
+@bp.route('/simulaciones/<clave>/<accion>', methods=['POST'])
+def accion_simulacion(clave, accion):
+    acciones = {'pause': 'pausar', 'resume': 'reanudar', 'stop': 'detener'}
+    if accion not in acciones:
+        return jsonify({'error': f'acción desconocida: {accion}'}), 404
+    ctrl, error = _corrida_o_404(clave)
+    if error:
+        return error
+    getattr(ctrl, acciones[accion])()
+    return jsonify({'id': clave, 'accion': accion, 'estado': ctrl.estado})
+
+
+# -----------------------
+# Barridos de parámetros
+# -----------------------
+@bp.route('/simulacion/sweep', methods=['POST'])
+def start_sweep():
+    barrido = _servicios().barrido
+    data = request.get_json(silent=True) or {}
+    if barrido.is_running():
+        return jsonify({'started': False, 'reason': 'already_running'}), 409
+
+    if 'configuraciones' in data:
+        configuraciones = data['configuraciones']
+    else:
+        defaults = {
+            'tiempo': current_app.config['TIEMPO'],
+            'prob_llegada': current_app.config['PROB_LLEGADA'],
+            'prob_servicio': current_app.config['PROB_SERVICIO'],
+        }
+        configuraciones = barrido.expandir_grilla(data.get('grilla', {}), defaults)
+
+    if not isinstance(configuraciones, list):
+        return jsonify({'started': False, 'reason': 'configuraciones debe ser una lista'}), 400
+    semilla = data.get('semilla', 0)
+    if isinstance(semilla, bool) or not isinstance(semilla, int):
+        return jsonify({'started': False, 'reason': 'semilla debe ser un entero'}), 400
+    started = barrido.iniciar(configuraciones, semilla_base=semilla)
+    return jsonify({'started': started, 'total': len(configuraciones)}), (201 if started else 409)
+
+
+@bp.route('/simulacion/sweep/status', methods=['GET'])
+def sweep_status():
+    barrido = _servicios().barrido
+    return jsonify(barrido.progreso())
+
+
+@bp.route('/simulacion/sweep/result', methods=['GET'])
+def sweep_result():
+    barrido = _servicios().barrido
+    cursor = request.args.get('cursor', 0, type=int)
+    resultados, siguiente = barrido.resultados_desde(cursor)
+    return jsonify({'resultados': resultados, 'cursor': siguiente, 'running': barrido.is_running()})
+
+
+@bp.route('/simulacion/sweep/cancel', methods=['POST'])
+def sweep_cancel():
+    barrido = _servicios().barrido
+    barrido.cancelar()
+    return jsonify({'cancelled': True})
+
+
+_lock_app = threading.Lock()
+
+
+def __getattr__(nombre):
+    """`server.app`: app con la configuración del entorno para quien la
+    busca por nombre (`flask --app server run`, `gunicorn server:app`). Se
+    crea la primera vez que se pide; importar `server` no crea ninguna."""
+    if nombre != 'app':
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    with _lock_app:
+        if 'app' not in globals():
+            globals()['app'] = create_app()
+    return globals()['app']
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    create_app().run(host='0.0.0.0', port=5000, debug=True)
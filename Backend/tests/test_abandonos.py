@@ -0,0 +1,42 @@
+import pytest
+
+from Modelo.Simulador import SimuladorBanco, MOTORES
+from Modelo.Traza_llegadas import TrazaLlegadas, escribir_traza
+
+PROB_LLEGADA = {'A': 0.2, 'M': 0.3, 'B': 0.4}
+PROB_SERVICIO = {'A': 0.3, 'M': 0.2, 'B': 0.15}
+
+
+@pytest.mark.parametrize('compacto', [False, True])
+@pytest.mark.parametrize('motor', MOTORES)
+def test_cada_cliente_termina_en_un_solo_estado(motor, compacto):
+    sim = SimuladorBanco(4000, dict(PROB_LLEGADA), dict(PROB_SERVICIO), motor=motor, semilla=2,
+                         compacto=compacto, prob_abandono={'M': 0.05, 'B': 0.1})
+    stats = sim.run()['estadisticas']
+    en_servicio = sum(1 for v in sim.ventanillas if not v.libre)
+    for tipo, dato in stats.items():
+        # no_atendidos incluye a los que siguen en ventanilla
+        assert dato['llegaron'] == dato['atendidos'] + dato['abandonaron'] + dato['no_atendidos']
+    assert stats['A']['abandonaron'] == 0
+    assert stats['B']['abandonaron'] > 0
+    assert sim.cola_prioridad.tamaño() == sum(d['no_atendidos'] for d in stats.values()) - en_servicio
+
+
+def test_motores_coinciden_con_abandonos(tmp_path):
+    # Con las llegadas fijadas por una traza, ambos motores consumen el
+    # generador igual y deben dar exactamente lo mismo
+    ruta = str(tmp_path / 'llegadas.trz')
+    escribir_traza(ruta, [(t, tipo) for t in range(0, 3000, 2) for tipo in 'AMB' if (t + ord(tipo)) % 3])
+    resultados = []
+    for motor in MOTORES:
+        sim = SimuladorBanco(3000, dict(PROB_LLEGADA), dict(PROB_SERVICIO), motor=motor, semilla=9,
+                             fuente=TrazaLlegadas(ruta), prob_abandono={'A': 0.01, 'M': 0.05, 'B': 0.1})
+        r = sim.run()
+        resultados.append((r['estadisticas'], r['historial'], r['cola_prioridad']))
+    assert resultados[0] == resultados[1]
+    assert resultados[0][0]['B']['abandonaron'] > 0
+
+
+def test_sin_prob_abandono_nadie_abandona():
+    sim = SimuladorBanco(2000, dict(PROB_LLEGADA), dict(PROB_SERVICIO), semilla=4)
+    assert all(d['abandonaron'] == 0 for d in sim.run()['estadisticas'].values())
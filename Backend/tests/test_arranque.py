@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+from bench.bench_arranque import SCRIPTS, comprobar, medir
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _python(codigo, *args):
+    return subprocess.run([sys.executable, *args, '-c', codigo] if codigo else [sys.executable, *args],
+                          capture_output=True, text=True, cwd=BACKEND, timeout=60)
+
+
+def test_imports_livianos():
+    # Cada medición corre en un intérprete nuevo
+    resultados = {nombre: medir(nombre, 1) for nombre in SCRIPTS}
+    assert comprobar(resultados) == []
+
+
+def test_app_del_modulo_se_crea_al_pedirla():
+    salida = _python(
+        "import server\n"
+        "assert 'app' not in vars(server)\n"
+        "from flask import Flask\n"
+        "assert isinstance(server.app, Flask) and server.app is server.app\n"
+        "assert server.app.extensions['simulacion'].creados() == []\n")
+    assert salida.returncode == 0, salida.stderr
+
+
+def test_flask_encuentra_la_app():
+    salida = _python(None, '-m', 'flask', '--app', 'server', 'routes')
+    assert salida.returncode == 0, salida.stderr
+    assert '/simulacion/start' in salida.stdout
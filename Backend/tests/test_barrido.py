@@ -0,0 +1,56 @@
+import pytest
+
+from bench.sqlite_db import crear_db_sqlite
+from Controller.BarridoController import BarridoController
+from Dao.DAO_colas import DAOColas
+from Dao.DAO_corridas import DAOCorridas
+
+
+@pytest.fixture
+def db():
+    db = crear_db_sqlite()
+    yield db
+    db.cerrar()
+
+
+def _registros(n):
+    return [{'indice': i, 'config': {'tiempo': 100}, 'corrida_id': None,
+             'estadisticas': {tipo: {'llegaron': 10 * i + k, 'atendidos': i, 'no_atendidos': k,
+                                     'abandonaron': 0}
+                              for k, tipo in enumerate('AMB')}}
+            for i in range(n)]
+
+
+def test_crear_corridas_bulk_devuelve_ids_consecutivos(db):
+    dao = DAOCorridas(db)
+    assert dao.crear_corrida(0) == 1
+    assert dao.crear_corridas_bulk(4) == [2, 3, 4, 5]
+    assert dao.crear_corridas_bulk(0) == []
+    assert [c['id'] for c in dao.iterar_todas()] == [1, 2, 3, 4, 5]
+
+
+def test_persistir_lote_en_una_transaccion(db):
+    barrido = BarridoController(DAOColas(db), DAOCorridas(db))
+    DAOCorridas(db).crear_corrida(0)
+    registros = _registros(3)
+    barrido._persistir(registros)
+
+    assert [r['corrida_id'] for r in registros] == [2, 3, 4]
+    colas = list(DAOColas(db).iterar_todas())
+    assert len(colas) == 9
+    por_corrida = {(f['corrida_id'], f['nombre_id']): f['n_entrada'] for f in colas}
+    assert por_corrida[(4, 'M')] == 21
+
+
+def test_persistir_fallido_no_deja_corridas_sueltas(db, monkeypatch):
+    barrido = BarridoController(DAOColas(db), DAOCorridas(db))
+
+    def fallar(filas, conn=None):
+        raise RuntimeError("BD caída")
+
+    monkeypatch.setattr(barrido.dao_colas, 'crear_colas_bulk', fallar)
+    registros = _registros(2)
+    barrido._persistir(registros)
+
+    assert [r['corrida_id'] for r in registros] == [None, None]
+    assert DAOCorridas(db).contar() == 0
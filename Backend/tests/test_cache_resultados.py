@@ -0,0 +1,89 @@
+import pytest
+
+from Controller.CacheResultados import CacheResultados, EXTENSION
+from Modelo.Simulador import SimuladorBanco
+
+PROB_LLEGADA = {'A': 0.2, 'M': 0.25, 'B': 0.3}
+PROB_SERVICIO = {'A': 0.3, 'M': 0.25, 'B': 0.2}
+
+
+def _corrida(semilla, ticks=300):
+    """(clave, snapshot, estadisticas) de una corrida terminada."""
+    sim = SimuladorBanco(ticks, dict(PROB_LLEGADA), dict(PROB_SERVICIO), semilla=semilla)
+    clave = CacheResultados.clave_de(sim)
+    resultado = sim.run()
+    return clave, sim.snapshot(), resultado['estadisticas']
+
+
+def test_acierto_devuelve_la_corrida_restaurada():
+    cache = CacheResultados()
+    clave, datos, estadisticas = _corrida(1)
+    assert cache.obtener(clave) is None
+    cache.guardar(clave, datos)
+    assert clave in cache
+
+    sim = cache.obtener(clave)
+    assert sim.stats == estadisticas
+    metricas = cache.metricas()
+    assert (metricas['aciertos_memoria'], metricas['fallos']) == (1, 1)
+    assert metricas['tasa_aciertos'] == 0.5
+
+
+def test_clave_depende_de_semilla_y_parametros():
+    nuevo = lambda **kw: SimuladorBanco(300, dict(PROB_LLEGADA), dict(PROB_SERVICIO), **kw)
+    assert CacheResultados.clave_de(nuevo(semilla=1)) == CacheResultados.clave_de(nuevo(semilla=1))
+    assert CacheResultados.clave_de(nuevo(semilla=1)) != CacheResultados.clave_de(nuevo(semilla=2))
+    assert CacheResultados.clave_de(nuevo()) is None
+
+
+def test_lru_acotado_por_bytes():
+    corridas = [_corrida(semilla) for semilla in (1, 2, 3)]
+    # Caben las dos más grandes juntas, pero no las tres
+    tamaños = sorted(len(datos) for _, datos, _ in corridas)
+    cache = CacheResultados(max_bytes_memoria=tamaños[1] + tamaños[2])
+    (c1, d1, _), (c2, d2, _), (c3, d3, _) = corridas
+    cache.guardar(c1, d1)
+    cache.guardar(c2, d2)
+    assert cache.obtener(c1) is not None   # c1 pasa a ser la más reciente
+    cache.guardar(c3, d3)
+
+    assert c2 not in cache
+    assert c1 in cache and c3 in cache
+    metricas = cache.metricas()
+    assert metricas['desalojos_memoria'] == 1
+    assert metricas['bytes_memoria'] == len(d1) + len(d3) <= cache.max_bytes_memoria
+
+    # Un snapshot más grande que todo el nivel no se guarda
+    chico = CacheResultados(max_bytes_memoria=len(d1) - 1)
+    chico.guardar(c1, d1)
+    assert c1 not in chico
+
+
+def test_acierto_en_disco_se_promueve_a_memoria(tmp_path):
+    clave, datos, estadisticas = _corrida(4)
+    CacheResultados(directorio=str(tmp_path)).guardar(clave, datos)
+    assert (tmp_path / (clave + EXTENSION)).exists()
+
+    # Otra instancia (memoria vacía) lee del disco y luego de memoria
+    cache = CacheResultados(directorio=str(tmp_path))
+    assert cache.obtener(clave).stats == estadisticas
+    assert cache.obtener(clave).stats == estadisticas
+    metricas = cache.metricas()
+    assert (metricas['aciertos_disco'], metricas['aciertos_memoria']) == (1, 1)
+    assert metricas['entradas_memoria'] == metricas['entradas_disco'] == 1
+
+    assert cache.invalidar(clave) == 1
+    assert cache.obtener(clave) is None
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize('clave', ['../../etc/passwd', 'ABC', 'a' * 63, 'g' * 64, 42])
+def test_rechaza_claves_invalidas(tmp_path, clave):
+    cache = CacheResultados(directorio=str(tmp_path))
+    with pytest.raises(ValueError):
+        cache.obtener(clave)
+    with pytest.raises(ValueError):
+        cache.guardar(clave, b'x')
+    with pytest.raises(ValueError):
+        cache.invalidar(clave)
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+from Modelo.Cliente import Cliente
+from Modelo.Tabla_clientes import TablaClientes
+from Tda.Cola_prioridad import ColaPrioridadGlobal, ColaPrioridadCompacta
+
+TIPOS = ('A', 'M', 'B')
+
+
+class _Fabrica:
+    """Crea clientes para la cola común o para la compacta."""
+
+    def __init__(self, compacta):
+        self.tabla = TablaClientes() if compacta else None
+        self.cola = ColaPrioridadCompacta(self.tabla) if compacta else ColaPrioridadGlobal()
+        self.n = 0
+
+    def cliente(self, tipo):
+        self.n += 1
+        if self.tabla is not None:
+            return self.tabla.vista(self.tabla.agregar(tipo, self.n))
+        return Cliente(f"C{self.n}", tipo, self.n)
+
+
+@pytest.mark.parametrize('compacta', [False, True])
+def test_contra_modelo_de_referencia(compacta):
+    rng = random.Random(3)
+    f = _Fabrica(compacta)
+    cola = f.cola
+    modelo = []          # (prioridad, seq, id) vivos, en orden global
+    todos = []           # (seq, tipo) alguna vez encolados
+    for _ in range(5000):
+        op = rng.random()
+        if op < 0.5:
+            c = f.cliente(rng.choice(TIPOS))
+            seq = cola.encolar(c)
+            todos.append((seq, c.tipo))
+            modelo.append((ColaPrioridadGlobal.prioridad_val[c.tipo], seq, c.id))
+            modelo.sort()
+        elif op < 0.75 and todos:
+            # Retiros repetidos o de clientes ya atendidos deben devolver False
+            seq, tipo = rng.choice(todos)
+            vivo = any(s == seq for _, s, _ in modelo)
+            assert cola.retirar(seq, tipo) is vivo
+            modelo = [e for e in modelo if e[1] != seq]
+        else:
+            c = cola.extraer_siguiente()
+            if modelo:
+                assert c.id == modelo.pop(0)[2]
+            else:
+                assert c is None
+        assert cola.tamaño() == len(modelo)
+        if rng.random() < 0.05:
+            offset = rng.randrange(len(modelo) + 2)
+            limit = rng.choice([None, 1, 7, 50])
+            pagina = [(p, s, c.id) for p, s, c in cola.iter_desde(offset, limit)]
+            assert pagina == modelo[offset:None if limit is None else offset + limit]
+    assert [(p, s, c.id) for p, s, c in cola] == modelo
+    for tipo in TIPOS:
+        assert cola.tamaño_de_tipo(tipo) == sum(1 for e in modelo if e[2] and
+                                                 ColaPrioridadGlobal.prioridad_val[tipo] == e[0])
+
+
+def test_retirar_dos_veces_tras_compactar():
+    cola = ColaPrioridadGlobal()
+    seqs = [cola.encolar(Cliente(f"C{i}", 'B', i)) for i in range(10)]
+    for seq in seqs[1:7]:        # más de la mitad: compacta
+        assert cola.retirar(seq, 'B')
+    assert cola.tamaño() == 4
+    for seq in seqs[1:7]:
+        assert not cola.retirar(seq, 'B')
+    assert cola.tamaño() == 4
+    assert [c.id for c in cola.clientes()] == ['C0', 'C7', 'C8', 'C9']
+
+
+@pytest.mark.parametrize('compacta', [False, True])
+def test_paginas_con_retiradas_y_frente_avanzado(compacta):
+    f = _Fabrica(compacta)
+    cola = f.cola
+    seqs = {tipo: [cola.encolar(f.cliente(tipo)) for _ in range(300)] for tipo in TIPOS}
+    for tipo in TIPOS:
+        for _ in range(100):               # el frente avanza (y se recorta)
+            cola.extraer_siguiente_de_tipo(tipo)
+        for _ in range(50):                # y otras quedan detrás del frente
+            cola.encolar(f.cliente(tipo))
+        for seq in seqs[tipo][150:250:3]:  # retiradas en medio, sin compactar
+            assert cola.retirar(seq, tipo)
+    esperado = list(cola)
+    assert len(esperado) == cola.tamaño() == 3 * (200 + 50 - 34)
+    for offset in range(0, len(esperado) + 5, 13):
+        for limit in (1, 10, 200):
+            assert list(cola.iter_desde(offset, limit)) == esperado[offset:offset + limit]
+    assert list(cola.iter_desde(-3, 2)) == esperado[:2]
+    assert list(cola.iter_desde(40)) == esperado[40:]
+
+
+def test_retirar_atendido_devuelve_false():
+    cola = ColaPrioridadGlobal()
+    seq = cola.encolar(Cliente('C1', 'A', 0))
+    cola.encolar(Cliente('C2', 'A', 0))
+    assert cola.extraer_siguiente_de_tipo('A').id == 'C1'
+    assert not cola.retirar(seq, 'A')
+    assert cola.tamaño() == 1
@@ -0,0 +1,98 @@
+import pytest
+
+from bench.sqlite_db import crear_db_sqlite
+from Dao.DAO_colas import DAOColas
+from Dao.DAO_corridas import DAOCorridas
+from Dao.DAO_historial import DAOHistorial
+from Dao.DAO_resultados import DAOResultados
+
+FECHAS = ('2024-01-01 10:15:00', '2024-01-01 11:30:00', '2024-01-02 09:00:00', '2024-02-01 08:00:00')
+
+
+@pytest.fixture
+def db():
+    """Cuatro corridas en fechas fijas, cada una con colas A/M/B e historial."""
+    db = crear_db_sqlite()
+    resultados = DAOResultados(db)
+    for i, fecha in enumerate(FECHAS, start=1):
+        estadisticas = {tipo: {'llegaron': 10 * i + k, 'atendidos': 5 * i + k, 'no_atendidos': k,
+                               'abandonaron': i}
+                        for k, tipo in enumerate('AMB')}
+        historial = [{'id': f"C{n}", 'tipo': 'AMB'[n % 3], 'llegada': n, 'inicio': n, 'fin': n + 1}
+                     for n in range(25 * i)]
+        corrida_id = resultados.guardar_resultado(None, estadisticas, historial)
+        assert corrida_id == i
+        with db.cursor() as (conn, cur):
+            cur.execute("UPDATE corridas SET tiempo = %s WHERE id = %s", (fecha, corrida_id))
+            conn.commit()
+    yield db
+    db.cerrar()
+
+
+def _paginar(pagina, clave='id', **kwargs):
+    filas, cursor = [], 0
+    while True:
+        bloque = pagina(despues_de=cursor, **kwargs)
+        if not bloque:
+            return filas
+        assert len(bloque) <= kwargs['limite']
+        filas.extend(bloque)
+        cursor = bloque[-1][clave]
+
+
+def test_paginas_de_colas_igual_que_recorrido(db):
+    dao = DAOColas(db, tamaño_bloque=4)
+    todas = list(dao.iterar_todas())
+    assert len(todas) == 12
+    assert _paginar(dao.obtener_pagina, limite=5) == todas
+    de_la_2 = _paginar(dao.obtener_pagina, limite=2, corrida_id=2)
+    assert [f['nombre_id'] for f in de_la_2] == ['A', 'M', 'B']
+    assert de_la_2 == list(dao.iterar_todas(corrida_id=2))
+
+
+def test_paginas_de_historial(db):
+    dao = DAOHistorial(db, tamaño_lote=7)
+    paginas = [dao.obtener_por_corrida(3, despues_de=0, limite=30)]
+    paginas.append(dao.obtener_por_corrida(3, despues_de=paginas[0][-1]['id'], limite=30))
+    paginas.append(dao.obtener_por_corrida(3, despues_de=paginas[1][-1]['id'], limite=30))
+    assert [len(p) for p in paginas] == [30, 30, 15]
+    filas = [f for p in paginas for f in p]
+    assert [f['cliente_id'] for f in filas] == [f"C{n}" for n in range(75)]
+    assert filas == list(dao.iterar_por_corrida(3))
+    assert dao.obtener_por_corrida(3, despues_de=filas[-1]['id']) == []
+
+
+def test_paginas_de_corridas(db):
+    dao = DAOCorridas(db, tamaño_bloque=3)
+    assert [c['id'] for c in _paginar(dao.obtener_pagina, limite=3)] == [1, 2, 3, 4]
+    assert [c['id'] for c in dao.iterar_todas()] == [1, 2, 3, 4]
+    enero = _paginar(dao.obtener_pagina, limite=1, desde='2024-01-01', hasta='2024-02-01')
+    assert [c['id'] for c in enero] == [1, 2, 3]
+    assert dao.contar() == 4
+    assert dao.contar(desde='2024-01-02') == 2
+
+
+def test_agregados_en_sql(db):
+    dao = DAOColas(db)
+    por_tipo = {f['tipo']: f for f in dao.totales_por_tipo()}
+    assert por_tipo['A']['llegaron'] == 10 + 20 + 30 + 40
+    assert por_tipo['M']['atendidos'] == (5 + 10 + 15 + 20) + 4
+    assert por_tipo['B']['abandonaron'] == 1 + 2 + 3 + 4
+    assert por_tipo['A']['corridas'] == 4
+    assert por_tipo['A']['tasa_atencion'] == pytest.approx(50 / 100)
+
+    por_corrida = dao.totales_por_corrida(despues_de=1, limite=2)
+    assert [f['corrida_id'] for f in por_corrida] == [2, 3]
+    assert por_corrida[0]['llegaron'] == 20 + 21 + 22
+
+    por_mes = dao.totales_por_ventana('mes')
+    assert [(f['ventana'], f['tipo'], f['corridas']) for f in por_mes] == [
+        ('2024-01', 'A', 3), ('2024-01', 'B', 3), ('2024-01', 'M', 3),
+        ('2024-02', 'A', 1), ('2024-02', 'B', 1), ('2024-02', 'M', 1)]
+    assert [f['corridas'] for f in dao.totales_por_ventana('hora', desde='2024-01-01',
+                                                           hasta='2024-01-02')] == [1] * 6
+    assert DAOCorridas(db).contar_por_ventana('dia') == [
+        {'ventana': '2024-01-01', 'corridas': 2}, {'ventana': '2024-01-02', 'corridas': 1},
+        {'ventana': '2024-02-01', 'corridas': 1}]
+    with pytest.raises(ValueError):
+        dao.totales_por_ventana('semana')
@@ -0,0 +1,113 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+from Controller.GestorCorridas import GestorCorridas, CorridaRechazada
+
+PROB_LLEGADA = {'A': 0.2, 'M': 0.2, 'B': 0.2}
+PROB_SERVICIO = {'A': 0.5, 'M': 0.5, 'B': 0.5}
+
+
+class DAOFalso:
+    """Hace de DAOCorridas y DAOColas sin BD."""
+
+    def __init__(self):
+        self._ids = itertools.count(100)
+        self.colas = []
+
+    def crear_corrida(self, tiempo, conn=None):
+        return next(self._ids)
+
+    def crear_colas_bulk(self, filas, conn=None):
+        self.colas.extend(filas)
+
+
+@pytest.fixture
+def gestor(request):
+    opciones = getattr(request, 'param', {})
+    dao = DAOFalso()
+    gestor = GestorCorridas(dao, dao, **opciones)
+    yield gestor
+    gestor.cerrar()
+
+
+def _lenta(gestor):
+    # No termina sola mientras dura el test
+    return gestor.crear(10**9, dict(PROB_LLEGADA), dict(PROB_SERVICIO), ticks_por_segundo=10)
+
+
+def _esperar_terminadas(gestor, n, timeout=5):
+    limite = time.monotonic() + timeout
+    while gestor.metricas()['activas'] > n and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert gestor.metricas()['activas'] <= n
+
+
+@pytest.mark.parametrize('gestor', [{'max_concurrentes': 1, 'max_en_cola': 1}], indirect=True)
+def test_rechaza_sin_cupo(gestor):
+    _lenta(gestor)
+    _lenta(gestor)
+    with pytest.raises(CorridaRechazada):
+        _lenta(gestor)
+    assert gestor.metricas()['activas'] == 2
+
+
+@pytest.mark.parametrize('gestor', [{'max_concurrentes': 2, 'max_en_cola': 2}], indirect=True)
+def test_admision_concurrente_no_excede_el_cupo(gestor):
+    aceptadas, rechazadas = [], []
+    barrera = threading.Barrier(20)
+
+    def alta():
+        barrera.wait()
+        try:
+            aceptadas.append(_lenta(gestor)[0])
+        except CorridaRechazada:
+            rechazadas.append(1)
+
+    hilos = [threading.Thread(target=alta) for _ in range(20)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    assert len(aceptadas) == 4 and len(rechazadas) == 16
+    assert len(set(aceptadas)) == 4
+    assert gestor.metricas() == {'registradas': 4, 'activas': 4, 'max_concurrentes': 2,
+                                 'max_en_cola': 2}
+
+
+def test_clave_local_y_id_de_bd(gestor):
+    clave, controller = gestor.crear(50, dict(PROB_LLEGADA), dict(PROB_SERVICIO))
+    assert clave.startswith('local-')
+    corrida_id = controller.last_corrida_id
+    assert corrida_id is not None
+    assert gestor.obtener(clave) is controller
+    assert gestor.obtener(str(corrida_id)) is controller
+    assert gestor.listar()[0]['corrida_id'] == corrida_id
+
+
+@pytest.mark.parametrize('gestor', [{'max_terminadas': 2}], indirect=True)
+def test_desaloja_terminadas_por_lru(gestor):
+    rapida = lambda: gestor.crear(20, dict(PROB_LLEGADA), dict(PROB_SERVICIO))[0]
+    primera, segunda = rapida(), rapida()
+    _esperar_terminadas(gestor, 0)
+    assert gestor.obtener(primera) is not None   # pasa a ser la más reciente
+    activa = _lenta(gestor)[0]
+    tercera = rapida()
+    _esperar_terminadas(gestor, 1)
+    # Tres terminadas con lugar para dos: sale la menos usada; la activa
+    # nunca se desaloja
+    assert {c['id'] for c in gestor.listar()} == {primera, tercera, activa}
+    assert gestor.obtener(segunda) is None
+
+
+@pytest.mark.parametrize('gestor', [{'ttl_segundos': 0.05}], indirect=True)
+def test_desaloja_terminadas_por_ttl(gestor):
+    clave, controller = gestor.crear(20, dict(PROB_LLEGADA), dict(PROB_SERVICIO))
+    activa = _lenta(gestor)[0]
+    _esperar_terminadas(gestor, 1)
+    time.sleep(0.1)
+    assert gestor.obtener(clave) is None
+    assert gestor.obtener(str(controller.last_corrida_id)) is None
+    assert gestor.obtener(activa) is not None
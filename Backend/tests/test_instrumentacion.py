@@ -0,0 +1,108 @@
+import re
+
+import pytest
+
+from config import instrumentacion
+from config.instrumentacion import Registro
+
+# nombre{etiqueta="valor",...} número  (formato de texto 0.0.4)
+MUESTRA = re.compile(r'([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_]\w*="(?:[^"\\\n]|\\[\\"n])*",?)*\})?'
+                     r' (-?[0-9.e+-]+|\+Inf|-Inf|NaN)')
+ETIQUETA = re.compile(r'([a-zA-Z_]\w*)="((?:[^"\\]|\\.)*)"')
+
+
+@pytest.fixture
+def activa(monkeypatch):
+    monkeypatch.setattr(instrumentacion.registro, 'activa', True)
+
+
+def _validar(texto):
+    """Comprueba el formato y devuelve {nombre: [(etiquetas, valor)]} y {nombre: tipo}."""
+    assert texto.endswith('\n')
+    muestras, tipos = {}, {}
+    for linea in texto.splitlines():
+        if linea.startswith('# HELP '):
+            continue
+        if linea.startswith('# TYPE '):
+            _, _, nombre, tipo = linea.split(' ')
+            assert tipo in ('counter', 'gauge', 'histogram')
+            tipos[nombre] = tipo
+            continue
+        m = MUESTRA.fullmatch(linea)
+        assert m, linea
+        etiquetas = dict(ETIQUETA.findall(m.group(2) or ''))
+        muestras.setdefault(m.group(1), []).append((etiquetas, m.group(3)))
+    return muestras, tipos
+
+
+def test_contador_y_medidor_con_etiquetas_escapadas(activa):
+    registro = Registro()
+    contador = registro.contador('pedidos_total', 'Pedidos\\atendidos\nen total', ('ruta',))
+    medidor = registro.medidor('en_uso', 'Conexiones en uso')
+    contador.inc(ruta='a"b\\c\nd')
+    contador.inc(2, ruta='a"b\\c\nd')
+    medidor.fijar(7)
+
+    texto = registro.exportar()
+    assert '# HELP pedidos_total Pedidos\\\\atendidos\\nen total\n' in texto
+    assert 'pedidos_total{ruta="a\\"b\\\\c\\nd"} 3\n' in texto
+    muestras, tipos = _validar(texto)
+    assert tipos == {'pedidos_total': 'counter', 'en_uso': 'gauge'}
+    assert muestras['en_uso'] == [({}, '7')]
+
+
+def test_histograma_con_cubetas_acumuladas(activa):
+    registro = Registro()
+    histograma = registro.histograma('espera_segundos', 'Espera', ('cola',), cubetas=(0.1, 1.0))
+    for valor in (0.05, 0.1, 0.5, 3.0):
+        histograma.observar(valor, cola='A')
+
+    muestras, tipos = _validar(registro.exportar())
+    assert tipos == {'espera_segundos': 'histogram'}
+    cubetas = [(e['le'], v) for e, v in muestras['espera_segundos_bucket']]
+    # `le` incluye el límite: 0.1 cae en la primera cubeta
+    assert cubetas == [('0.1', '2'), ('1.0', '3'), ('+Inf', '4')]
+    assert all(e['cola'] == 'A' for e, _ in muestras['espera_segundos_bucket'])
+    assert muestras['espera_segundos_count'] == [({'cola': 'A'}, '4')]
+    assert float(muestras['espera_segundos_sum'][0][1]) == pytest.approx(3.65)
+
+
+def test_etiquetas_distintas_a_las_declaradas(activa):
+    contador = Registro().contador('x_total', 'x', ('a',))
+    with pytest.raises(ValueError):
+        contador.inc(b=1)
+
+
+def test_metricas_de_la_aplicacion_exportan_formato_valido(activa):
+    with instrumentacion.SERIALIZACION.medir(endpoint='prueba'):
+        pass
+    instrumentacion.CORRIDAS.inc(estado='prueba')
+    fases = instrumentacion.series_fases(None, 'ticks')
+    assert len(fases) == 4
+    fases[0].observar(1e-6)
+    _, tipos = _validar(instrumentacion.registro.exportar())
+    assert tipos['simulacion_fase_segundos'] == 'histogram'
+    assert tipos['corridas_total'] == 'counter'
+    instrumentacion.registro.descartar(endpoint='prueba')
+    instrumentacion.registro.descartar(estado='prueba')
+    instrumentacion.registro.descartar(corrida='sin_id')
+
+
+def test_desactivada_no_registra_nada(monkeypatch):
+    monkeypatch.setattr(instrumentacion.registro, 'activa', False)
+    registro = Registro()
+    contador = registro.contador('c_total', 'c', ('a',))
+    histograma = registro.histograma('h_segundos', 'h')
+    contador.inc(a=1)
+    histograma.observar(0.5)
+    with histograma.medir():
+        pass
+
+    @instrumentacion.cronometrado(histograma)
+    def sumar(a, b):
+        return a + b
+
+    assert sumar(1, 2) == 3
+    assert instrumentacion.series_fases(1, 'ticks') is None
+    assert registro.exportar() == ('# HELP c_total c\n# TYPE c_total counter\n'
+                                   '# HELP h_segundos h\n# TYPE h_segundos histogram\n')
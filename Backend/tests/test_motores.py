@@ -0,0 +1,31 @@
+import math
+import statistics
+
+import pytest
+
+from Modelo.Simulador import SimuladorBanco, MOTOR_TICKS, MOTOR_EVENTOS
+
+SEMILLAS = range(40)
+CAMPOS = ('llegaron', 'atendidos', 'abandonaron')
+
+
+def _muestras(motor, prob_abandono):
+    muestras = []
+    for semilla in SEMILLAS:
+        sim = SimuladorBanco(1500, {'A': 0.1, 'M': 0.2, 'B': 0.3}, {'A': 0.4, 'M': 0.3, 'B': 0.25},
+                             motor=motor, semilla=semilla, prob_abandono=prob_abandono)
+        muestras.append(sim.run()['estadisticas'])
+    return muestras
+
+
+@pytest.mark.parametrize('prob_abandono', [None, {'A': 0.01, 'M': 0.03, 'B': 0.08}])
+def test_motores_estadisticamente_equivalentes(prob_abandono):
+    ticks = _muestras(MOTOR_TICKS, prob_abandono)
+    eventos = _muestras(MOTOR_EVENTOS, prob_abandono)
+    for tipo in ('A', 'M', 'B'):
+        for campo in CAMPOS:
+            x = [m[tipo][campo] for m in ticks]
+            y = [m[tipo][campo] for m in eventos]
+            # Diferencia de medias dentro de 4 errores estándar (más 1 por discretización)
+            error = math.sqrt((statistics.variance(x) + statistics.variance(y)) / len(SEMILLAS))
+            assert abs(statistics.mean(x) - statistics.mean(y)) <= 4 * error + 1, (tipo, campo)
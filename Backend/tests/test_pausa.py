@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from Modelo.Simulador import SimuladorBanco, MOTORES
+
+PROB_LLEGADA = {'A': 0.2, 'M': 0.3, 'B': 0.4}
+PROB_SERVICIO = {'A': 0.3, 'M': 0.3, 'B': 0.3}
+
+
+def _en_marcha(motor):
+    """Simulador corriendo en un hilo, con una corrida que no termina sola."""
+    sim = SimuladorBanco(10**9, dict(PROB_LLEGADA), dict(PROB_SERVICIO), motor=motor, semilla=1)
+    hilo = threading.Thread(target=sim.run, daemon=True)
+    hilo.start()
+    limite = time.monotonic() + 5
+    while sim.tick == 0 and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert sim.tick > 0
+    return sim, hilo
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_pausa_detiene_el_reloj_sin_espera_activa(motor):
+    sim, hilo = _en_marcha(motor)
+    sim.pausar()
+    assert sim.esperar_pausa(timeout=2)
+
+    tick = sim.tick
+    cpu = time.process_time()
+    time.sleep(0.3)
+    assert sim.tick == tick
+    # Pausada, run() duerme en un Event: casi no consume CPU
+    assert time.process_time() - cpu < 0.1
+
+    sim.reanudar()
+    limite = time.monotonic() + 5
+    while sim.tick == tick and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert sim.tick > tick
+
+    sim.detener_simulacion()
+    hilo.join(timeout=2)
+    assert not hilo.is_alive()
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+@pytest.mark.parametrize('pausada', [False, True])
+def test_detener_termina_pronto(motor, pausada):
+    sim, hilo = _en_marcha(motor)
+    if pausada:
+        sim.pausar()
+        assert sim.esperar_pausa(timeout=2)
+
+    inicio = time.monotonic()
+    sim.detener_simulacion()
+    hilo.join(timeout=1)
+    assert not hilo.is_alive()
+    assert time.monotonic() - inicio < 1
+    assert sim.detener
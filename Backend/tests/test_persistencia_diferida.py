@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+from bench.sqlite_db import crear_db_sqlite
+from Dao.Persistencia_diferida import EscritorDiferido
+
+ESTADISTICAS = {'A': {'llegaron': 1, 'atendidos': 1, 'no_atendidos': 0, 'abandonaron': 0}}
+
+
+@pytest.fixture
+def db():
+    db = crear_db_sqlite()
+    yield db
+    db.cerrar()
+
+
+def _contar(db, tabla):
+    with db.cursor() as (_, cur):
+        cur.execute(f"SELECT COUNT(*) FROM {tabla}")
+        return cur.fetchone()[0]
+
+
+def _escritor(db, **kwargs):
+    kwargs.setdefault('reintentos', 2)
+    kwargs.setdefault('espera_inicial', 0.001)
+    return EscritorDiferido(db, **kwargs)
+
+
+def _bloquear(escritor):
+    """Encola un resultado que retiene al hilo hasta liberar el Event devuelto."""
+    liberar, tomado = threading.Event(), threading.Event()
+
+    def historial():
+        tomado.set()
+        liberar.wait(5)
+        return []
+    escritor.guardar_resultado(None, ESTADISTICAS, historial)
+    assert tomado.wait(5)
+    return liberar
+
+
+def test_escrituras_consecutivas_van_en_un_lote(db):
+    escritor = _escritor(db)
+    liberar = _bloquear(escritor)
+    futuros = [escritor.crear_corrida(0) for _ in range(5)]
+    liberar.set()
+    assert escritor.vaciar(timeout=5)
+
+    ids = [f.result() for f in futuros]
+    assert len(set(ids)) == 5
+    m = escritor.metricas()
+    assert (m['lotes'], m['escritas'], m['fallidas'], m['pendientes']) == (2, 6, 0, 0)
+    escritor.cerrar()
+
+
+def test_reintento_no_duplica_filas(db):
+    escritor = _escritor(db)
+    llamadas = []
+
+    def historial_inestable():
+        llamadas.append(1)
+        if len(llamadas) == 1:
+            raise RuntimeError("falla transitoria")
+        return [{'id': 'C1', 'tipo': 'A', 'llegada': 0, 'inicio': 0, 'fin': 1}]
+
+    liberar = _bloquear(escritor)
+    bien = escritor.guardar_resultado(None, ESTADISTICAS, [])
+    inestable = escritor.guardar_resultado(None, ESTADISTICAS, historial_inestable)
+    liberar.set()
+    assert bien.result(5) and inestable.result(5)
+    assert escritor.metricas()['reintentos'] == 1
+    # 1 del bloqueo + 2 del grupo, sin duplicados del primer intento
+    assert _contar(db, 'corridas') == 3
+    assert _contar(db, 'colas') == 3
+    assert _contar(db, 'historial') == 1
+    escritor.cerrar()
+
+
+def test_una_escritura_invalida_no_arrastra_al_grupo(db):
+    escritor = _escritor(db)
+
+    def historial_invalido():
+        raise ValueError("fila inválida")
+
+    liberar = _bloquear(escritor)
+    futuros = [escritor.guardar_resultado(None, ESTADISTICAS, []) for _ in range(3)]
+    malo = escritor.guardar_resultado(None, ESTADISTICAS, historial_invalido)
+    futuros += [escritor.guardar_resultado(None, ESTADISTICAS, []) for _ in range(3)]
+    liberar.set()
+
+    assert all(f.result(5) is not None for f in futuros)
+    with pytest.raises(ValueError):
+        malo.result(5)
+    m = escritor.metricas()
+    assert (m['fallidas'], m['escritas']) == (1, 7)
+    assert _contar(db, 'colas') == 7
+    escritor.cerrar()
+
+
+def test_cerrar_vacia_la_cola(db):
+    escritor = _escritor(db)
+    liberar = _bloquear(escritor)
+    futuros = [escritor.guardar_resultado(None, ESTADISTICAS, []) for _ in range(10)]
+    threading.Timer(0.1, liberar.set).start()
+    escritor.cerrar(timeout=5)
+    assert all(f.done() and f.exception() is None for f in futuros)
+    assert _contar(db, 'corridas') == 11
+    with pytest.raises(RuntimeError):
+        escritor.crear_corrida(0)
+
+
+def test_cerrar_con_cola_llena_respeta_el_timeout(db):
+    escritor = _escritor(db, capacidad=1)
+    liberar = _bloquear(escritor)
+    escritor.crear_corrida(0)   # llena la cola
+    inicio = time.monotonic()
+    escritor.cerrar(timeout=0.2)
+    assert time.monotonic() - inicio < 1
+    liberar.set()
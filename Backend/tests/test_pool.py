@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from bench.sqlite_db import ConexionSQLite, crear_db_sqlite
+from config.db import DatabaseConnection, PoolConexiones
+
+
+@pytest.fixture
+def fabrica(tmp_path):
+    ruta = str(tmp_path / 'pool.sqlite3')
+    return lambda: ConexionSQLite(ruta)
+
+
+def test_pool_agotado_lanza_timeout(fabrica):
+    pool = PoolConexiones(fabrica, tamaño=2, timeout=0.2)
+    a, b = pool.obtener(), pool.obtener()
+    m = pool.metricas()
+    assert (m['abiertas'], m['en_uso'], m['libres'], m['checkouts']) == (2, 2, 0, 2)
+
+    inicio = time.monotonic()
+    with pytest.raises(TimeoutError, match='pool de 2'):
+        pool.obtener()
+    assert 0.2 <= time.monotonic() - inicio < 2
+
+    m = pool.metricas()
+    assert (m['esperas'], m['timeouts'], m['checkouts'], m['en_uso']) == (1, 1, 2, 2)
+
+    pool.devolver(a)
+    pool.devolver(b)
+    m = pool.metricas()
+    assert (m['abiertas'], m['en_uso'], m['libres']) == (2, 0, 2)
+    pool.cerrar()
+
+
+def test_espera_recibe_la_conexion_devuelta(fabrica):
+    pool = PoolConexiones(fabrica, tamaño=1, timeout=5)
+    conn = pool.obtener()
+    obtenida = []
+    hilo = threading.Thread(target=lambda: obtenida.append(pool.obtener()))
+    hilo.start()
+    limite = time.monotonic() + 2
+    while pool.metricas()['esperas'] == 0 and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert pool.metricas()['esperas'] == 1
+
+    pool.devolver(conn)
+    hilo.join(timeout=2)
+    assert obtenida == [conn]   # se reutiliza, no se abre otra
+    m = pool.metricas()
+    assert (m['abiertas'], m['en_uso'], m['checkouts'], m['timeouts']) == (1, 1, 2, 0)
+    pool.devolver(conn)
+    pool.cerrar()
+
+
+def test_database_connection_agotada(fabrica):
+    db = DatabaseConnection(pool_size=1, pool_timeout=0.1, fabrica=fabrica)
+    with db.conexion():
+        with pytest.raises(TimeoutError):
+            with db.conexion():
+                pass
+        assert db.metricas_pool()['en_uso'] == 1
+    m = db.metricas_pool()
+    assert (m['en_uso'], m['libres'], m['timeouts']) == (0, 1, 1)
+    db.cerrar()
+
+
+def test_conexion_devuelta_tras_error():
+    db = crear_db_sqlite()
+    with pytest.raises(ZeroDivisionError):
+        with db.conexion():
+            1 / 0
+    m = db.metricas_pool()
+    assert (m['en_uso'], m['abiertas'], m['descartadas']) == (0, 1, 0)
+    db.cerrar()
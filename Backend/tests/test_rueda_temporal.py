@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from Tda.Rueda_temporal import RuedaTemporal
+
+
+@pytest.mark.parametrize('bits', [1, 3, 6])
+def test_contra_referencia_por_fuerza_bruta(bits):
+    rng = random.Random(bits)
+    rueda = RuedaTemporal(bits=bits)
+    pendientes = []      # (t, elemento)
+    ahora = 0
+    for i in range(3000):
+        for _ in range(rng.randrange(4)):
+            t = ahora + rng.choice((0, 1, rng.randrange(64), rng.randrange(5000)))
+            rueda.insertar(t, i)
+            pendientes.append((t, i))
+        proximo = rueda.proximo()
+        if pendientes:
+            # proximo() es cota inferior del próximo vencimiento
+            assert proximo is not None and proximo <= min(t for t, _ in pendientes)
+        else:
+            assert proximo is None
+        ahora += rng.choice((1, 1, 2, rng.randrange(200)))
+        vencidos = rueda.avanzar(ahora)
+        esperados = [e for t, e in pendientes if t <= ahora]
+        pendientes = [(t, e) for t, e in pendientes if t > ahora]
+        assert sorted(vencidos) == sorted(esperados)
+        assert len(rueda) == len(pendientes)
+    assert sorted(rueda.entradas()) == sorted(pendientes)
+
+
+def test_desde_entradas_conserva_pendientes():
+    rueda = RuedaTemporal(inicio=10)
+    for t in (5, 11, 80, 4000):
+        rueda.insertar(t, t)
+    copia = RuedaTemporal.desde_entradas(rueda.entradas(), inicio=rueda.actual)
+    assert sorted(copia.avanzar(100)) == [5, 11, 80]
+    assert copia.avanzar(10**6) == [4000]
+    assert len(copia) == 0
@@ -0,0 +1,98 @@
+import gzip
+import json
+import math
+import zlib
+from decimal import Decimal
+
+import pytest
+
+from config import serializacion
+from config.serializacion import (DEFLATE, GZIP, JSON, MSGPACK, NDJSON, Seccion,
+                                  codificar_secciones, comprimir, negociar_codificacion,
+                                  negociar_formato)
+
+
+@pytest.mark.parametrize('accept, formato, esperado', [
+    (None, None, JSON),
+    ('*/*', None, JSON),
+    ('application/x-ndjson', None, NDJSON),
+    ('text/html, application/x-ndjson;q=0.5, application/json;q=0.9', None, JSON),
+    ('application/json;q=0, application/jsonl', None, NDJSON),
+    ('application/json', 'ndjson', NDJSON),
+    ('application/x-ndjson', 'JSON', JSON),
+])
+def test_negociar_formato(accept, formato, esperado):
+    assert negociar_formato(accept, formato) == esperado
+
+
+def test_formato_explicito_no_disponible():
+    with pytest.raises(ValueError):
+        negociar_formato(None, 'xml')
+    if MSGPACK not in serializacion.disponibles():
+        with pytest.raises(ValueError):
+            negociar_formato(None, 'msgpack')
+        # Por Accept no es un error: se cae a JSON
+        assert negociar_formato('application/msgpack') == JSON
+
+
+@pytest.mark.parametrize('cabecera, esperado', [
+    (None, None),
+    ('', None),
+    ('identity', None),
+    ('gzip', GZIP),
+    ('deflate, gzip', DEFLATE),
+    ('deflate;q=0.5, gzip;q=0.8', GZIP),
+    ('gzip;q=0, deflate', DEFLATE),
+    ('br, *', GZIP),
+    ('gzip;q=abc', None),
+])
+def test_negociar_codificacion(cabecera, esperado):
+    assert negociar_codificacion(cabecera) == esperado
+
+
+def _secciones(n=5000):
+    historial = ({'id': f"C{i}", 'tipo': 'AMB'[i % 3], 'llegada': i, 'fin': i + 0.5}
+                 for i in range(n))
+    return [Seccion('estadisticas', {'A': {'llegaron': 3, 'tasa': Decimal('0.25')}}),
+            Seccion('historial', historial, largo=n),
+            Seccion('logs', ['ñandú', 'fin'])]
+
+
+def test_json_en_bloques_igual_al_documento():
+    bloques = list(codificar_secciones(_secciones(), JSON, tamaño_bloque=4096))
+    assert len(bloques) > 1
+    documento = json.loads(b''.join(bloques))
+    assert documento['estadisticas'] == {'A': {'llegaron': 3, 'tasa': 0.25}}
+    assert len(documento['historial']) == 5000
+    assert documento['historial'][-1] == {'id': 'C4999', 'tipo': 'M', 'llegada': 4999,
+                                          'fin': 4999.5}
+    assert documento['logs'] == ['ñandú', 'fin']
+
+
+def test_ndjson_una_linea_por_elemento():
+    lineas = b''.join(codificar_secciones(_secciones(10), NDJSON)).splitlines()
+    filas = [json.loads(linea) for linea in lineas]
+    assert len(filas) == 1 + 10 + 1
+    assert filas[0] == {'section': 'estadisticas', 'value': {'A': {'llegaron': 3, 'tasa': 0.25}}}
+    assert filas[1] == {'section': 'historial', 'item': {'id': 'C0', 'tipo': 'A', 'llegada': 0,
+                                                         'fin': 0.5}}
+
+
+@pytest.mark.parametrize('codificacion, descomprimir', [
+    (GZIP, gzip.decompress),
+    (DEFLATE, zlib.decompress),
+    (None, lambda datos: datos),
+])
+def test_compresion_en_streaming_devuelve_el_mismo_contenido(codificacion, descomprimir):
+    plano = b''.join(codificar_secciones(_secciones(), JSON, tamaño_bloque=4096))
+    bloques = list(comprimir(codificar_secciones(_secciones(), JSON, tamaño_bloque=4096),
+                             codificacion))
+    assert len(bloques) > 1
+    assert descomprimir(b''.join(bloques)) == plano
+
+
+@pytest.mark.parametrize('dumps', [serializacion.dumps, serializacion._dumps_estandar])
+def test_no_finitos_salen_como_null(dumps):
+    valor = {'a': math.nan, 'b': [math.inf, -math.inf, 1.5], 'c': ('x', math.nan)}
+    assert json.loads(dumps(valor)) == {'a': None, 'b': [None, None, 1.5], 'c': ['x', None]}
+    assert dumps({'n': 2, 't': 'ñ'}) == '{"n":2,"t":"ñ"}'.encode('utf-8')
@@ -0,0 +1,67 @@
+import pickle
+import threading
+
+import pytest
+
+from Modelo.Simulador import SimuladorBanco, MOTORES, VERSION_SNAPSHOT
+
+PROB_LLEGADA = {'A': 0.2, 'M': 0.25, 'B': 0.3}
+PROB_SERVICIO = {'A': 0.3, 'M': 0.25, 'B': 0.2}
+
+
+def _nuevo(motor, compacto=False):
+    return SimuladorBanco(3000, dict(PROB_LLEGADA), dict(PROB_SERVICIO), motor=motor, semilla=11,
+                          compacto=compacto, prob_abandono={'B': 0.05, 'M': 0.02})
+
+
+def _resumen(sim, resultado):
+    return resultado['estadisticas'], resultado['historial'], resultado['cola_prioridad']
+
+
+def _snapshot_en(sim, k):
+    """Pausa `sim` cerca del tick `k`, toma el snapshot y la detiene."""
+    sim.observar_avance(k, lambda t, foto: sim.pausar())
+    hilo = threading.Thread(target=sim.run)
+    hilo.start()
+    assert sim.esperar_pausa(timeout=10)
+    datos = sim.snapshot()
+    tick = sim.tick
+    sim.detener_simulacion()
+    hilo.join(timeout=10)
+    return datos, tick
+
+
+@pytest.mark.parametrize('compacto', [False, True])
+@pytest.mark.parametrize('motor', MOTORES)
+def test_restaurar_y_seguir_igual_que_sin_interrumpir(motor, compacto):
+    continuo = _nuevo(motor, compacto)
+    esperado = _resumen(continuo, continuo.run())
+
+    datos, tick = _snapshot_en(_nuevo(motor, compacto), 700)
+    assert 0 < tick < 3000
+    restaurado = SimuladorBanco.restaurar(datos)
+    assert _resumen(restaurado, restaurado.run()) == esperado
+
+
+def _snapshot_alterado(cambio):
+    estado = pickle.loads(_nuevo('ticks').snapshot())
+    cambio(estado)
+    return pickle.dumps(estado)
+
+
+@pytest.mark.parametrize('cambio', [
+    lambda e: e.pop('parametros'),
+    lambda e: e['parametros'].pop('motor'),
+    lambda e: e.__setitem__('rng', 'no es un estado'),
+    lambda e: e.__setitem__('stats', None),
+    lambda e: e.__setitem__('cola', 5),
+])
+def test_snapshot_mal_formado_es_value_error(cambio):
+    with pytest.raises(ValueError, match='snapshot inválido'):
+        SimuladorBanco.restaurar(_snapshot_alterado(cambio))
+
+
+@pytest.mark.parametrize('datos', [b'', b'basura', pickle.dumps({'version': VERSION_SNAPSHOT + 1})])
+def test_bytes_invalidos_son_value_error(datos):
+    with pytest.raises(ValueError):
+        SimuladorBanco.restaurar(datos)
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from Modelo.Traza_llegadas import (EXTENSION, TrazaLlegadas, csv_a_traza, escribir_traza,
+                                   main, ruta_en)
+
+CSV_TICKS = """tick,tipo
+5,B
+2,A
+2,B
+2,M
+9,A
+12,M
+"""
+
+
+@pytest.fixture
+def traza(tmp_path):
+    origen = tmp_path / 'llegadas.csv'
+    origen.write_text(CSV_TICKS, encoding='utf-8')
+    destino = tmp_path / ('dia' + EXTENSION)
+    assert csv_a_traza(str(origen), str(destino)) == 6
+    return str(destino)
+
+
+def _reproducir(traza, ticks):
+    llegadas = []
+    for t in range(ticks):
+        traza.generar(t, lambda t, tipo: llegadas.append((t, tipo)))
+    return llegadas
+
+
+def test_csv_a_traza_y_reproduccion(traza):
+    with TrazaLlegadas(traza) as t:
+        assert len(t) == 6
+        assert (t.primer_tick, t.ultimo_tick) == (2, 12)
+        # Ordenadas por tick y, dentro del tick, en orden de tipo (A, M, B)
+        assert _reproducir(t, 20) == [(2, 'A'), (2, 'M'), (2, 'B'), (5, 'B'), (9, 'A'),
+                                      (12, 'M')]
+
+
+def test_csv_con_columna_de_tiempo(tmp_path):
+    origen = tmp_path / 'reloj.csv'
+    origen.write_text("hora,clase\n2024-03-01T08:00:30,M\n2024-03-01T08:02:10,A\n",
+                      encoding='utf-8')
+    destino = str(tmp_path / 'reloj.trz')
+    main([str(origen), destino, '--columna-tiempo', 'hora', '--columna-tipo', 'clase',
+          '--segundos-por-tick', '60'])
+    with TrazaLlegadas(destino) as t:
+        assert (t.primer_tick, t.ultimo_tick) == (8 * 60, 8 * 60 + 2)
+    with pytest.raises(ValueError):
+        csv_a_traza(str(origen), destino, columna_tiempo='hora', segundos_por_tick=0)
+
+
+def test_buscar_e_inicio(traza):
+    with TrazaLlegadas(traza) as t:
+        assert t.buscar(5) == 3
+        assert t.llegada(5, 0) == ['B']
+        assert t.siguiente(5, 0) == 9
+        # Retroceder reubica el cursor en O(log n)
+        assert t.llegada(2, 0) == ['A', 'M', 'B']
+        assert t.buscar(100) == 6
+        assert t.siguiente(12, 0) is None
+
+    # Con `inicio` el tick 0 de la corrida es el 5 de la traza
+    with TrazaLlegadas(traza, inicio=5) as t:
+        assert t.primer_tick == -3
+        assert _reproducir(t, 10) == [(0, 'B'), (4, 'A'), (7, 'M')]
+        assert (t.siguiente(-1, 0), t.siguiente(7, 0)) == (0, None)
+
+
+def test_desde_estado_sigue_en_la_misma_posicion(traza, tmp_path):
+    with TrazaLlegadas(traza, inicio=2) as t:
+        assert _reproducir(t, 4) == [(0, 'A'), (0, 'M'), (0, 'B'), (3, 'B')]
+        estado = t.estado()
+    with TrazaLlegadas.desde_estado(estado, str(tmp_path)) as t:
+        assert t.inicio == 2
+        assert t.siguiente(3, 0) == 7
+        assert [(k, t.llegada(k, 0)) for k in (7, 10)] == [(7, ['A']), (10, ['M'])]
+
+    with pytest.raises(ValueError):
+        TrazaLlegadas.desde_estado(dict(estado, tipo='aleatoria'), str(tmp_path))
+    otro = tmp_path / 'otro'
+    otro.mkdir()
+    # La ruta del snapshot tiene que estar en el directorio de trazas
+    with pytest.raises(ValueError):
+        TrazaLlegadas.desde_estado(estado, str(otro))
+    with pytest.raises(ValueError):
+        TrazaLlegadas.desde_estado(dict(estado, ruta=str(otro / 'falta.trz')), str(otro))
+
+
+@pytest.mark.parametrize('nombre', ['', '.', '..', '../dia', 'sub/dia.trz', '/etc/passwd'])
+def test_ruta_en_rechaza_rutas(tmp_path, nombre):
+    with pytest.raises(ValueError):
+        ruta_en(str(tmp_path), nombre)
+
+
+def test_ruta_en_rechaza_enlaces_hacia_afuera(tmp_path):
+    afuera = tmp_path / 'afuera.trz'
+    escribir_traza(str(afuera), [(1, 'A')])
+    trazas = tmp_path / 'trazas'
+    trazas.mkdir()
+    os.symlink(afuera, trazas / 'enlace.trz')
+    with pytest.raises(ValueError):
+        ruta_en(str(trazas), 'enlace')
+    assert ruta_en(str(trazas), 'dia') == os.path.join(os.path.realpath(trazas), 'dia.trz')
+
+
+def test_trazas_invalidas(tmp_path):
+    with pytest.raises(ValueError):
+        escribir_traza(str(tmp_path / 'x.trz'), [(1, 'Z')])
+    with pytest.raises(ValueError):
+        escribir_traza(str(tmp_path / 'x.trz'), [(-1, 'A')])
+    corta = tmp_path / 'corta.trz'
+    corta.write_bytes(b'TRAZA')
+    with pytest.raises(ValueError):
+        TrazaLlegadas(str(corta))
+    vacia = tmp_path / 'vacia.trz'
+    assert escribir_traza(str(vacia), []) == 0
+    with TrazaLlegadas(str(vacia)) as t:
+        assert (len(t), t.primer_tick, t.siguiente(0, 0)) == (0, None, None)
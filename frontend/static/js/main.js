@@ -505,6 +505,66 @@ async function waitForResult(intervalMs = 500) {
   }
 }
 
+// ---------------- Streaming (SSE) ----------------
+
+// Sigue la simulación por /simulacion/stream: el servidor sólo envía los
+// eventos nuevos. Al recibir "fin" se pide /simulacion/result una vez.
+// Si el navegador no soporta EventSource se vuelve al polling.
+function followStream() {
+  if (typeof EventSource === "undefined") return waitForResult(500);
+  showPreparing("Preparando ejecución...");
+  show("Esperando eventos de la simulación...");
+  return new Promise((resolve) => {
+    const es = new EventSource("/simulacion/stream");
+    let eventos = 0;
+    let ultimoTick = 0;
+    let ultimoRender = 0;
+    const render = (forzar) => {
+      const ahora = Date.now();
+      if (!forzar && ahora - ultimoRender < 100) return;
+      ultimoRender = ahora;
+      showPreparing(
+        `Simulación en ejecución — tick: ${ultimoTick}, eventos: ${eventos}`
+      );
+    };
+    const terminar = async () => {
+      es.close();
+      await waitForResult(250);
+      resolve();
+    };
+    es.onmessage = (msg) => {
+      let ev;
+      try {
+        ev = JSON.parse(msg.data);
+      } catch (err) {
+        return;
+      }
+      if (ev.event === "fin") {
+        render(true);
+        terminar();
+        return;
+      }
+      eventos += 1;
+      if (typeof ev.tick === "number") ultimoTick = ev.tick;
+      render(false);
+    };
+    es.addEventListener("perdidos", (msg) => {
+      try {
+        eventos += JSON.parse(msg.data).perdidos || 0;
+      } catch (err) {
+        /* ignorar */
+      }
+    });
+    // El servidor cierra el flujo sin "fin" (no hay corrida o pasó mucho
+    // tiempo sin eventos): el resultado se consulta por polling
+    es.addEventListener("cerrado", () => terminar());
+    es.onerror = () => {
+      // EventSource reintenta solo; si quedó cerrado, volvemos al polling
+      if (es.readyState === EventSource.CLOSED) terminar();
+    };
+  });
+}
+
 async function startSim() {
   show("Iniciando petición de inicio...");
   const tiempoVal = el("tiempo") ? el("tiempo").value.trim() : "";
@@ -546,7 +606,7 @@ async function startSim() {
   show(humanize("/simulacion/start", res));
 
   if (res.status === 201 || res.ok) {
-    await waitForResult(500);
+    await followStream();
   }
 }
 